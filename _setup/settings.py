@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'epicEvents.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,8 +60,15 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'authentication.authentication.RoleClaimsJWTAuthentication',
+    ),
+    # JSON encoded by orjson when installed (see utils/renderers.py).
+    'DEFAULT_RENDERER_CLASSES': (
+        'utils.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'epicEvents.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
 }
 
 
@@ -91,15 +99,56 @@ WSGI_APPLICATION = '_setup.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
-        'NAME': 'usersdb', 
-        'USER': 'admin', 
-        'PASSWORD': 'password',
-        'HOST': '127.0.0.1', 
-        'PORT': '5432',
+        # The PostgreSQL backend, measuring the time spent waiting for connections (see utils/database.py).
+        'ENGINE': 'utils.postgresql',
+        'NAME': os.environ.get('DB_NAME', 'usersdb'),
+        'USER': os.environ.get('DB_USER', 'admin'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'password'),
+        'HOST': os.environ.get('DB_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # Persistent connections: each worker thread keeps its connection for CONN_MAX_AGE
+        # seconds instead of paying the TCP and authentication setup on every request, and
+        # checks it is still usable before reusing it. The server then holds up to
+        # (processes x threads) connections, which must stay under its max_connections.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        # Set when connecting through a transaction pooler (pgbouncer in transaction mode),
+        # which does not support server-side cursors.
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', '') == '1',
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
     }
 }
 
+# Read replicas, as a comma-separated list of host[:port] sharing the credentials of the primary.
+# The list, export and report requests read from them (see utils/routers.py and epicEvents/replicas.py).
+for index, replica in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        # The tests read the replicas through the connection of the primary.
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['utils.routers.ReplicaRouter']
+
+# STICKY_SECONDS: how long the reads of a user stay on the primary after they wrote, which should
+# exceed the replication lag. The CACHE holding the sticky users must be shared by every API
+# process, so that the next request of a user reads from the primary whichever process serves
+# it: the default is the database cache declared in CACHES, a redis cache also fits.
+REPLICA_ROUTING = {
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    'STICKY_SECONDS': int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5)),
+    'CACHE': 'replica_routing',
+}
+
+# Connections taking longer than this to be acquired (opened or health-checked) are logged,
+# and the startup probe (`manage.py check --database default`) warns about them.
+DB_SLOW_ACQUIRE_MS = int(os.environ.get('DB_SLOW_ACQUIRE_MS', 250))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -119,6 +168,37 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing (see authentication/hashers.py). PASSWORD_HASHER picks the hasher of the new
+# passwords: 'scrypt', 'argon2' (requires `pip install argon2-cffi`) or 'pbkdf2'. The others still
+# verify the existing hashes, and a password stored with another hasher or other parameters is
+# rehashed when its user logs in. `manage.py benchmark_hashers` measures the logins per second per
+# core of each hasher with these parameters.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')
+
+_HASHERS = {
+    'scrypt': 'authentication.hashers.ScryptPasswordHasher',
+    'argon2': 'authentication.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'authentication.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [
+    _HASHERS.pop(PASSWORD_HASHER),
+    *_HASHERS.values(),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# The hashes run in a pool of WORKERS threads (one per core by default) instead of the request
+# threads; a login waiting more than WAIT_SECONDS for one of the MAX_PENDING queue places gets a 429.
+PASSWORD_HASHING = {
+    'SCRYPT': {'WORK_FACTOR': 2 ** 14, 'BLOCK_SIZE': 8, 'PARALLELISM': 1},
+    'ARGON2': {'TIME_COST': 2, 'MEMORY_COST': 19456, 'PARALLELISM': 1},
+    'PBKDF2_ITERATIONS': 390000,
+    'OFFLOAD': True,
+    'WORKERS': int(os.environ.get('PASSWORD_HASHING_WORKERS', 0)) or None,
+    'MAX_PENDING': 32,
+    'WAIT_SECONDS': 5,
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
@@ -144,9 +224,91 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'authentication.User'
 
+CACHES = {
+    # Local to each process: the response cache (see RESPONSE_CACHE) and the roles.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # The flags of the revoked tokens (see JWT_REVOCATION_CACHE). MAX_ENTRIES is far above the
+    # number of flags alive at once, so that they are never culled.
+    'jwt_revocation': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'jwt_revocation_cache',
+        'OPTIONS': {'MAX_ENTRIES': 1000000},
+    },
+    # The users whose reads stay on the primary after a write (see REPLICA_ROUTING), read on the
+    # primary and only when replicas are configured.
+    'replica_routing': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'replica_routing_cache',
+        'OPTIONS': {'MAX_ENTRIES': 1000000},
+    },
+}
+
+# Process-local cache of the users' group names (see authentication/roles.py).
+# Invalidated when the groups of a user change, TTL bounds the staleness across processes.
+ROLE_CACHE = {
+    'ENABLED': True,
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=500),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'authentication.tokens.RoleTokenObtainPairSerializer',
+}
+
+# Cache holding the tokens whose role claims are no longer trusted (see authentication/tokens.py).
+# It must be shared by every API process and never evict a flag before it expires: the default
+# is the database cache below (its table is created by `migrate`), a redis cache without
+# eviction also fits. The local-memory cache of each process does not.
+JWT_REVOCATION_CACHE = 'jwt_revocation'
+
+# Seconds each process trusts its copy of the generation of the revocation flags, which spares
+# the revocation cache lookups of the tokens already checked: a token flagged by another process
+# keeps being trusted for at most that long.
+JWT_REVOCATION_GENERATION_TTL = 5
+
+# Cache of the list and retrieve responses of the client, contract and event endpoints
+# (see epicEvents/cache.py), invalidated by the post_save/post_delete signals of the models.
+# The default cache is local to each process: point ALIAS to a cache shared by every API
+# process (redis, memcached...) when running more than one. Otherwise the changes made by the other
+# processes and by the management commands are served until the entries expire, after TIMEOUT.
+RESPONSE_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 60,
+}
+
+# Read-only serialization of the client, contract and event lists from values_list() rows
+# (see epicEvents/row_serializers.py), producing the same JSON as the serializers.
+FAST_LIST_SERIALIZATION = {
+    'ENABLED': True,
+}
+
+# Summary tables of the contracts and events read by the dashboard report (see epicEvents/rollups.py),
+# maintained by the save and delete signals and reconciled by `manage.py refresh_rollups`.
+ROLLUPS = {
+    'ENABLED': True,
+}
+
+# Copies of the sales contact and of the normalized names and email of the client on every event,
+# read by the commercial users' event scope and the client filters of the event list instead of
+# joining the client (see epicEvents/denormalization.py), and maintained by the save signals.
+# Run `manage.py backfill_event_denormalization` before enabling it, and again after re-enabling it.
+EVENT_DENORMALIZATION = {
+    'ENABLED': os.environ.get('EVENT_DENORMALIZATION', '') == '1',
+    'BATCH_SIZE': 1000,
+}
+
+# Per-request figures (queries, SQL, serialization and permission times, response size) logged as
+# JSON by the `epicEvents.requests` logger and exposed by /metrics/ (see epicEvents/instrumentation.py).
+# The scraper sends METRICS_TOKEN as a bearer token; without it, /metrics/ is only served in DEBUG.
+REQUEST_METRICS = {
+    'ENABLED': True,
+    'LOG': True,
+    'TOKEN': os.environ.get('METRICS_TOKEN') or None,
 }
 
 # Log
@@ -154,12 +316,22 @@ SIMPLE_JWT = {
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'message': {
+            'format': '%(message)s',
+        },
+    },
     'handlers': {
         'file': {
             'level': 'ERROR',
             'class': 'logging.FileHandler',
             'filename': os.path.join(BASE_DIR, 'logs', 'django.log'),
         },
+        'requests': {
+            'level': 'INFO',
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
     },
     'loggers': {
         'django': {
@@ -167,6 +339,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        'epicEvents.requests': {
+            'handlers': ['requests'],
+            'level': os.environ.get('REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
     },
 }
 
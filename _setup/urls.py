@@ -21,13 +21,15 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
 
-from epicEvents.views import ClientViewset, ContractViewset, EventViewset, UserViewset
+from epicEvents.async_views import AsyncClientView, AsyncContractView, AsyncEventView
+from epicEvents.views import ClientViewset, ContractViewset, EventViewset, HealthView, ReportViewset, UserViewset, metrics
 
 
 router = routers.SimpleRouter()
 router.register(r'client', ClientViewset, basename="client")
 router.register(r'contract', ContractViewset, basename="contract")
 router.register(r'event', EventViewset, basename="event")
+router.register(r'reports', ReportViewset, basename="reports")
 
 
 urlpatterns = [
@@ -35,5 +37,13 @@ urlpatterns = [
     path('', include(router.urls)),
     path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('signup/', UserViewset.as_view({'post': 'create'}))
+    path('signup/', UserViewset.as_view({'post': 'create'})),
+    path('health/', HealthView.as_view(), name='health'),
+    path('metrics/', metrics, name='metrics'),
+    path('async/client/', AsyncClientView.as_view(), name='async-client-list'),
+    path('async/client/<int:pk>/', AsyncClientView.as_view(), name='async-client-detail'),
+    path('async/contract/', AsyncContractView.as_view(), name='async-contract-list'),
+    path('async/contract/<int:pk>/', AsyncContractView.as_view(), name='async-contract-detail'),
+    path('async/event/', AsyncEventView.as_view(), name='async-event-list'),
+    path('async/event/<int:pk>/', AsyncEventView.as_view(), name='async-event-detail'),
 ]
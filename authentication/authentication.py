@@ -0,0 +1,103 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.roles import COMMERCIAL, SUPPORT
+from authentication.tokens import ROLE_CLAIM, ais_token_flagged, is_token_flagged
+
+
+class RoleTokenUser(TokenUser):
+    """
+    A lightweight user built from the claims of a token issued by `RoleTokenObtainPairSerializer`.
+
+    It answers the role checks made by the permissions and the views (`is_superuser`,
+    `is_commercial()`, `is_support()`, `pk`) without any database query.
+    It cannot be saved and must only be used for read-only requests.
+    """
+
+    def group_names(self):
+        role = self.token.get(ROLE_CLAIM)
+        return frozenset([role]) if role in (COMMERCIAL, SUPPORT) else frozenset()
+
+    async def agroup_names(self):
+        return self.group_names()
+
+    def is_commercial(self):
+        """Return True if the token was issued to a commercial user"""
+        return self.token.get(ROLE_CLAIM) == COMMERCIAL
+
+    def is_support(self):
+        """Return True if the token was issued to a support user"""
+        return self.token.get(ROLE_CLAIM) == SUPPORT
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the role claims of the token for read-only requests.
+
+    - Safe methods (GET, HEAD, OPTIONS) carrying a token with a role claim are authenticated
+      as a `RoleTokenUser`, which costs no query.
+    - Writes, tokens without role claims (issued before the claims existed) and tokens
+      flagged by the revocation list load the user from the database, as `JWTAuthentication` does.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if (request.method in permissions.SAFE_METHODS and
+                ROLE_CLAIM in validated_token and
+                not is_token_flagged(validated_token)):
+            return RoleTokenUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    async def aauthenticate(self, request):
+        """
+        Async version of `authenticate`, for the async views: decoding the token costs no I/O,
+        the revocation list and the user (when the claims are not trusted) are read with the
+        async cache and ORM APIs.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if (request.method in permissions.SAFE_METHODS and
+                ROLE_CLAIM in validated_token and
+                not await ais_token_flagged(validated_token)):
+            return RoleTokenUser(validated_token), validated_token
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """
+        Async version of `JWTAuthentication.get_user`.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
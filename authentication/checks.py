@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, Warning, register
+
+
+@register(Tags.security)
+def check_password_hasher(app_configs, **kwargs):
+    """
+    Fail at startup, rather than on the first login, when the library of the preferred
+    password hasher is not installed (argon2-cffi for PASSWORD_HASHER=argon2).
+    """
+    hasher = get_hasher()
+    if hasher.library is None:
+        return []
+    try:
+        hasher._load_library()
+    except ValueError as e:
+        return [Error(
+            f'The preferred password hasher cannot be used: {e}',
+            hint=f'Install its library or pick another PASSWORD_HASHER than {settings.PASSWORD_HASHER!r}.',
+            id='authentication.E001',
+        )]
+    return []
+
+
+@register(Tags.security, Tags.caches)
+def check_revocation_cache(app_configs, **kwargs):
+    """
+    Warn when the revoked tokens are flagged in a cache local to each process, or culled: a flag
+    missed by a process, or evicted, makes it trust the role claims of the token again.
+    """
+    alias = getattr(settings, 'JWT_REVOCATION_CACHE', 'default')
+    if isinstance(caches[alias], (LocMemCache, DummyCache)):
+        return [Warning(
+            f'The revoked tokens are flagged in the {alias!r} cache, which is local to each process.',
+            hint='Point JWT_REVOCATION_CACHE to a cache shared by every API process, which does not evict '
+                 'its entries (the database cache, redis without eviction).',
+            id='authentication.W002',
+        )]
+    return []
@@ -0,0 +1,209 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework.exceptions import Throttled
+
+from utils.metrics import counter, histogram
+
+# Upper bounds (in seconds) of the buckets of the hashing histograms: a hash costs tens of milliseconds.
+HASHING_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+hashing_seconds = histogram('epic_password_hashing_seconds', 'Time spent hashing passwords.',
+                            ['operation'], HASHING_BUCKETS)
+hashing_wait_seconds = histogram('epic_password_hashing_wait_seconds',
+                                 'Time the password hashes waited for a hashing worker.', [], HASHING_BUCKETS)
+hashing_rejected = counter('epic_password_hashing_rejected_total',
+                           'Password hashes refused because too many were waiting.')
+
+
+def get_config():
+    """
+    Return the PASSWORD_HASHING setting, completed with its defaults.
+    """
+    config = {
+        'SCRYPT': {},
+        'ARGON2': {},
+        'PBKDF2_ITERATIONS': hashers.PBKDF2PasswordHasher.iterations,
+        'OFFLOAD': True,
+        'WORKERS': None,
+        'MAX_PENDING': 32,
+        'WAIT_SECONDS': 5,
+    }
+    config.update(getattr(settings, 'PASSWORD_HASHING', {}))
+    return config
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """
+    Scrypt, with the parameters of the SCRYPT entry of the PASSWORD_HASHING setting.
+    Memory-hard: a verification costs 128 x WORK_FACTOR x BLOCK_SIZE bytes (16 MB by default).
+    """
+
+    def _get(self, name, default):
+        return get_config()['SCRYPT'].get(name, default)
+
+    @property
+    def work_factor(self):
+        return self._get('WORK_FACTOR', hashers.ScryptPasswordHasher.work_factor)
+
+    @property
+    def block_size(self):
+        return self._get('BLOCK_SIZE', hashers.ScryptPasswordHasher.block_size)
+
+    @property
+    def parallelism(self):
+        return self._get('PARALLELISM', hashers.ScryptPasswordHasher.parallelism)
+
+    @property
+    def maxmem(self):
+        # OpenSSL refuses to use more than 32 MB by default, which WORK_FACTOR=2**15 already exceeds.
+        # The margin leaves room to verify the hashes of a previous, lower setting.
+        return max(64 * 1024 ** 2, 256 * self.work_factor * self.block_size * self.parallelism)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id, with the parameters of the ARGON2 entry of the PASSWORD_HASHING setting
+    (MEMORY_COST is in KiB). Requires argon2-cffi (`pip install argon2-cffi`).
+    """
+
+    def _get(self, name, default):
+        return get_config()['ARGON2'].get(name, default)
+
+    @property
+    def time_cost(self):
+        return self._get('TIME_COST', hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return self._get('MEMORY_COST', hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return self._get('PARALLELISM', hashers.Argon2PasswordHasher.parallelism)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256, with the PBKDF2_ITERATIONS of the PASSWORD_HASHING setting.
+    """
+
+    @property
+    def iterations(self):
+        return get_config()['PBKDF2_ITERATIONS']
+
+
+# The hashers selectable by the PASSWORD_HASHER environment variable (see settings.py).
+HASHERS = {
+    'scrypt': ScryptPasswordHasher,
+    'argon2': Argon2PasswordHasher,
+    'pbkdf2': PBKDF2PasswordHasher,
+}
+
+
+def describe(hasher):
+    """
+    Return the algorithm and the parameters of the hasher, e.g. `scrypt (n=16384, r=8, p=1)`.
+    """
+    if isinstance(hasher, hashers.ScryptPasswordHasher):
+        parameters = f'n={hasher.work_factor}, r={hasher.block_size}, p={hasher.parallelism}'
+    elif isinstance(hasher, hashers.Argon2PasswordHasher):
+        parameters = f't={hasher.time_cost}, m={hasher.memory_cost} KiB, p={hasher.parallelism}'
+    else:
+        parameters = f'{hasher.iterations} iterations'
+    return f'{hasher.algorithm} ({parameters})'
+
+
+class HashingOverloaded(Throttled):
+    """
+    Too many passwords are waiting to be hashed: the request is refused (429, with a
+    Retry-After header) rather than queued for longer than WAIT_SECONDS.
+    """
+    default_detail = 'Too many logins in progress, try again in a few seconds.'
+
+
+class HashingPool:
+    """
+    The worker threads hashing the passwords, one per core by default (WORKERS).
+
+    The hash functions release the GIL, so the workers hash in parallel while the request
+    threads wait for them: however many requests log in at once, at most WORKERS hashes
+    compete for the CPU, and the requests serving the other endpoints keep their share of it.
+    At most MAX_PENDING hashes are queued; a request waiting more than WAIT_SECONDS for a
+    place in the queue is refused with `HashingOverloaded`.
+    """
+
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='password-hashing')
+        self.slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def run(self, operation, func, *args, wait_seconds=None):
+        queued = time.perf_counter()
+        if not self.slots.acquire(timeout=wait_seconds):
+            hashing_rejected.inc()
+            raise HashingOverloaded(wait=1)
+        try:
+            def timed():
+                start = time.perf_counter()
+                hashing_wait_seconds.observe(start - queued)
+                try:
+                    return func(*args)
+                finally:
+                    hashing_seconds.observe(time.perf_counter() - start, operation=operation)
+            return self.executor.submit(timed).result()
+        finally:
+            self.slots.release()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the hashing pool of the process, created with the settings of the first hash.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = get_config()
+                _pool = HashingPool(config['WORKERS'] or os.cpu_count() or 1, config['MAX_PENDING'])
+    return _pool
+
+
+def run_hashing(operation, func, *args):
+    """
+    Run the hash function in the hashing pool (see `HashingPool`), or inline when OFFLOAD is False.
+    """
+    config = get_config()
+    if not config['OFFLOAD']:
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            hashing_seconds.observe(time.perf_counter() - start, operation=operation)
+    return get_pool().run(operation, func, *args, wait_seconds=config['WAIT_SECONDS'])
+
+
+def make_password(password):
+    """
+    Hash the password with the preferred hasher, in the hashing pool.
+    """
+    return run_hashing('make', hashers.make_password, password)
+
+
+def verify_password(password, encoded):
+    """
+    Check the password against its hash in the hashing pool, and return (is_correct, must_update):
+    must_update is True when the password is correct but was hashed by another hasher than the
+    preferred one, or with other parameters.
+    """
+    must_update = []
+    is_correct = run_hashing('verify', hashers.check_password, password, encoded, must_update.append)
+    return is_correct, bool(must_update)
@@ -0,0 +1,62 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.hashers import HASHERS, describe
+
+PASSWORD = 'benchmark-password'
+
+
+class Command(BaseCommand):
+    help = ('Measures the password verifications, and so the logins, per second per core of each '
+            'hasher of PASSWORD_HASHER with the parameters of the PASSWORD_HASHING setting: one '
+            'thread verifying in a loop, then --threads threads (one per core by default) showing '
+            'how the hashing scales over the cores of the machine.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hasher', dest='hashers', action='append', choices=list(HASHERS),
+                            help='Hasher measured, repeatable (default: all of them)')
+        parser.add_argument('--seconds', type=float, default=3,
+                            help='Duration of each measure (default: 3)')
+        parser.add_argument('--threads', type=int, default=os.cpu_count() or 1,
+                            help='Threads verifying in parallel in the second measure (default: one per core)')
+
+    def handle(self, *args, **options):
+        if options['seconds'] <= 0 or options['threads'] <= 0:
+            raise CommandError('--seconds and --threads must be positive')
+        self.stdout.write(f'{os.cpu_count()} cores, {options["threads"]} threads')
+        for name in options['hashers'] or list(HASHERS):
+            hasher = HASHERS[name]()
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as e:
+                self.stdout.write(self.style.WARNING(f'{name}: skipped, {e}'))
+                continue
+            if not hasher.verify(PASSWORD, encoded):
+                raise CommandError(f'{name}: the password does not verify against its hash')
+
+            single = self.measure(hasher, encoded, 1, options['seconds'])
+            parallel = self.measure(hasher, encoded, options['threads'], options['seconds'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{describe(hasher)}: {1000 / single:.1f} ms per login, {single:.1f} logins/s per core, '
+                f'{parallel:.1f} logins/s on {options["threads"]} threads '
+                f'({parallel / min(options["threads"], os.cpu_count() or 1):.1f} per core)'))
+
+    def measure(self, hasher, encoded, threads, seconds):
+        """
+        Verify the password with `threads` threads for `seconds` and return the verifications per second.
+        """
+        def verify(_):
+            done = 0
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                hasher.verify(PASSWORD, encoded)
+                done += 1
+            return done
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            done = sum(executor.map(verify, range(threads)))
+        return done / (time.perf_counter() - start)
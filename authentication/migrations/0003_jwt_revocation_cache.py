@@ -0,0 +1,22 @@
+# Generated by Django 4.1.5 on 2026-10-18 17:30
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """
+    Create the table of the token revocation cache (JWT_REVOCATION_CACHE), and of any other
+    database cache of the settings.
+    """
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0002_user_is_active_user_is_staff"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,8 @@ from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser, PermissionsMixin, BaseUserManager)
+from authentication.hashers import make_password, verify_password
+from authentication.roles import COMMERCIAL, SUPPORT, aget_group_names, get_group_names
 
 # Create your models here.
 
@@ -96,18 +98,39 @@ class User(AbstractBaseUser, PermissionsMixin):
         super(User, self).save(*args, **kwargs)
         return self
 
+    def set_password(self, raw_password):
+        """Hash the password with the preferred hasher, in the hashing pool (see authentication.hashers)"""
+        self.password = make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Check the password in the hashing pool (see authentication.hashers).
+        A correct password hashed by another hasher than the preferred one (PASSWORD_HASHER), or with
+        other parameters, is rehashed and saved: the users move to a new setting as they log in.
+        """
+        is_correct, must_update = verify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        return is_correct
+
+    def group_names(self):
+        """Return the names of the user's groups, resolved with a single query (see authentication.roles)"""
+        return get_group_names(self)
+
+    async def agroup_names(self):
+        """Async version of group_names(), for the async views"""
+        return await aget_group_names(self)
+
     def is_commercial(self):
         """Return True if the user is in the Commercial Group or False"""
-        if not hasattr(self, '_is_commercial'):
-            self._is_commercial = self.groups.filter(name="commercial").exists()
-        return self._is_commercial
+        return COMMERCIAL in self.group_names()
 
     def is_support(self):
         """Return True if the user is in the Support Group or False"""
-        if not hasattr(self, '_is_support'):
-            self._is_support = self.groups.filter(
-                name="support").exists()
-        return self._is_support
+        return SUPPORT in self.group_names()
 
     def full_name(self):
         """
@@ -122,8 +145,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         If the user is a superuser, the string representation will include the user's id, email, and a note that the user is a manager.
         If the user does not belong to any group, the string representation will include the user's id, email, and a warning that the user is not assigned to any group.
         """
-        if self.groups.exists():
-            return f"id: {self.pk}, email :{self.email}, group: {''.join(self.groups.all().values_list('name', flat=True))}"
+        group_names = self.group_names()
+        if group_names:
+            return f"id: {self.pk}, email :{self.email}, group: {', '.join(sorted(group_names))}"
         elif self.is_superuser:
             return f"id: {self.pk}, email :{self.email}, group: manager"
         else:
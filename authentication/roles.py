@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+COMMERCIAL = 'commercial'
+SUPPORT = 'support'
+MANAGER = 'manager'
+
+
+class RoleCache:
+    """
+    A process-local, thread-safe LRU cache of the group names of users, keyed on the user id.
+
+    Entries expire after `ttl` seconds so that a process that missed an invalidation
+    (e.g. the groups were changed by another process) serves stale roles for at most `ttl`.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """
+        Return the cached group names of the user, or None if they are missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            names, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return names
+
+    def set(self, user_id, names):
+        """
+        Cache the group names of the user, evicting the least recently used entry if full.
+        """
+        with self._lock:
+            self._entries[user_id] = (names, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _build_role_cache():
+    """
+    Build the role cache from the ROLE_CACHE setting, or return None if it is disabled.
+    """
+    config = getattr(settings, 'ROLE_CACHE', {})
+    if not config.get('ENABLED', False):
+        return None
+    return RoleCache(max_size=config.get('MAX_SIZE', 1024), ttl=config.get('TTL', 60))
+
+
+role_cache = _build_role_cache()
+
+
+def get_group_names(user):
+    """
+    Return the names of the groups of the user as a frozenset.
+
+    The names are loaded with a single query and memoized on the user instance, so the
+    role checks made by the permissions and the views during a request share that query.
+    When the role cache is enabled, the names are also shared between requests.
+
+    Args:
+        user (User): The user whose groups are resolved.
+
+    Returns:
+        frozenset: The group names of the user.
+    """
+    names = getattr(user, '_group_names', None)
+    if names is not None:
+        return names
+    if role_cache is not None:
+        names = role_cache.get(user.pk)
+    if names is None:
+        names = frozenset(user.groups.values_list('name', flat=True))
+        if role_cache is not None:
+            role_cache.set(user.pk, names)
+    user._group_names = names
+    return names
+
+
+async def aget_group_names(user):
+    """
+    Async version of `get_group_names`, for the async views: the group names are memoized on
+    the user instance the same way, so the synchronous role checks made afterwards
+    (`is_commercial()`, `is_support()`) do not query the database.
+    """
+    names = getattr(user, '_group_names', None)
+    if names is not None:
+        return names
+    if role_cache is not None:
+        names = role_cache.get(user.pk)
+    if names is None:
+        names = frozenset([name async for name in user.groups.values_list('name', flat=True)])
+        if role_cache is not None:
+            role_cache.set(user.pk, names)
+    user._group_names = names
+    return names
+
+
+def invalidate_user_roles(user_ids):
+    """
+    Drop the cached group names of the given users.
+    """
+    if role_cache is None:
+        return
+    for user_id in user_ids:
+        role_cache.delete(user_id)
+
+
+def invalidate_all_roles():
+    """
+    Drop the cached group names of every user (e.g. after a group was renamed or deleted).
+    """
+    if role_cache is not None:
+        role_cache.clear()
+
+
+def get_role(user):
+    """
+    Return the single role of the user: 'manager' for superusers, then 'commercial' or 'support'
+    following the group of the user, or None if the user has no role.
+    """
+    if user.is_superuser:
+        return MANAGER
+    group_names = get_group_names(user)
+    if COMMERCIAL in group_names:
+        return COMMERCIAL
+    if SUPPORT in group_names:
+        return SUPPORT
+    return None
@@ -0,0 +1,61 @@
+import time
+
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from authentication.models import User
+from authentication.roles import invalidate_all_roles, invalidate_user_roles
+from authentication.tokens import flag_user_tokens
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_groups_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidate the cached roles of the users whose groups were changed.
+
+    The relation can be changed from the user (`user.groups.add(group)`, reverse is False)
+    or from the group (`group.user_set.add(user)`, reverse is True).
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        instance.__dict__.pop('_group_names', None)
+        user_ids = [instance.pk]
+    elif action in ('pre_clear', 'post_clear'):
+        invalidate_all_roles()
+        user_ids = instance.user_set.values_list('pk', flat=True) if action == 'pre_clear' else []
+    else:
+        user_ids = pk_set or ()
+    invalidate_user_roles(user_ids)
+    for user_id in user_ids:
+        flag_user_tokens(user_id, issued_before=time.time())
+
+
+@receiver(post_save, sender=User)
+def flag_tokens_on_user_change(sender, instance, created, update_fields, **kwargs):
+    """
+    Stop trusting the role claims of the tokens of a user whose superuser or active status may have changed.
+    Saving only the password (rehash on login) or the last login date does not change the claims.
+    """
+    if created or (update_fields and set(update_fields) <= {'password', 'last_login'}):
+        return
+    flag_user_tokens(instance.pk, issued_before=time.time())
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_roles_on_group_change(sender, **kwargs):
+    """
+    Invalidate every cached role when a group is renamed or deleted.
+    """
+    invalidate_all_roles()
+
+
+@receiver(post_delete, sender=User)
+def flag_tokens_on_user_delete(sender, instance, **kwargs):
+    """
+    Stop trusting the tokens of a deleted user: they are authenticated from the database again,
+    which rejects them.
+    """
+    flag_user_tokens(instance.pk, issued_before=time.time())
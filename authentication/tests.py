@@ -1,3 +1,60 @@
-from django.test import TestCase
+import time
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from authentication.roles import COMMERCIAL
+from authentication.tokens import (GENERATION_KEY, RoleTokenObtainPairSerializer, checked_tokens, flag_user_tokens,
+                                   is_token_flagged)
+
+
+class TokenRevocationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('commercial@test.com', 'password', first_name='A', last_name='B')
+        self.user.groups.add(Group.objects.create(name=COMMERCIAL))
+        # Adding the group flagged the tokens issued until now, during this second included.
+        caches[settings.JWT_REVOCATION_CACHE].clear()
+        self.token = RoleTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_token_of_deleted_user_is_rejected(self):
+        self.assertEqual(self.client.get('/client/').status_code, 200)
+        self.user.delete()
+        self.assertEqual(self.client.get('/client/').status_code, 401)
+
+    def test_token_issued_during_the_second_of_the_flag_is_flagged(self):
+        self.assertFalse(is_token_flagged(self.token))
+        flag_user_tokens(self.user.pk, issued_before=self.token['iat'] + 0.9)
+        self.assertTrue(is_token_flagged(self.token))
+
+    def test_revocation_cache_is_shared_by_the_processes(self):
+        self.assertIsInstance(caches[settings.JWT_REVOCATION_CACHE], DatabaseCache)
+        flag_user_tokens(self.user.pk, issued_before=time.time() + 1)
+        self.assertTrue(is_token_flagged(self.token))
+
+    def test_flag_written_by_another_process(self):
+        self.assertFalse(is_token_flagged(self.token))
+        caches[settings.JWT_REVOCATION_CACHE].set_many(
+            {f'jwt:user-flagged:{self.user.pk}': self.token['iat'], GENERATION_KEY: time.time_ns()})
+        # Seen once the generation of the flags is read again, after JWT_REVOCATION_GENERATION_TTL.
+        checked_tokens.expires_at = 0
+        self.assertTrue(is_token_flagged(self.token))
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_read_requests_run_no_authentication_query(self):
+        self.client.get('/client/')
+        # The page only: the user is built from the claims, the token was checked by the first request.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/client/').status_code, 200)
+
+    def test_cached_read_requests_run_no_query(self):
+        self.client.get('/client/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/client/').status_code, 200)
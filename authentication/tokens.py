@@ -0,0 +1,166 @@
+import threading
+import time
+
+from django.core.cache import caches
+from django.conf import settings
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.roles import get_role
+
+ROLE_CLAIM = 'role'
+SUPERUSER_CLAIM = 'is_superuser'
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token pair serializer used by `/login/`.
+
+    Adds the role of the user ('commercial', 'support' or 'manager') and its superuser
+    status to the claims of the tokens, so that `RoleClaimsJWTAuthentication` can
+    authenticate read-only requests without loading the user and its groups.
+    The claims are copied from the refresh token to the access tokens it issues.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[ROLE_CLAIM] = get_role(user)
+        token[SUPERUSER_CLAIM] = user.is_superuser
+        return token
+
+
+def _revocation_cache():
+    # A cache shared by every API process, which never evicts a flag before it expires: a lost
+    # flag makes the token trusted again (see JWT_REVOCATION_CACHE in the settings).
+    return caches[getattr(settings, 'JWT_REVOCATION_CACHE', 'default')]
+
+
+def _revocation_timeout():
+    # A flag never needs to outlive the tokens it applies to.
+    return int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+
+# Key of the generation of the flags, moved by every flag written.
+GENERATION_KEY = 'jwt:generation'
+
+
+class CheckedTokens:
+    """
+    The process-local memory of the tokens found unflagged, valid for one generation of the flags.
+
+    The generation is read from the revocation cache at most every `ttl` seconds, and every
+    token is looked up in the revocation cache once per generation: in the steady state, the
+    requests run no query for the revocation list. A flag written by another process is seen
+    within `ttl` seconds, a flag written by this process at once.
+    """
+
+    def __init__(self, ttl=5, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.generation = None
+        self.expires_at = 0
+        self.tokens = set()
+        self._lock = threading.Lock()
+
+    def is_stale(self):
+        return self.expires_at <= time.monotonic()
+
+    def refresh(self, generation):
+        """
+        Set the current generation of the flags, forgetting the tokens checked for another one.
+        """
+        with self._lock:
+            if generation != self.generation:
+                self.tokens = set()
+            self.generation = generation
+            self.expires_at = time.monotonic() + self.ttl
+
+    def __contains__(self, jti):
+        return jti in self.tokens
+
+    def add(self, jti, generation):
+        """
+        Remember the token found unflagged under the given generation, unless a flag was
+        written since.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            if len(self.tokens) >= self.max_size:
+                self.tokens = set()
+            self.tokens.add(jti)
+
+
+checked_tokens = CheckedTokens(ttl=getattr(settings, 'JWT_REVOCATION_GENERATION_TTL', 5))
+
+
+def _set_flag(key, value):
+    generation = time.time_ns()
+    _revocation_cache().set_many({key: value, GENERATION_KEY: generation}, _revocation_timeout())
+    checked_tokens.refresh(generation)
+
+
+def flag_token(token):
+    """
+    Flag a single token (by its jti): its role claims are no longer trusted.
+    """
+    _set_flag(f"jwt:flagged:{token[api_settings.JTI_CLAIM]}", True)
+
+
+def flag_user_tokens(user_id, issued_before):
+    """
+    Flag every token of the user issued before the given timestamp, e.g. because the groups
+    or the superuser status of the user changed since the claims were written.
+
+    The timestamp is truncated to the second, the precision of the `iat` claim, and the tokens
+    issued during that second are flagged too: a flag only makes the user be loaded from the
+    database.
+    """
+    _set_flag(f"jwt:user-flagged:{user_id}", int(issued_before))
+
+
+def _flag_keys(token):
+    return (f"jwt:flagged:{token.get(api_settings.JTI_CLAIM)}",
+            f"jwt:user-flagged:{token.get(api_settings.USER_ID_CLAIM)}")
+
+
+def _is_flagged(token, flags):
+    token_key, user_key = _flag_keys(token)
+    if flags.get(token_key):
+        return True
+    flagged_before = flags.get(user_key)
+    # Both at whole-second precision (flags written before the truncation may be floats).
+    return flagged_before is not None and int(token.get('iat', 0)) <= int(flagged_before)
+
+
+def is_token_flagged(token):
+    """
+    Return True if the claims of the token must not be trusted, either because the token
+    itself was flagged or because it was issued before (or during the second) its user was
+    flagged. The tokens already found unflagged are not looked up again (see `CheckedTokens`).
+    """
+    if checked_tokens.is_stale():
+        checked_tokens.refresh(_revocation_cache().get(GENERATION_KEY))
+    jti, generation = token.get(api_settings.JTI_CLAIM), checked_tokens.generation
+    if jti in checked_tokens:
+        return False
+    flagged = _is_flagged(token, _revocation_cache().get_many(_flag_keys(token)))
+    if not flagged:
+        checked_tokens.add(jti, generation)
+    return flagged
+
+
+async def ais_token_flagged(token):
+    """
+    Async version of `is_token_flagged`, for the async views.
+    """
+    if checked_tokens.is_stale():
+        checked_tokens.refresh(await _revocation_cache().aget(GENERATION_KEY))
+    jti, generation = token.get(api_settings.JTI_CLAIM), checked_tokens.generation
+    if jti in checked_tokens:
+        return False
+    flagged = _is_flagged(token, await _revocation_cache().aget_many(_flag_keys(token)))
+    if not flagged:
+        checked_tokens.add(jti, generation)
+    return flagged
@@ -5,7 +5,21 @@ from epicEvents.models import Client, Contract, Event, EventStatus
 # Register your models here.
 
 
+class ContractAdmin(admin.ModelAdmin):
+    """
+    Contract admin, `Contract.__str__` displays the related client.
+    """
+    list_select_related = ['client']
+
+
+class EventAdmin(admin.ModelAdmin):
+    """
+    Event admin, `Event.__str__` displays the client of the contract and the event status.
+    """
+    list_select_related = ['contract__client', 'event_status']
+
+
 admin.site.register(User)
 admin.site.register(Client)
-admin.site.register(Contract)
-admin.site.register(Event)
+admin.site.register(Contract, ContractAdmin)
+admin.site.register(Event, EventAdmin)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EpiceventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'epicEvents'
+
+    def ready(self):
+        from epicEvents import checks, signals  # noqa: F401
@@ -0,0 +1,216 @@
+from django.http import HttpResponse
+from django.views import View
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import exceptions, filters, status
+from rest_framework.request import Request
+
+from authentication.authentication import RoleClaimsJWTAuthentication
+from epicEvents.models import Client, Contract, Event
+from epicEvents.pagination import KeysetPagination
+from epicEvents.permissions import AsyncClientAndContractPermission, AsyncEventPermission
+from epicEvents.scoping import scoped
+from epicEvents.serializers import ClientSerializer, ContractSerializer, EventSerializer
+from .filters import ClientFilterSet, ContractFilterSet, EventFilterSet
+from .query_plans import QueryPlan
+from .row_serializers import RowSerializer
+from .search import FullTextSearchFilter
+from utils.renderers import ORJSONRenderer
+
+
+class AsyncReadView(View):
+    """
+    Async list and retrieve endpoint, served under ASGI (`uvicorn _setup.asgi:application`)
+    without holding a thread while the database answers.
+
+    The view mirrors the `list` and `retrieve` actions of the viewset it is declared for:
+    same authentication (`RoleClaimsJWTAuthentication.aauthenticate`), permissions (the
+    async versions of the permission classes), scoping, filters, search, keyset pagination
+    and serializers. Every query is made with the async ORM (`aiterator()`, `afirst()`);
+    the filtering and the serialization of the loaded rows cost no I/O and run inline.
+
+    Only GET (and HEAD) requests are served: the writes stay on the synchronous viewsets.
+    The response cache and the conditional GET validators of the viewsets are not applied.
+    """
+
+    model = None
+    basename = None
+    serializer_class = None
+    query_plan = None
+    row_serializer = None
+    authentication_classes = [RoleClaimsJWTAuthentication]
+    permission_classes = []
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, FullTextSearchFilter]
+    filterset_class = None
+    search_fields = []
+    search_vectors = []
+    search_fallback_fields = []
+    pagination_class = KeysetPagination
+    renderer_class = ORJSONRenderer
+    # `retrieve` looks the objects up among the rows of the scope of the user (see epicEvents/scoping.py).
+    scoped_lookup = True
+
+    def get_scoped_queryset(self, user):
+        """
+        Return the rows of the model the user can access, scoped by their role (see `scoping.SCOPES`).
+        """
+        return scoped(self.model, user)
+
+    def filter_queryset(self, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    async def get(self, request, pk=None):
+        self.action = 'list' if pk is None else 'retrieve'
+        self.request = request = Request(request)
+        try:
+            await self.perform_authentication(request)
+            await self.check_permissions(request)
+            if pk is None:
+                data = await self.list(request)
+            else:
+                data = await self.retrieve(request, pk)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+        return self.render(data)
+
+    async def perform_authentication(self, request):
+        """
+        Authenticate the request with the first authenticator recognizing its credentials.
+        """
+        for authenticator in [auth() for auth in self.authentication_classes]:
+            user_auth_tuple = await authenticator.aauthenticate(request)
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request.user, request.auth = None, None
+
+    async def check_permissions(self, request):
+        if request.user is None or not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+        for permission in [permission() for permission in self.permission_classes]:
+            if not await permission.ahas_permission(request, self):
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    async def check_object_permissions(self, request, obj):
+        for permission in [permission() for permission in self.permission_classes]:
+            if not await permission.ahas_object_permission(request, self, obj):
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    async def list(self, request):
+        """
+        Return the serialized rows the user can access, filtered by the query parameters, or a
+        single page of them when `page_size` or `cursor` is passed (see `KeysetPagination`).
+        """
+        queryset = self.filter_queryset(self.get_scoped_queryset(request.user))
+        if self.row_serializer.enabled():
+            return await self.fast_list(queryset, request)
+        queryset = self.query_plan.apply(queryset)
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request, self)
+        if page is not None:
+            return paginator.get_paginated_response(self.serializer_class(page, many=True).data).data
+        rows = [obj async for obj in queryset.aiterator()]
+        return self.serializer_class(rows, many=True).data
+
+    async def fast_list(self, queryset, request):
+        """
+        Return the rows of `list`, serialized by the row serializer (see `RowSerializer`).
+        """
+        rows = self.row_serializer.rows(queryset)
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(rows, request, self)
+        if page is not None:
+            return paginator.get_paginated_response(self.row_serializer.serialize(page)).data
+        return self.row_serializer.serialize([row async for row in rows.aiterator()])
+
+    async def retrieve(self, request, pk):
+        """
+        Return the serialized row, looked up like `GenericAPIView.get_object` does among the rows
+        the user can access.
+        """
+        queryset = self.query_plan.apply(self.filter_queryset(self.get_scoped_queryset(request.user)))
+        obj = await queryset.filter(pk=pk).afirst()
+        if obj is None:
+            raise exceptions.NotFound()
+        await self.check_object_permissions(request, obj)
+        return self.serializer_class(obj).data
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=None):
+        renderer = self.renderer_class()
+        response = HttpResponse(renderer.render(data), status=status_code,
+                                content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        for header, value in (headers or {}).items():
+            response[header] = value
+        return response
+
+    def handle_exception(self, request, exc):
+        """
+        Render the error like DRF does: `{"detail": ...}`, with the `WWW-Authenticate` header
+        of the authenticator on 401 responses.
+        """
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            headers['WWW-Authenticate'] = self.authentication_classes[0]().authenticate_header(request)
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {'detail': exc.detail}
+        return self.render(data, exc.status_code, headers)
+
+
+class AsyncClientView(AsyncReadView):
+    """
+    Async version of `GET /client/` and `GET /client/<pk>/` (see `ClientViewset`).
+    """
+    model = Client
+    basename = 'client'
+    serializer_class = ClientSerializer
+    permission_classes = [AsyncClientAndContractPermission]
+    filterset_class = ClientFilterSet
+    search_fields = ['first_name', 'last_name', 'email']
+    search_vectors = ['search_vector']
+    search_fallback_fields = ['first_name', 'last_name', 'company_name', 'email']
+    query_plan = QueryPlan(ClientSerializer, extra_fields=['date_created'])
+    row_serializer = RowSerializer(ClientSerializer, extra_fields=['date_created'])
+
+
+class AsyncContractView(AsyncReadView):
+    """
+    Async version of `GET /contract/` and `GET /contract/<pk>/` (see `ContractViewset`).
+    """
+    model = Contract
+    basename = 'contract'
+    serializer_class = ContractSerializer
+    permission_classes = [AsyncClientAndContractPermission]
+    filterset_class = ContractFilterSet
+    search_fields = ['client__email', 'client__first_name', 'client__last_name']
+    search_vectors = ['client__search_vector']
+    search_fallback_fields = ['client__first_name', 'client__last_name',
+                              'client__company_name', 'client__email']
+    query_plan = QueryPlan(ContractSerializer, extra_fields=['date_created'])
+    row_serializer = RowSerializer(ContractSerializer, extra_fields=['date_created'])
+
+    async def list(self, request):
+        if request.user.is_support():
+            message = "Support users can't access Contratcs"
+            return {'message': message}
+        return await super().list(request)
+
+
+class AsyncEventView(AsyncReadView):
+    """
+    Async version of `GET /event/` and `GET /event/<pk>/` (see `EventViewset`).
+    """
+    model = Event
+    basename = 'event'
+    serializer_class = EventSerializer
+    permission_classes = [AsyncEventPermission]
+    filterset_class = EventFilterSet
+    search_fields = ['client__email', 'client__first_name', 'client__last_name', 'notes']
+    search_vectors = ['search_vector', 'client__search_vector']
+    search_fallback_fields = ['notes', 'client__first_name', 'client__last_name',
+                              'client__company_name', 'client__email']
+    query_plan = QueryPlan(EventSerializer, extra_fields=['date_created'])
+    row_serializer = RowSerializer(EventSerializer, extra_fields=['date_created'])
@@ -0,0 +1,185 @@
+import copy
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from epicEvents import cache, denormalization, rollups
+from epicEvents.serializers import PrefetchedPrimaryKeyRelatedField, PrefetchedUniqueValidator, to_pk
+
+
+class BulkSaveMixin:
+    """
+    Adds a `POST <resource>/bulk/` action creating and updating a list of objects at once.
+
+    Each item of the posted list is created, or updated if it carries an `id`. The whole batch is
+    validated with set-based queries:
+    - the related objects are loaded with one query per related field (`prefetched`), the user
+      fields loading only the members of their group, which validates the group at the same time,
+    - the unique values already taken are loaded with one query per unique field (`taken_values`),
+    - the objects to update are loaded with one query.
+    The valid items are then written with `bulk_create`/`bulk_update` in one transaction, the
+    cached responses showing them are invalidated, their rollups updated and the denormalized
+    client columns of the events maintained (see epicEvents/denormalization.py).
+
+    The response reports the result of every item, in the order of the request:
+        {"results": [{"index": 0, "status": "created", "data": {...}},
+                     {"index": 1, "status": "error", "errors": {...}}]}
+    with a 201 status if every item was saved, 207 if some failed and 400 if all failed.
+
+    The viewset can override the hooks:
+    - `get_bulk_update_queryset(user)`: the objects the user may update.
+    - `bulk_can_create(user)`: whether the user may create objects.
+    - `validate_bulk_item(serializer)`: business rules, returns a dict of errors or None.
+    - `before_bulk_create(objects, request)` / `after_bulk_save(created, updated, request)`.
+    """
+
+    bulk_max_items = getattr(settings, 'BULK_MAX_ITEMS', 1000)
+
+    def get_bulk_update_queryset(self, user):
+        return self.get_queryset().none()
+
+    def bulk_can_create(self, user):
+        return True
+
+    def validate_bulk_item(self, serializer):
+        return None
+
+    def before_bulk_create(self, objects, request):
+        pass
+
+    def after_bulk_save(self, created, updated, request):
+        pass
+
+    def get_bulk_context(self, items, fields):
+        """
+        Returns the serializer context of the batch, holding the objects and values prefetched
+        with set-based queries.
+        """
+        context = self.get_serializer_context()
+        prefetched = {}
+        taken_values = {}
+        for name, field in fields.items():
+            if field.read_only:
+                continue
+            if isinstance(field, PrefetchedPrimaryKeyRelatedField):
+                queryset = field.get_queryset()
+                pks = {to_pk(queryset.model, item.get(name)) for item in items}
+                pks.discard(None)
+                prefetched[name] = queryset.in_bulk(pks)
+            unique_validators = [v for v in field.validators if isinstance(v, PrefetchedUniqueValidator)]
+            if unique_validators:
+                values = {item[name] for item in items if isinstance(item.get(name), str)}
+                taken_values[name] = dict(unique_validators[0].queryset.filter(
+                    **{f'{name}__in': values}).values_list(name, 'pk'))
+        context['prefetched'] = prefetched
+        context['taken_values'] = taken_values
+        return context
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Creates and updates the list of objects posted, see `BulkSaveMixin`.
+
+        Args:
+            request: The HTTP request, whose body is a list of objects.
+
+        Returns:
+            A response with the result of every item.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'non_field_errors': ['Expected a list of items.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response({'non_field_errors': [f'A batch holds at most {self.bulk_max_items} items.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        valid_items = [item for item in items if isinstance(item, dict)]
+        context = self.get_bulk_context(valid_items, serializer_class().fields)
+        update_pks = {to_pk(model, item.get('id')) for item in valid_items} - {None}
+        instances = self.get_bulk_update_queryset(request.user).in_bulk(update_pks)
+        can_create = self.bulk_can_create(request.user)
+
+        results = [None] * len(items)
+        to_create, to_update = [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {'index': index, 'status': 'error',
+                                  'errors': {'non_field_errors': ['Expected an object.']}}
+                continue
+            instance = None
+            if item.get('id') is not None:
+                instance = instances.get(to_pk(model, item['id']))
+                if instance is None:
+                    results[index] = {'index': index, 'status': 'error', 'errors': {
+                        'id': ['Not found or you do not have the permission to update it.']}}
+                    continue
+            elif not can_create:
+                results[index] = {'index': index, 'status': 'error', 'errors': {
+                    'non_field_errors': ['You do not have the permission to create it.']}}
+                continue
+            serializer = serializer_class(instance, data=item, partial=instance is not None, context=context)
+            errors = serializer.errors if not serializer.is_valid() else self.validate_bulk_item(serializer)
+            if errors:
+                results[index] = {'index': index, 'status': 'error', 'errors': errors}
+                continue
+            # Values taken by the batch itself must not be reused by the following items.
+            for name, taken in context['taken_values'].items():
+                if name in serializer.validated_data:
+                    taken[serializer.validated_data[name]] = instance.pk if instance else -1 - index
+            (to_update if instance else to_create).append((index, serializer))
+
+        created, updated = self.perform_bulk_save(model, to_create, to_update, request)
+        for (index, _), obj in zip(to_create, created):
+            results[index] = {'index': index, 'status': 'created', 'data': serializer_class(obj).data}
+        for (index, _), obj in zip(to_update, updated):
+            results[index] = {'index': index, 'status': 'updated', 'data': serializer_class(obj).data}
+
+        saved = len(created) + len(updated)
+        if saved == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif saved:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'results': results}, status=response_status)
+
+    def perform_bulk_save(self, model, to_create, to_update, request):
+        """
+        Writes the validated items with one bulk_create and one bulk_update, in one transaction.
+        """
+        created = [model(**serializer.validated_data) for _, serializer in to_create]
+        updated = []
+        update_fields = {'date_updated'}
+        now = timezone.now()
+        # The objects as they were loaded, before the changes are applied to them.
+        previous = [copy.copy(serializer.instance) for _, serializer in to_update]
+        for _, serializer in to_update:
+            instance = serializer.instance
+            for attr, value in serializer.validated_data.items():
+                setattr(instance, attr, value)
+                update_fields.add(attr)
+            # bulk_update does not apply auto_now.
+            instance.date_updated = now
+            updated.append(instance)
+        with transaction.atomic():
+            # bulk_create and bulk_update send no pre_save signal.
+            denormalization.prepare(model, created, previous=[])
+            update_fields |= denormalization.prepare(model, updated, previous=previous)
+            if created:
+                self.before_bulk_create(created, request)
+                created = model.objects.bulk_create(created)
+            if updated:
+                model.objects.bulk_update(updated, sorted(update_fields))
+            self.after_bulk_save(created, updated, request)
+            # bulk_create and bulk_update send no post_save signal.
+            cache.invalidate(model, created + updated, previous=previous)
+            rollups.apply_changes(model, previous, created + updated)
+            denormalization.apply_changes(model, previous, created + updated)
+        return created, updated
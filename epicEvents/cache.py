@@ -0,0 +1,246 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from authentication.roles import COMMERCIAL, MANAGER, SUPPORT
+from epicEvents.models import Client, Contract, Event
+from epicEvents.scoping import ALL, get_scope
+from utils import routers
+from utils.renderers import ORJSONRenderer, PreEncodedJSON, encode
+
+# Prefix of every key written by the response cache.
+KEY_PREFIX = 'epic:response'
+
+
+def get_config():
+    """
+    Return the RESPONSE_CACHE setting, completed with its defaults.
+    """
+    config = {'ENABLED': False, 'ALIAS': 'default', 'TIMEOUT': 300}
+    config.update(getattr(settings, 'RESPONSE_CACHE', {}))
+    return config
+
+
+def is_enabled():
+    return get_config()['ENABLED']
+
+
+def get_cache():
+    """
+    Return the Django cache holding the responses and the version counters: the local-memory
+    cache by default, or any shared backend (redis, memcached...) named by RESPONSE_CACHE['ALIAS'].
+    """
+    return caches[get_config()['ALIAS']]
+
+
+def global_version_key():
+    # Bumped by every change: the version of the lists which are not scoped to an owner.
+    return f'{KEY_PREFIX}:v:all'
+
+
+def owner_version_key(user_id):
+    return f'{KEY_PREFIX}:v:owner:{user_id}'
+
+
+def object_version_key(model, pk):
+    return f'{KEY_PREFIX}:v:{model._meta.model_name}:{pk}'
+
+
+def new_version():
+    # The versions are the times of the changes: a value never used before, so an entry cached
+    # for an older version can never be served again, and which tells how recent the change is.
+    return time.time_ns()
+
+
+def get_versions(keys):
+    """
+    Return the current values of the version counters, creating those which do not exist.
+    """
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, new_version(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions[key] for key in keys]
+
+
+def bump_versions(keys):
+    """
+    Move the version counters to a new version, which makes the responses cached for them unreachable.
+    """
+    version = new_version()
+    get_cache().set_many({key: version for key in keys}, timeout=None)
+
+
+def is_replica_lagging(version):
+    """
+    Return True if the response is read from a replica which may not have replayed the change
+    of the version yet (see `utils.routers`): it must not be cached under that version.
+    """
+    if routers.get_read_database() is None:
+        return False
+    return time.time_ns() - version < routers.get_config()['STICKY_SECONDS'] * 10 ** 9
+
+
+def owners_of(model, objects):
+    """
+    Return the ids of the users whose role-scoped lists show the given objects:
+    - clients: their sales contact and the support contacts of their events,
+    - contracts: their sales contact,
+    - events: their support contact and the sales contact of their client.
+    """
+    objects = [obj for obj in objects if obj is not None]
+    if not objects:
+        return set()
+    if model is Client:
+        owners = {obj.sales_contact_id for obj in objects}
+        owners.update(Event.objects.filter(
+            client_id__in=[obj.pk for obj in objects]).values_list('support_contact_id', flat=True))
+    elif model is Contract:
+        owners = {obj.sales_contact_id for obj in objects}
+    elif model is Event:
+        owners = {obj.support_contact_id for obj in objects}
+        owners.update(Client.objects.filter(
+            pk__in={obj.client_id for obj in objects}).values_list('sales_contact_id', flat=True))
+    else:
+        owners = set()
+    owners.discard(None)
+    return owners
+
+
+def invalidate(model, objects, previous=()):
+    """
+    Invalidate the cached responses showing the objects (a list or a queryset, only evaluated
+    when the cache is enabled): the retrieve responses of the objects, the lists of their
+    owners, before (`previous`, the objects as they were loaded) and after their change, and
+    the unscoped lists (of the superusers).
+
+    The counters are bumped once the transaction is committed, so that a response computed
+    before the commit cannot be cached under the new versions.
+    """
+    if not is_enabled():
+        return
+    objects = list(objects)
+    keys = [global_version_key()]
+    keys += [object_version_key(model, obj.pk) for obj in objects]
+    keys += [owner_version_key(user_id) for user_id in owners_of(model, objects + list(previous))]
+    transaction.on_commit(lambda: bump_versions(keys))
+
+
+def role_of(user):
+    """
+    Return the role the lists of the user are scoped by (from the token claims or the database).
+    """
+    if user.is_superuser:
+        return MANAGER
+    if user.is_commercial():
+        return COMMERCIAL
+    if user.is_support():
+        return SUPPORT
+    return 'none'
+
+
+def get_cache_key(view, request):
+    """
+    Return the key of the response and the version counters it depends on.
+
+    The key holds the resource, the action, the user id and role, and the normalized query
+    string (parameters sorted, so `?a=1&b=2` and `?b=2&a=1` share an entry).
+    """
+    user = request.user
+    unscoped = get_scope(view.queryset.model, user) == ALL
+    version_keys = []
+    if view.action == 'retrieve':
+        version_keys.append(
+            object_version_key(view.queryset.model, view.kwargs[view.lookup_url_kwarg or view.lookup_field]))
+        # The object may enter or leave the scope of the user through a related row (e.g. a
+        # client through the support contact of its events), which bumps the owner version.
+        if not unscoped:
+            version_keys.append(owner_version_key(user.pk))
+    elif unscoped:
+        version_keys.append(global_version_key())
+    else:
+        version_keys.append(owner_version_key(user.pk))
+    params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    raw = '|'.join([request.get_host(), request.path, repr(params)])
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    key = f'{KEY_PREFIX}:{view.basename}:{view.action}:{user.pk}:{role_of(user)}:{digest}'
+    return key, version_keys
+
+
+def can_pre_encode(view):
+    """
+    Return True if every renderer of the view writes `PreEncodedJSON` bodies unchanged (the
+    browsable API embeds the rendering of the JSON renderer of the view).
+    """
+    return all(issubclass(renderer, (ORJSONRenderer, BrowsableAPIRenderer)) for renderer in view.renderer_classes)
+
+
+def cache_response(view_method):
+    """
+    Decorator caching the responses of a list or retrieve method of a viewset.
+
+    A response is cached under a key made of the user, the query parameters and the version
+    of what it shows: the version of the owner (the user) for lists, the global version for the
+    unscoped lists of the superusers, the versions of the object and of the owner for retrieve
+    (of the object only for the superusers). The versions are bumped by the post_save/post_delete signals of the models
+    (see `epicEvents/signals.py`), so a cached response is never served after a change.
+
+    The responses are cached encoded (see `utils.renderers.encode`) when the renderers of the
+    view allow it, and written as is into the responses served from the cache, which are then
+    neither serialized nor encoded again.
+
+    Cached responses carry an ETag: while the response is cached, a request whose `If-None-Match`
+    matches gets a 304 without the response being loaded or serialized. The Last-Modified date set by `conditional_response`
+    is cached with the response, and `If-Modified-Since` honoured for retrieve.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if not is_enabled() or request.method != 'GET':
+            return view_method(self, request, *args, **kwargs)
+        key, version_keys = get_cache_key(self, request)
+        versions = get_versions(version_keys)
+        key = ':'.join([key, *map(str, versions)])
+        etag = '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        cache = get_cache()
+        entry = cache.get(key)
+        if entry is not None:
+            # Only answered while the entry lives: a change the counters missed (another process
+            # with a local cache, a management command) is served at most TIMEOUT seconds.
+            if etag in request.headers.get('If-None-Match', ''):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+            data, last_modified = entry
+            headers = {'ETag': etag}
+            if last_modified:
+                headers['Last-Modified'] = last_modified
+            if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+            if (self.action == 'retrieve' and last_modified and if_modified_since is not None and
+                    'If-None-Match' not in request.headers and
+                    parse_http_date_safe(last_modified) <= if_modified_since):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            if isinstance(data, bytes):
+                data = PreEncodedJSON(data)
+            return Response(data, headers=headers)
+        response = view_method(self, request, *args, **kwargs)
+        if (response is not None and response.status_code == status.HTTP_200_OK and
+                not is_replica_lagging(max(versions))):
+            data = response.data
+            if can_pre_encode(self):
+                # Already encoded by `conditional_response` for the lists.
+                if not isinstance(data, PreEncodedJSON):
+                    response.data = encode(data)
+                data = bytes(response.data)
+            cache.set(key, (data, response.get('Last-Modified')), get_config()['TIMEOUT'])
+            response['ETag'] = etag
+        return response
+    return wrapper
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, Warning, register
+
+from epicEvents.cache import get_config as get_response_cache_config
+from utils import routers
+from utils.database import check_database
+
+
+@register(Tags.database)
+def check_database_connections(app_configs, databases=None, **kwargs):
+    """
+    Startup probe of the databases: run by `manage.py migrate` and by
+    `manage.py check --database default`, which fails when the database does not answer.
+    """
+    errors = []
+    for alias in databases or []:
+        result = check_database(alias)
+        if not result['ok']:
+            errors.append(Error(
+                f"The {alias!r} database cannot be reached: {result['error']}",
+                hint='Check the DB_HOST, DB_PORT, DB_NAME, DB_USER and DB_PASSWORD environment variables.',
+                id='epicEvents.E001',
+            ))
+            continue
+        slow = getattr(settings, 'DB_SLOW_ACQUIRE_MS', None)
+        if slow is not None and result['seconds'] * 1000 >= slow:
+            errors.append(Warning(
+                f"The {alias!r} database took {result['seconds'] * 1000:.0f} ms to answer a first query.",
+                hint='Every request pays this without persistent connections (DB_CONN_MAX_AGE).',
+                id='epicEvents.W001',
+            ))
+    return errors
+
+
+@register(Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    """
+    Warn when the response cache and its version counters are local to each process: the
+    changes made by the other processes and by the management commands do not invalidate them.
+    """
+    config = get_response_cache_config()
+    if config['ENABLED'] and isinstance(caches[config['ALIAS']], LocMemCache):
+        return [Warning(
+            f"The responses are cached in the {config['ALIAS']!r} cache, which is local to each process.",
+            hint=f"The changes made by other processes are served for up to {config['TIMEOUT']} seconds. "
+                 "Point RESPONSE_CACHE['ALIAS'] to a cache shared by every API process (redis, memcached).",
+            id='epicEvents.W002',
+        )]
+    return []
+
+
+@register(Tags.caches, Tags.database)
+def check_replica_routing_cache(app_configs, **kwargs):
+    """
+    Warn when the users reading from the primary after a write are kept in a cache local to each
+    process: their next request, served by another process, reads from a replica.
+    """
+    config = routers.get_config()
+    if config['REPLICAS'] and isinstance(caches[config['CACHE']], (LocMemCache, DummyCache)):
+        return [Warning(
+            f"The users who just wrote are kept in the {config['CACHE']!r} cache, which is local to each process.",
+            hint="Their reads may not see their writes when served by another process. Point "
+                 "REPLICA_ROUTING['CACHE'] to a cache shared by every API process (the database cache, redis).",
+            id='epicEvents.W003',
+        )]
+    return []
@@ -0,0 +1,110 @@
+import calendar
+import functools
+import hashlib
+
+from django.utils.http import http_date, parse_http_date_safe, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from epicEvents.cache import can_pre_encode, role_of
+from utils.renderers import PreEncodedJSON, encode
+
+
+def list_validators(view, request, response):
+    """
+    Return the ETag of a list response, computed from its encoded body: the rows of the page
+    actually served, which change when a row is created, updated, deleted or moves in or out of
+    the scope of the user. No query is added to the ones of the list.
+
+    The list is still loaded, serialized and hashed to answer a matching request: the 304 only
+    saves sending the body. The response cache answers before the view runs while the list is
+    cached (see `cache_response`). The body is encoded once: it is written as is by the
+    renderers (see `can_pre_encode`).
+
+    Returns:
+        str: The ETag.
+    """
+    body = response.data if isinstance(response.data, PreEncodedJSON) else encode(response.data)
+    if can_pre_encode(view):
+        response.data = body
+    params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    raw = '|'.join([view.basename, str(request.user.pk), role_of(request.user), repr(params),
+                    hashlib.md5(body, usedforsecurity=False).hexdigest()])
+    return '"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def object_validators(view, request):
+    """
+    Return the ETag and the last modification date of an object, read from its date_updated
+    column only.
+
+    Returns:
+        tuple: (etag, last modification datetime), or None if the object does not exist.
+    """
+    lookup = view.lookup_url_kwarg or view.lookup_field
+    date_updated = view.get_queryset().filter(
+        **{view.lookup_field: view.kwargs[lookup]}).values_list('date_updated', flat=True).first()
+    if date_updated is None:
+        return None
+    raw = '|'.join([view.basename, str(view.kwargs[lookup]), date_updated.isoformat()])
+    return '"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest(), date_updated
+
+
+def is_not_modified(request, etag, last_modified, use_if_modified_since):
+    """
+    Return True if the validators sent by the client match the current ones.
+
+    `If-None-Match` takes precedence over `If-Modified-Since` (RFC 9110).
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return if_none_match.strip() == '*' or etag in parse_etags(if_none_match)
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    if not use_if_modified_since or if_modified_since is None or last_modified is None:
+        return False
+    # HTTP dates have a one second precision.
+    return calendar.timegm(last_modified.utctimetuple()) <= if_modified_since
+
+
+def conditional_response(view_method):
+    """
+    Decorator answering the conditional GET requests of a list or retrieve method of a viewset.
+
+    For retrieve, the validators are computed from the `date_updated` of the row before the
+    view runs: a request whose `If-None-Match` (or `If-Modified-Since`) matches gets a 304 with
+    no body, so polling clients skip the loading and the serialization of unchanged data.
+
+    For lists, the ETag is computed after the view runs, from the body served (see
+    `list_validators`): a matching request gets a 304 without the body being sent, the query
+    and the serialization of the list having run. Lists have
+    no Last-Modified date, which a row leaving the list would not change. Under the response
+    cache, the ETag of the cached list answers before the view runs (see `cache_response`).
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return view_method(self, request, *args, **kwargs)
+        if self.action != 'retrieve':
+            response = view_method(self, request, *args, **kwargs)
+            if response is None or response.status_code != status.HTTP_200_OK:
+                return response
+            etag = list_validators(self, request, response)
+            if is_not_modified(request, etag, None, use_if_modified_since=False):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+            response['ETag'] = etag
+            return response
+        validators = object_validators(self, request)
+        if validators is None:
+            return view_method(self, request, *args, **kwargs)
+        etag, last_modified = validators
+        headers = {'ETag': etag}
+        if last_modified is not None:
+            headers['Last-Modified'] = http_date(calendar.timegm(last_modified.utctimetuple()))
+        if is_not_modified(request, etag, last_modified, use_if_modified_since=True):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response = view_method(self, request, *args, **kwargs)
+        if response is not None and response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+        return response
+    return wrapper
@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.db import transaction
+
+from epicEvents.models import Client, Event
+
+# Separates the first and last names in `client_name_key`; removed from the searched values.
+SEPARATOR = '\x1f'
+
+# The columns of the clients copied to their events, and the columns of the events holding them.
+CLIENT_FIELDS = ['sales_contact_id', 'first_name', 'last_name', 'email']
+EVENT_FIELDS = ['client_sales_contact_id', 'client_name_key', 'client_email_key']
+
+
+def get_config():
+    """
+    Return the EVENT_DENORMALIZATION setting, completed with its defaults.
+    """
+    config = {'ENABLED': False, 'BATCH_SIZE': 1000}
+    config.update(getattr(settings, 'EVENT_DENORMALIZATION', {}))
+    return config
+
+
+def is_enabled():
+    return get_config()['ENABLED']
+
+
+def normalize(value):
+    """
+    Return the value as written in the search keys and searched in them: in lower case, without
+    the separator.
+    """
+    return (value or '').replace(SEPARATOR, '').lower()
+
+
+def event_values(sales_contact_id, first_name, last_name, email):
+    """
+    Return the values of the denormalized columns of the events of a client (see EVENT_FIELDS).
+    """
+    return (sales_contact_id, normalize(first_name) + SEPARATOR + normalize(last_name), normalize(email))
+
+
+def client_event_values(client):
+    return event_values(*(getattr(client, field) for field in CLIENT_FIELDS))
+
+
+def fill_events(events):
+    """
+    Set the denormalized columns of the events from their clients: the clients loaded on the
+    events (by the serializers), the others read with one query.
+    """
+    missing = {event.client_id for event in events if not Event.client.is_cached(event)}
+    values = {}
+    if missing:
+        rows = Client.objects.filter(pk__in=missing).values_list('pk', *CLIENT_FIELDS)
+        values = {row[0]: event_values(*row[1:]) for row in rows}
+    for event in events:
+        if Event.client.is_cached(event):
+            event_columns = client_event_values(event.client)
+        else:
+            event_columns = values.get(event.client_id, (None, None, None))
+        for field, value in zip(EVENT_FIELDS, event_columns):
+            setattr(event, field, value)
+
+
+def prepare(model, objects, previous=()):
+    """
+    Fill the denormalized columns of the events about to be saved that are created or moved to
+    another client, compared to `previous` (their rows before the save).
+
+    Returns:
+        set: The fields filled, to add to the fields of a bulk update.
+    """
+    if model is not Event or not is_enabled():
+        return set()
+    previous = {obj.pk: obj for obj in previous if obj is not None}
+    changed = []
+    for event in objects:
+        before = previous.get(event.pk) if event.pk is not None else None
+        if before is None or before.client_id != event.client_id or before.client_sales_contact_id is None:
+            changed.append(event)
+    if not changed:
+        return set()
+    fill_events(changed)
+    return set(EVENT_FIELDS)
+
+
+def apply_changes(model, old_objects, new_objects):
+    """
+    Copy the columns of the saved clients whose sales contact, names or email changed, compared
+    to their rows before the save, to their events: one UPDATE per changed client. The clients
+    without a previous row are new and have no events yet.
+    """
+    if model is not Client or not is_enabled():
+        return
+    old_values = {obj.pk: client_event_values(obj) for obj in old_objects}
+    for client in new_objects:
+        values = client_event_values(client)
+        if old_values.get(client.pk, values) == values:
+            continue
+        columns = dict(zip(EVENT_FIELDS, values))
+        Event.objects.filter(client_id=client.pk).exclude(**columns).update(**columns)
+
+
+def backfill(batch_size=None, fix=True):
+    """
+    Compare the denormalized columns of the events with their clients, by batches of events in
+    primary key order, each batch in its own transaction.
+
+    Args:
+        batch_size (int, optional): The events compared per batch (default: the BATCH_SIZE setting).
+        fix (bool): Rewrite the columns of the stale events.
+
+    Yields:
+        tuple: The number of events compared and of stale events, per batch.
+    """
+    batch_size = batch_size or get_config()['BATCH_SIZE']
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            rows = list(Event.objects.filter(pk__gt=last_pk).order_by('pk')
+                        .values_list('pk', 'client_id', *EVENT_FIELDS)[:batch_size])
+            if not rows:
+                return
+            clients = Client.objects.filter(pk__in={row[1] for row in rows}).values_list('pk', *CLIENT_FIELDS)
+            values = {client[0]: event_values(*client[1:]) for client in clients}
+            stale = [Event(pk=row[0], **dict(zip(EVENT_FIELDS, values[row[1]])))
+                     for row in rows if tuple(row[2:]) != values[row[1]]]
+            if fix and stale:
+                Event.objects.bulk_update(stale, EVENT_FIELDS)
+        last_pk = rows[-1][0]
+        yield len(rows), len(stale)
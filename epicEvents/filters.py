@@ -1,5 +1,8 @@
+from datetime import datetime, time, timedelta
 from django_filters import rest_framework as filters
 from django.db.models import Q
+from django.utils import timezone
+from epicEvents import denormalization
 from epicEvents.models import Client, Contract, Event
 
 
@@ -72,8 +75,7 @@ class ContractFilterSet(filters.FilterSet):
     client_full_name = filters.CharFilter(method='filter_client_full_name')
     last_name = filters.CharFilter(
         field_name='client__last_name', lookup_expr='iexact')
-    date_created = filters.DateFilter(
-        field_name='date_created', lookup_expr='icontains')
+    date_created = filters.DateFilter(method='filter_date_created')
     payment_due_date = filters.DateFilter(
         field_name='payment_due_date', lookup_expr='exact')
     amount = filters.NumberFilter(field_name='amount_due')
@@ -96,6 +98,24 @@ class ContractFilterSet(filters.FilterSet):
         )
         return queryset
 
+    def filter_date_created(self, queryset, name, value):
+        """
+        Filter the given queryset on the contracts created during the given day.
+
+        The day is turned into a `[day, day + 1)` range on `date_created`, which can use the index
+        of the column, unlike a lookup on the date part of the timestamp.
+
+        Args:
+            queryset: The queryset to filter.
+            name: The name of the filter, which is ignored in this case.
+            value: The date to search for.
+
+        Returns:
+            A filtered queryset.
+        """
+        start = timezone.make_aware(datetime.combine(value, time.min))
+        return queryset.filter(date_created__gte=start, date_created__lt=start + timedelta(days=1))
+
     class Meta:
         model = Contract
         fields = ['client_email', 'client_full_name',"payment_due_date",
@@ -107,22 +127,32 @@ class EventFilterSet(filters.FilterSet):
 
     The filter fields available in this class are:
 
-    - client_email: filters events based on the email of their associated client, using the "icontains" lookup expression.
+    - client_email: filters events based on the email of their associated client, case-insensitive, on a part of it.
     - client_full_name: filters events based on the full name of their associated client, using a custom filter method.
-    - last_name: filters events based on the last name of their associated client, using the "iexact" lookup expression.
+    - last_name: filters events based on the last name of their associated client, case-insensitive.
     - event_date: filters events based on their event date, using the "exact" lookup expression.
 
-    The custom filter method "filter_client_full_name" searches for clients whose first name or last name match the provided value, using the "iexact" lookup expression.
+    The custom filter method "filter_client_full_name" searches for clients whose first name or last name contain the provided value, case-insensitive.
+
+    When EVENT_DENORMALIZATION is enabled, the client filters read the normalized copies of the client columns
+    on the event (see epicEvents/denormalization.py) instead of joining the client. Their `contains` and
+    `endswith` lookups (`LIKE '%value%'`) are served by trigram indexes on PostgreSQL, not by btree indexes.
 
     """
-    client_email = filters.CharFilter(
-        field_name='client__email', lookup_expr='icontains')
+    client_email = filters.CharFilter(method='filter_client_email')
     client_full_name = filters.CharFilter(method='filter_client_full_name')
-    last_name = filters.CharFilter(
-        field_name='client__last_name', lookup_expr='iexact')
+    last_name = filters.CharFilter(method='filter_last_name')
     event_date = filters.DateFilter(
         field_name='event_date', lookup_expr='exact')
 
+    def filter_client_email(self, queryset, name, value):
+        """
+        Filter the given queryset by searching for a case-insensitive match on the email of the client.
+        """
+        if denormalization.is_enabled():
+            return queryset.filter(client_email_key__contains=denormalization.normalize(value))
+        return queryset.filter(client__email__icontains=value)
+
     def filter_client_full_name(self, queryset, name, value):
         """
         Filter the given queryset by searching for a case-insensitive match on either the first name or last name fields.
@@ -135,13 +165,60 @@ class EventFilterSet(filters.FilterSet):
         Returns:
             A filtered queryset.
         """
+        if denormalization.is_enabled():
+            # The separator between the names is never searched: a match is within one of them.
+            return queryset.filter(client_name_key__contains=denormalization.normalize(value))
         queryset = queryset.filter(
             Q(client__first_name__icontains=value) |
             Q(client__last_name__icontains=value)
         )
         return queryset
 
+    def filter_last_name(self, queryset, name, value):
+        """
+        Filter the given queryset on the clients having the given last name, case-insensitive.
+        """
+        if denormalization.is_enabled():
+            return queryset.filter(
+                client_name_key__endswith=denormalization.SEPARATOR + denormalization.normalize(value))
+        return queryset.filter(client__last_name__iexact=value)
+
     class Meta:
         model = Event
         fields = ['client_email', 'client_full_name',
                   'last_name', 'event_date']
+
+
+# Model field each method filter searches, used to pick a sample value.
+METHOD_FILTER_SOURCES = {
+    'full_name': 'first_name',
+    'client_full_name': 'client__first_name',
+    'client_email': 'client__email',
+    'last_name': 'client__last_name',
+    'date_created': 'date_created',
+}
+
+
+def sample_filter_value(filterset_class, name, filter_):
+    """
+    Return a realistic value for a filter of the filterset, read from the first row of its model.
+
+    Args:
+        filterset_class: The filterset declaring the filter.
+        name (str): The name of the filter.
+        filter_: The filter.
+
+    Returns:
+        The value, or None if the table is empty.
+    """
+    source = METHOD_FILTER_SOURCES.get(name) if filter_.method else filter_.field_name
+    model = filterset_class._meta.model
+    value = model.objects.order_by('pk').values_list(source, flat=True).first()
+    if value is None:
+        return None
+    if hasattr(value, 'date'):
+        value = value.date()
+    if filter_.lookup_expr == 'icontains' or name in ('full_name', 'client_full_name'):
+        # Search a part of the value, as users do.
+        value = str(value)[1:5] or str(value)
+    return value
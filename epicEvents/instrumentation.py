@@ -0,0 +1,245 @@
+import contextlib
+import contextvars
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+from epicEvents.cache import role_of
+from utils.metrics import counter, histogram
+
+logger = logging.getLogger('epicEvents.requests')
+
+# Upper bounds of the buckets of the histograms of the number of queries and the response sizes.
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# The statistics of the request being served, None outside of `RequestMetricsMiddleware`.
+_current = contextvars.ContextVar('request_stats', default=None)
+
+LABELS = ['view', 'action', 'role']
+
+requests_total = counter('epic_requests_total', 'Requests served.', LABELS + ['status'])
+request_seconds = histogram('epic_request_duration_seconds', 'Time spent serving the requests.', LABELS)
+sql_queries = histogram('epic_request_sql_queries', 'SQL queries per request.', LABELS, QUERY_BUCKETS)
+sql_seconds = histogram('epic_request_sql_seconds', 'Time spent in SQL queries per request.', LABELS)
+serialization_seconds = histogram('epic_request_serialization_seconds',
+                                  'Time spent serializing per request, SQL excluded.', LABELS)
+permission_seconds = histogram('epic_request_permission_seconds',
+                               'Time spent checking the permissions per request.', LABELS)
+response_bytes = histogram('epic_response_size_bytes', 'Size of the (non-streamed) responses.', LABELS, SIZE_BUCKETS)
+
+
+def get_config():
+    """
+    Return the REQUEST_METRICS setting, completed with its defaults.
+    """
+    config = {'ENABLED': False, 'LOG': True, 'TOKEN': None}
+    config.update(getattr(settings, 'REQUEST_METRICS', {}))
+    return config
+
+
+class RequestStats:
+    """
+    What a request spent its time on, filled by the SQL execute wrapper, `timed()` blocks
+    and `RequestMetricsMiddleware`.
+    """
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.permission_seconds = 0.0
+        self.running = set()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_queries += 1
+            self.sql_seconds += time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def timed(name, exclude_sql=False):
+    """
+    Add the time spent in the block to the `name` statistics of the current request, minus
+    the time spent in SQL queries with `exclude_sql` (e.g. a queryset evaluated while being
+    serialized). Nested blocks of the same name are only counted once.
+    """
+    stats = _current.get()
+    if stats is None or name in stats.running:
+        yield
+        return
+    stats.running.add(name)
+    sql_before = stats.sql_seconds
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if exclude_sql:
+            elapsed -= stats.sql_seconds - sql_before
+        setattr(stats, name, getattr(stats, name) + elapsed)
+        stats.running.discard(name)
+
+
+class InstrumentedViewMixin:
+    """
+    Measures the permission checks of a view (see `RequestMetricsMiddleware`).
+    """
+
+    def check_permissions(self, request):
+        with timed('permission_seconds'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timed('permission_seconds'):
+            super().check_object_permissions(request, obj)
+
+
+class TimedSerializerMixin:
+    """
+    Measures the serialization of the rows of a serializer (see `RequestMetricsMiddleware`),
+    the SQL queries made while serializing (a lazy queryset being evaluated) excluded.
+    """
+
+    @property
+    def data(self):
+        with timed('serialization_seconds', exclude_sql=True):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """
+    The `ListSerializer` of the serializers using `TimedSerializerMixin` (their Meta
+    `list_serializer_class`), measuring the serialization of `many=True` serializers.
+    """
+
+
+def get_view_labels(request):
+    """
+    Return the view name (the url name, e.g. `client-list`) and the action of the request.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched', request.method.lower()
+    actions = getattr(match.func, 'actions', None) or {}
+    return match.view_name or 'unnamed', actions.get(request.method.lower(), request.method.lower())
+
+
+def get_role(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    return role_of(user)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records, for every request: the view and the action served, the role of the user, the
+    number of SQL queries and the time spent in them, the time spent serializing and checking
+    the permissions, the duration and the size of the response.
+
+    The figures are logged as one JSON object per request (`epicEvents.requests` logger) and
+    observed in the histograms exposed by `/metrics`, labelled by view, action and role.
+    The SQL queries of the streamed responses (exports) are made after the view returned and
+    are not counted.
+
+    Sync and async capable: under ASGI the chain is served without adapting it to a thread,
+    the execute wrappers being installed on the connections of the thread the ORM queries of
+    the request run in (the thread of its `sync_to_async` calls).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not get_config()['ENABLED']:
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with self.wrap_connections(stats):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - start
+        view, action = get_view_labels(request)
+        if view != 'metrics':
+            self.record(request, response, stats, duration, view, action)
+        return response
+
+    async def __acall__(self, request):
+        if not get_config()['ENABLED']:
+            return await self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            wrapper = self.wrap_connections(stats)
+            await sync_to_async(wrapper.__enter__)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(wrapper.__exit__)(None, None, None)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - start
+        view, action = get_view_labels(request)
+        if view != 'metrics':
+            # The role of a user loaded from the database may query its groups.
+            await sync_to_async(self.record)(request, response, stats, duration, view, action)
+        return response
+
+    @staticmethod
+    @contextlib.contextmanager
+    def wrap_connections(stats):
+        """
+        Count the queries made on the connections of the current thread in `stats`.
+        """
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats.execute_wrapper))
+            yield
+
+    def record(self, request, response, stats, duration, view, action):
+        labels = {'view': view, 'action': action, 'role': get_role(request)}
+        size = None if response.streaming else len(response.content)
+
+        requests_total.inc(status=response.status_code, **labels)
+        request_seconds.observe(duration, **labels)
+        sql_queries.observe(stats.sql_queries, **labels)
+        sql_seconds.observe(stats.sql_seconds, **labels)
+        serialization_seconds.observe(stats.serialization_seconds, **labels)
+        permission_seconds.observe(stats.permission_seconds, **labels)
+        if size is not None:
+            response_bytes.observe(size, **labels)
+
+        if get_config()['LOG']:
+            user = getattr(request, 'user', None)
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                **labels,
+                'user_id': user.pk if user is not None and user.is_authenticated else None,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'sql_queries': stats.sql_queries,
+                'sql_ms': round(stats.sql_seconds * 1000, 2),
+                'serialization_ms': round(stats.serialization_seconds * 1000, 2),
+                'permission_ms': round(stats.permission_seconds * 1000, 2),
+                'response_bytes': size,
+            }))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from epicEvents import denormalization
+
+
+class Command(BaseCommand):
+    help = ('Fills the denormalized client columns of the events (the sales contact and the normalized '
+            'names and email of their client, see epicEvents/denormalization.py) by batches of events, '
+            'each in its own transaction. Run it before enabling EVENT_DENORMALIZATION, and after '
+            'changes made without signals (update(), raw SQL) while it is enabled.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Events compared per batch (default: EVENT_DENORMALIZATION["BATCH_SIZE"])')
+        parser.add_argument('--check', action='store_true',
+                            help='Only report the stale events, and exit with an error if there are any')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be positive')
+        if not denormalization.is_enabled():
+            self.stdout.write(self.style.WARNING(
+                'EVENT_DENORMALIZATION is disabled: the columns are neither read nor maintained'))
+
+        start = time.perf_counter()
+        checked = stale = 0
+        for batch_checked, batch_stale in denormalization.backfill(options['batch_size'], fix=not options['check']):
+            checked += batch_checked
+            stale += batch_stale
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{checked} events compared, {stale} stale')
+        elapsed = time.perf_counter() - start
+
+        if stale and options['check']:
+            raise CommandError(f'{stale} of {checked} event(s) have stale denormalized columns')
+        rate = checked / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} events compared in {elapsed:.2f}s ({rate:.0f} events/s), {stale} rewritten'))
@@ -0,0 +1,305 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from io import StringIO
+from itertools import count
+from pathlib import Path
+
+import django
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_databases, setup_test_environment,
+    teardown_databases, teardown_test_environment)
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from authentication.roles import COMMERCIAL, SUPPORT
+from authentication.tokens import RoleTokenObtainPairSerializer
+from epicEvents.filters import ClientFilterSet, ContractFilterSet, EventFilterSet, sample_filter_value
+from epicEvents.models import Client, Contract, Event
+
+# Arguments of the faker command for each dataset size.
+DATASETS = {
+    'small': {'clients': 20, 'contracts_per_client': 5, 'events_per_contract': 1},
+    'medium': {'clients': 100, 'contracts_per_client': 20, 'events_per_contract': 2},
+    'large': {'clients': 500, 'contracts_per_client': 40, 'events_per_contract': 2},
+}
+
+# The list endpoint of the model of each filterset.
+FILTERSET_URLS = {
+    ClientFilterSet: '/client/',
+    ContractFilterSet: '/contract/',
+    EventFilterSet: '/event/',
+}
+
+PASSWORD = 'benchmark-password'
+
+# Figures compared with the baseline, and whether they may grow by the tolerance.
+COMPARED = {'p50_ms': True, 'p95_ms': True, 'queries': False, 'peak_memory_kb': True}
+
+
+def percentile(values, percent):
+    """
+    Return the percentile of the values (nearest rank).
+    """
+    values = sorted(values)
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks the API hot paths (lists, filters, creations and /login/) through the DRF test '
+            'client on a test database seeded by the faker command, and writes the latency '
+            'percentiles, query counts and peak memory of every scenario to a JSON file. '
+            'With --baseline, the results are compared with a previous run and the command fails '
+            'on regressions. The test database is created and destroyed by the command, like the tests do.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=list(DATASETS), default='small',
+                            help='Size of the seeded dataset (default: small)')
+        parser.add_argument('--iterations', type=int, default=30,
+                            help='Timed requests per scenario (default: 30)')
+        parser.add_argument('--warmup', type=int, default=3,
+                            help='Untimed requests per scenario before the timed ones (default: 3)')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Seed of the fake data, the same seed gives the same dataset (default: 42)')
+        parser.add_argument('--scenario', dest='scenarios', action='append',
+                            help='Only run the scenarios whose name starts with this prefix, repeatable')
+        parser.add_argument('--output', default=None,
+                            help='JSON file the results are written to (default: benchmark-<size>.json)')
+        parser.add_argument('--baseline', default=None,
+                            help='JSON results of a previous run to compare with')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Relative growth of a latency or memory figure reported as a regression (default: 0.2)')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Write the results to the --baseline file instead of comparing')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the response cache enabled (lists are then served from the cache)')
+
+    def handle(self, *args, **options):
+        if options['iterations'] <= 0:
+            raise CommandError('--iterations must be positive')
+        if options['update_baseline'] and not options['baseline']:
+            raise CommandError('--update-baseline requires --baseline')
+        baseline = None
+        if options['baseline'] and not options['update_baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read the baseline {options['baseline']}: {e}")
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=False)
+        try:
+            overrides = {
+                'REQUEST_METRICS': {'ENABLED': False},
+                'RESPONSE_CACHE': {'ENABLED': options['with_cache']},
+            }
+            with override_settings(**overrides):
+                dataset = self.seed(options)
+                scenarios = self.run_scenarios(options)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=False)
+            teardown_test_environment()
+
+        results = {
+            'meta': {
+                'size': options['size'],
+                'dataset': dataset,
+                'iterations': options['iterations'],
+                'seed': options['seed'],
+                'response_cache': options['with_cache'],
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'date': timezone.now().isoformat(),
+            },
+            'scenarios': scenarios,
+        }
+        output = options['baseline'] if options['update_baseline'] else (
+            options['output'] or f"benchmark-{options['size']}.json")
+        Path(output).write_text(json.dumps(results, indent=2) + '\n')
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if baseline is not None:
+            regressions = self.compare(baseline, results, options['tolerance'], options['verbosity'])
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            self.stdout.write(self.style.SUCCESS('No regression against the baseline'))
+
+    def seed(self, options):
+        """
+        Create the users and the fake data of the dataset, and return the row counts.
+        """
+        commercial = Group.objects.get_or_create(name=COMMERCIAL)[0]
+        support = Group.objects.get_or_create(name=SUPPORT)[0]
+        for index in range(3):
+            user = User.objects.create_user(f'commercial{index}@bench.test', PASSWORD,
+                                            first_name='Commercial', last_name=str(index))
+            user.groups.add(commercial)
+            user = User.objects.create_user(f'support{index}@bench.test', PASSWORD,
+                                            first_name='Support', last_name=str(index))
+            user.groups.add(support)
+        User.objects.create_superuser('manager@bench.test', PASSWORD, first_name='Manager', last_name='0')
+
+        start = time.perf_counter()
+        call_command('faker', seed=options['seed'], stdout=StringIO(), **DATASETS[options['size']])
+        dataset = {
+            'clients': Client.objects.count(),
+            'contracts': Contract.objects.count(),
+            'events': Event.objects.count(),
+            'seed_seconds': round(time.perf_counter() - start, 2),
+        }
+        self.stdout.write(f"Seeded {dataset['clients']} clients, {dataset['contracts']} contracts "
+                          f"and {dataset['events']} events")
+        return dataset
+
+    def client_for(self, email):
+        user = User.objects.get(email=email)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleTokenObtainPairSerializer.get_token(user).access_token}')
+        return client, user
+
+    def get_scenarios(self):
+        """
+        Return the scenarios, as {name: callable sending a request and returning the response}.
+        """
+        commercial, commercial_user = self.client_for('commercial0@bench.test')
+        support, support_user = self.client_for('support0@bench.test')
+        manager, _ = self.client_for('manager@bench.test')
+        scenarios = {
+            'list.client.commercial': lambda: commercial.get('/client/'),
+            'list.contract.commercial': lambda: commercial.get('/contract/'),
+            'list.event.commercial': lambda: commercial.get('/event/'),
+            'list.event.support': lambda: support.get('/event/'),
+            'list.client.manager': lambda: manager.get('/client/'),
+            'list.event.manager': lambda: manager.get('/event/'),
+            'list.contract.page': lambda: commercial.get('/contract/?page_size=50'),
+        }
+
+        for filterset_class, url in FILTERSET_URLS.items():
+            for name, filter_ in filterset_class.base_filters.items():
+                value = sample_filter_value(filterset_class, name, filter_)
+                if value is not None:
+                    scenarios[f'filter.{url.strip("/")}.{name}'] = (
+                        lambda url=url, name=name, value=value: manager.get(url, {name: str(value)}))
+
+        contract = Contract.objects.filter(sales_contact=commercial_user, contract_status='signed').first()
+        emails = count()
+        scenarios['create.client'] = lambda: commercial.post('/client/', {
+            'first_name': 'Bench', 'last_name': 'Client', 'company_name': 'Bench',
+            'email': f'client{next(emails)}@bench.test', 'mobile': '0600000000', 'phone': '0100000000',
+            'sales_contact': commercial_user.pk}, format='json')
+        if contract is not None:
+            scenarios['create.contract'] = lambda: commercial.post('/contract/', {
+                'client': contract.client_id, 'sales_contact': commercial_user.pk, 'contract_status': 'signed',
+                'amount_due': 1000, 'payment_due_date': (date.today() + timedelta(days=30)).isoformat()},
+                format='json')
+            scenarios['create.event'] = lambda: commercial.post('/event/', {
+                'contract': contract.pk, 'client': contract.client_id, 'event_status': 1,
+                'attendee_number': 10, 'support_contact': support_user.pk,
+                'event_date': (date.today() + timedelta(days=60)).isoformat()}, format='json')
+
+        # The detail actions of every viewset, by the users allowed to update the row: their query
+        # counts cover the lookup and the object permissions.
+        client = Client.objects.filter(sales_contact=commercial_user).first()
+        event = Event.objects.filter(support_contact=support_user).first()
+        if client is not None:
+            scenarios['retrieve.client.commercial'] = lambda: commercial.get(f'/client/{client.pk}/')
+            scenarios['partial_update.client.commercial'] = lambda: commercial.patch(
+                f'/client/{client.pk}/', {'company_name': 'Bench'}, format='json')
+        if contract is not None:
+            scenarios['retrieve.contract.commercial'] = lambda: commercial.get(f'/contract/{contract.pk}/')
+            scenarios['partial_update.contract.commercial'] = lambda: commercial.patch(
+                f'/contract/{contract.pk}/', {'amount_due': contract.amount_due}, format='json')
+        if event is not None:
+            scenarios['retrieve.event.support'] = lambda: support.get(f'/event/{event.pk}/')
+            scenarios['retrieve.client.support'] = lambda: support.get(f'/client/{event.client_id}/')
+            scenarios['partial_update.event.support'] = lambda: support.patch(
+                f'/event/{event.pk}/', {'notes': 'Bench'}, format='json')
+        anonymous = APIClient()
+        scenarios['login'] = lambda: anonymous.post('/login/', {
+            'email': 'commercial0@bench.test', 'password': PASSWORD}, format='json')
+        return scenarios
+
+    def run_scenarios(self, options):
+        results = {}
+        for name, request in self.get_scenarios().items():
+            if options['scenarios'] and not any(name.startswith(prefix) for prefix in options['scenarios']):
+                continue
+            results[name] = self.run_scenario(name, request, options)
+            result = results[name]
+            self.stdout.write(f"{name}: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+                              f"p99 {result['p99_ms']} ms, {result['queries']} queries, "
+                              f"{result['peak_memory_kb']} KB peak")
+        return results
+
+    def run_scenario(self, name, request, options):
+        """
+        Run the scenario: warm-up requests, timed requests, then one request counting the
+        queries and one measuring the memory (both instrumentations slow the requests down).
+        """
+        for _ in range(options['warmup']):
+            response = request()
+            if response.status_code >= 400:
+                raise CommandError(f'{name} failed with a {response.status_code}: {response.content[:200]!r}')
+
+        durations = []
+        for _ in range(options['iterations']):
+            start = time.perf_counter()
+            request()
+            durations.append((time.perf_counter() - start) * 1000)
+
+        # The query log is reset when a request starts: start capturing from an empty log.
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            request()
+
+        tracemalloc.start()
+        try:
+            request()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'p50_ms': round(statistics.median(durations), 3),
+            'p90_ms': round(percentile(durations, 90), 3),
+            'p95_ms': round(percentile(durations, 95), 3),
+            'p99_ms': round(percentile(durations, 99), 3),
+            'mean_ms': round(statistics.mean(durations), 3),
+            'max_ms': round(max(durations), 3),
+            'queries': len(queries.captured_queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def compare(self, baseline, results, tolerance, verbosity=1):
+        """
+        Print the changes of every scenario against the baseline and return the regressions:
+        a latency or memory figure growing by more than the tolerance, or more queries.
+        """
+        if baseline.get('meta', {}).get('size') != results['meta']['size']:
+            self.stdout.write(self.style.WARNING('The baseline was run on another dataset size'))
+        regressions = []
+        for name, result in results['scenarios'].items():
+            previous = baseline.get('scenarios', {}).get(name)
+            if previous is None:
+                continue
+            for figure, tolerated in COMPARED.items():
+                if figure not in previous:
+                    continue
+                limit = previous[figure] * (1 + tolerance) if tolerated else previous[figure]
+                line = f'{name} {figure}: {previous[figure]} -> {result[figure]}'
+                if result[figure] > limit:
+                    regressions.append(f'{name} {figure}')
+                    self.stdout.write(self.style.ERROR(line))
+                elif verbosity > 1:
+                    self.stdout.write(line)
+        return regressions
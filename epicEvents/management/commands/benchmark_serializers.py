@@ -0,0 +1,92 @@
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from rest_framework.renderers import JSONRenderer
+
+from epicEvents.views import ClientViewset, ContractViewset, EventViewset
+
+VIEWSETS = {
+    'client': ClientViewset,
+    'contract': ContractViewset,
+    'event': EventViewset,
+}
+
+
+def fake_value(model_field, index):
+    """
+    Return a value of the model field for the row number `index`.
+    """
+    if model_field.is_relation or isinstance(model_field, (models.AutoField, models.IntegerField)):
+        return index + 1
+    if model_field.choices:
+        return model_field.choices[index % len(model_field.choices)][0]
+    if isinstance(model_field, models.EmailField):
+        return f'user{index}@example.com'
+    if isinstance(model_field, models.FloatField):
+        return index * 1.5
+    if isinstance(model_field, models.DateTimeField):
+        return datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=index)
+    if isinstance(model_field, models.DateField):
+        return date(2026, 1, 1) + timedelta(days=index % 365)
+    return f'{model_field.name} {index}'
+
+
+class Command(BaseCommand):
+    help = ('Compares the serialization of the client, contract and event lists by their serializer '
+            '(`many=True`, from model instances) and by their row serializer (from values_list() rows, '
+            'see epicEvents/row_serializers.py), on rows built in memory, and checks that both render '
+            'the same JSON. No database is needed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', dest='sizes', type=int, action='append',
+                            help='Number of rows serialized, repeatable (default: 10000 and 100000)')
+        parser.add_argument('--list', dest='lists', action='append', choices=list(VIEWSETS),
+                            help='List measured, repeatable (default: all of them)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs of each serialization, the fastest one is kept (default: 3)')
+
+    def handle(self, *args, **options):
+        if options['repeat'] <= 0:
+            raise CommandError('--repeat must be positive')
+        for name in options['lists'] or list(VIEWSETS):
+            row_serializer = VIEWSETS[name].row_serializer
+            if row_serializer.compiled is None:
+                raise CommandError(f'The {name} serializer is not supported by its row serializer')
+            for size in options['sizes'] or [10000, 100000]:
+                instances, rows = self.build(row_serializer, size)
+                slow, slow_json = self.measure(
+                    lambda: row_serializer.serializer_class(instances, many=True).data, options['repeat'])
+                fast, fast_json = self.measure(lambda: row_serializer.serialize(rows), options['repeat'])
+                if slow_json != fast_json:
+                    raise CommandError(f'{name}: the row serializer renders another JSON than the serializer')
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}, {size} rows: serializer {slow * 1000:.0f} ms ({size / slow:.0f} rows/s), '
+                    f'row serializer {fast * 1000:.0f} ms ({size / fast:.0f} rows/s), {slow / fast:.1f}x faster'))
+
+    def build(self, row_serializer, size):
+        """
+        Return `size` model instances and the same rows as loaded by the row serializer.
+        """
+        model = row_serializer.serializer_class.Meta.model
+        opts = model._meta
+        fields = [field for field in opts.concrete_fields]
+        instances = [model(**{field.attname: fake_value(field, index) for field in fields})
+                     for index in range(size)]
+        attnames = ['pk' if column == 'pk' else opts.get_field(column).attname
+                    for column in row_serializer.compiled[1]]
+        rows = [tuple(getattr(instance, attname) for attname in attnames) for instance in instances]
+        return instances, rows
+
+    def measure(self, serialize, repeat):
+        """
+        Return the duration of the fastest serialization and its JSON rendering.
+        """
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = serialize()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, JSONRenderer().render(data)
@@ -0,0 +1,120 @@
+import datetime
+import decimal
+import json
+import time
+import uuid
+from collections import OrderedDict
+from zoneinfo import ZoneInfo
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from epicEvents.models import Client, Contract, Event
+from epicEvents.serializers import ClientSerializer, ContractSerializer, EventSerializer
+from utils.renderers import ORJSONRenderer, encode, orjson
+
+# Values covering what the API renders: the types of the model fields and of the error responses.
+CORPUS = {
+    'empty': {},
+    'none': None,
+    'booleans': [True, False, None],
+    'integers': [0, -1, 2 ** 31, 2 ** 63 - 1, 2 ** 64],
+    'floats': [0.0, -0.0, 0.1, 10.5, 1 / 3, 123456789.123, 5e-324, 1.5e300, 1e16, 1e-7],
+    'decimals': [decimal.Decimal('1.10'), decimal.Decimal('-0.001')],
+    'strings': ['', 'plain', 'quote " backslash \\ slash / <b>', 'accents éàü', 'emoji \U0001F389',
+                'controls \x00\x01\x1f\x7f', 'separators \u2028\u2029', 'tab\tnewline\n'],
+    'dates': [datetime.date(2026, 1, 2), datetime.date(1, 1, 1)],
+    'datetimes': [
+        datetime.datetime(2026, 1, 1, 1, 2, 3),
+        datetime.datetime(2026, 1, 1, 1, 2, 3, 45),
+        datetime.datetime(2026, 1, 1, 1, 2, 3, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2026, 1, 1, 1, 2, 3, 500, tzinfo=ZoneInfo('UTC')),
+        datetime.datetime(2026, 7, 1, 1, 2, 3, tzinfo=ZoneInfo('Europe/Paris')),
+        datetime.datetime(2026, 1, 1, 1, 2, 3, tzinfo=ZoneInfo('Europe/London')),
+    ],
+    'times': [datetime.time(1, 2, 3), datetime.time(1, 2, 3, 4)],
+    'uuid': uuid.UUID(int=5),
+    'keys': {1: 'int', 2.5: 'float', None: 'none', 'str': 'str'},
+    'ordered': OrderedDict([('b', 1), ('a', 2)]),
+    'return_types': ReturnDict({'results': ReturnList([{'id': 1}], serializer=None)}, serializer=None),
+    'errors': {'email': [ErrorDetail('client with this email already exists.', code='unique')],
+               'detail': gettext_lazy('Not found.')},
+    'tuple': (1, 'a'),
+    'nested': [[[{'deep': [1.5, None]}]]],
+}
+
+
+class Command(BaseCommand):
+    help = ('Compares the JSON rendered by the API renderer (`ORJSONRenderer`) with DRF\'s `JSONRenderer` on '
+            'a corpus of values covering the model fields and the error responses, and on the serialized '
+            'rows of the client, contract and event lists of the database. Fails when a rendering differs; '
+            'renderings of the same JSON value written otherwise (float exponents) are listed as equivalent.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Rows of each list rendered from the database, 0 to skip them (default: 1000)')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed: the API renders with the stdlib encoder'))
+        cases = dict(CORPUS)
+        if options['rows']:
+            for serializer_class, model in ((ClientSerializer, Client), (ContractSerializer, Contract),
+                                            (EventSerializer, Event)):
+                rows = model.objects.order_by('pk')[:options['rows']]
+                cases[f'{model._meta.model_name} list'] = serializer_class(rows, many=True).data
+
+        different = []
+        for name, data in cases.items():
+            result = self.compare(data)
+            if result == 'different':
+                different.append(name)
+                self.stdout.write(self.style.ERROR(f'{name}: different'))
+            elif result == 'equivalent':
+                self.stdout.write(self.style.WARNING(f'{name}: equivalent (same JSON value, other bytes)'))
+            elif options['verbosity'] > 1:
+                self.stdout.write(f'{name}: identical')
+        if different:
+            raise CommandError(f"{len(different)} rendering(s) differ: {', '.join(different)}")
+
+        for name in [name for name in cases if name.endswith(' list')]:
+            self.report_speed(name, cases[name])
+        self.stdout.write(self.style.SUCCESS(f'{len(cases)} renderings checked'))
+
+    def compare(self, data):
+        """
+        Return 'identical', 'equivalent' or 'different': the renderings of both renderers, the
+        pre-encoded one included, and the errors they raise are compared.
+        """
+        try:
+            expected = JSONRenderer().render(data)
+        except (TypeError, ValueError) as e:
+            expected = type(e)
+        try:
+            rendered = ORJSONRenderer().render(data)
+            pre_encoded = ORJSONRenderer().render(encode(data))
+        except (TypeError, ValueError) as e:
+            rendered = pre_encoded = type(e)
+        if rendered != pre_encoded:
+            return 'different'
+        if rendered == expected:
+            return 'identical'
+        if isinstance(expected, bytes) and isinstance(rendered, bytes) and json.loads(expected) == json.loads(rendered):
+            return 'equivalent'
+        return 'different'
+
+    def report_speed(self, name, data, repeat=5):
+        timings = []
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                renderer.render(data)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+        self.stdout.write(f'{name} ({len(data)} rows): JSONRenderer {timings[0] * 1000:.1f} ms, '
+                          f'ORJSONRenderer {timings[1] * 1000:.1f} ms, {timings[0] / timings[1]:.1f}x faster')
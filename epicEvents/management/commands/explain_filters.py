@@ -0,0 +1,63 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from epicEvents.filters import ClientFilterSet, ContractFilterSet, EventFilterSet, sample_filter_value
+
+# Lines of the query plan showing a full table scan, per database vendor.
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on "?(\w+)"?'),
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING)'),
+}
+
+
+class Command(BaseCommand):
+    help = ('Runs EXPLAIN on every filter of epicEvents/filters.py against the data of the database '
+            'and flags the filters whose plan scans a whole table. Run it on seeded data '
+            '(see the faker command): the planner scans small tables whatever the indexes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run EXPLAIN ANALYZE (PostgreSQL), which executes the queries')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print the full plan of every filter')
+        parser.add_argument('--fail-on-seq-scan', action='store_true',
+                            help='Exit with an error if a filter scans a whole table')
+
+    def explain(self, queryset, analyze):
+        if analyze and connection.vendor == 'postgresql':
+            return queryset.explain(analyze=True)
+        return queryset.explain()
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'Unsupported database vendor: {connection.vendor}')
+
+        flagged = []
+        for filterset_class in (ClientFilterSet, ContractFilterSet, EventFilterSet):
+            model = filterset_class._meta.model
+            for name, filter_ in filterset_class.base_filters.items():
+                label = f'{filterset_class.__name__}.{name}'
+                value = sample_filter_value(filterset_class, name, filter_)
+                if value is None:
+                    self.stdout.write(self.style.WARNING(f'{label}: skipped, no data to filter on'))
+                    continue
+                filterset = filterset_class(data={name: str(value)}, queryset=model.objects.all())
+                if not filterset.is_valid():
+                    self.stdout.write(self.style.WARNING(f'{label}: skipped, invalid sample {value!r}'))
+                    continue
+                plan = self.explain(filterset.qs, options['analyze'])
+                scanned = sorted(set(pattern.findall(plan)))
+                if scanned:
+                    flagged.append(label)
+                    self.stdout.write(self.style.ERROR(
+                        f"{label}={value!r}: sequential scan on {', '.join(scanned)}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{label}={value!r}: index scan'))
+                if options['verbose_plans']:
+                    self.stdout.write(plan)
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f"{len(flagged)} filter(s) scan a whole table: {', '.join(flagged)}")
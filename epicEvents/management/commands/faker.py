@@ -1,8 +1,48 @@
-from django.core.management.base import BaseCommand
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from epicEvents import denormalization, rollups
 from utils.faker import generate_fake_data
+
+
 class Command(BaseCommand):
-    help = 'Prints a message to the console'
+    help = 'Creates fake clients, contracts and events for the existing commercial and support users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=25,
+                            help='Number of clients to create (default: 25)')
+        parser.add_argument('--contracts-per-client', type=int, default=50,
+                            help='Number of contracts created for each client (default: 50)')
+        parser.add_argument('--events-per-contract', type=int, default=2,
+                            help='Number of events created for each contract (default: 2)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of contracts written per transaction (default: 1000)')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Seed of the random generators, to generate the same data again')
+        parser.add_argument('--copy', action='store_true',
+                            help='Write the rows with PostgreSQL COPY instead of INSERT')
 
     def handle(self, *args, **options):
-        generate_fake_data()
-        self.stdout.write(self.style.SUCCESS('create fake data'))
\ No newline at end of file
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be positive')
+        try:
+            counts = generate_fake_data(
+                clients=options['clients'],
+                contracts_per_client=options['contracts_per_client'],
+                events_per_contract=options['events_per_contract'],
+                batch_size=options['batch_size'],
+                seed=options['seed'],
+                use_copy=options['copy'],
+                stdout=self.stdout if options['verbosity'] > 1 else None,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"create fake data: {counts['clients']} clients, {counts['contracts']} contracts, "
+            f"{counts['events']} events in {counts['seconds']:.2f}s "
+            f"({counts['rows_per_second']:.0f} rows/s)"))
+        if rollups.is_enabled():
+            # bulk_create sends no signal: rebuild the rollups of the new rows.
+            call_command('refresh_rollups', stdout=self.stdout, verbosity=options['verbosity'])
+        if denormalization.is_enabled():
+            # Nor any pre_save signal: fill the denormalized columns of the new events.
+            call_command('backfill_event_denormalization', stdout=self.stdout, verbosity=options['verbosity'])
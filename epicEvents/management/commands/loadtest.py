@@ -0,0 +1,101 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib import error, request
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import User
+from authentication.tokens import RoleTokenObtainPairSerializer
+
+DEFAULT_PATHS = ['client/', 'contract/', 'event/']
+
+
+def percentile(durations, percent):
+    """
+    Return the percentile of the sorted durations (nearest rank).
+    """
+    if not durations:
+        return 0
+    index = max(0, min(len(durations) - 1, round(percent / 100 * len(durations)) - 1))
+    return durations[index]
+
+
+class Command(BaseCommand):
+    help = ('Compares the read endpoints served by the WSGI stack (`/client/`...) and their '
+            'async versions served by the ASGI stack (`/async/client/`...) under concurrent '
+            'load: requests per second, median and 99th percentile latencies. Both servers '
+            'must be running against the same database, e.g. '
+            '`gunicorn _setup.wsgi -w 4 --threads 8 -b :8000` and '
+            '`uvicorn _setup.asgi:application --workers 4 --port 8001`.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000',
+                            help='Base url of the WSGI server')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001',
+                            help='Base url of the ASGI server')
+        parser.add_argument('--user', required=True,
+                            help='Email of the user the requests are authenticated as')
+        parser.add_argument('--path', dest='paths', action='append',
+                            help=f'Path requested, repeatable (default: {" ".join(DEFAULT_PATHS)})')
+        parser.add_argument('--concurrency', type=int, default=50,
+                            help='Number of requests in flight')
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Number of requests sent to each server, per path')
+        parser.add_argument('--timeout', type=float, default=30,
+                            help='Timeout of a request, in seconds')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['user']}")
+        token = str(RoleTokenObtainPairSerializer.get_token(user).access_token)
+
+        for path in options['paths'] or DEFAULT_PATHS:
+            path = path.lstrip('/')
+            for label, url in (('wsgi', f"{options['wsgi_url'].rstrip('/')}/{path}"),
+                               ('asgi', f"{options['asgi_url'].rstrip('/')}/async/{path}")):
+                self.report(label, path, self.run(url, token, options))
+
+    def run(self, url, token, options):
+        """
+        Send the requests with `concurrency` threads and return the results.
+        """
+        headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json'}
+
+        def send(_):
+            start = time.perf_counter()
+            try:
+                with request.urlopen(request.Request(url, headers=headers), timeout=options['timeout']) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (error.URLError, OSError):
+                ok = False
+            return time.perf_counter() - start, ok
+
+        # Warm up the connections, the workers and the caches of the server.
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            list(executor.map(send, range(options['concurrency'])))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(send, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+
+        durations = sorted(duration for duration, ok in results if ok)
+        return {
+            'requests': len(results),
+            'errors': sum(1 for _, ok in results if not ok),
+            'rps': len(durations) / elapsed if elapsed else 0,
+            'p50': statistics.median(durations) if durations else 0,
+            'p99': percentile(durations, 99),
+        }
+
+    def report(self, label, path, results):
+        line = (f"{label} /{path}: {results['rps']:.1f} req/s, "
+                f"p50 {results['p50'] * 1000:.1f} ms, p99 {results['p99'] * 1000:.1f} ms")
+        if results['errors']:
+            self.stdout.write(self.style.WARNING(f"{line} ({results['errors']}/{results['requests']} errors)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(line))
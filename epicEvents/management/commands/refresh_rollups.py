@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from epicEvents.models import Contract, Event
+from epicEvents.rollups import reconcile
+
+
+class Command(BaseCommand):
+    help = ('Reconciles the rollups (ContractRollup, EventRollup) with the contracts and events: '
+            'the rows that differ are rewritten from the base tables. The rollups are maintained '
+            'by the save and delete signals, run this command periodically to catch the changes '
+            'made without signals (bulk inserts, update(), raw SQL).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', default=None,
+                            help='Only reconcile the rows from this day on (YYYY-MM-DD)')
+        parser.add_argument('--check', action='store_true',
+                            help='Only report the differences, and exit with an error if there are any')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid date: {options['since']}")
+
+        total = 0
+        for model in (Contract, Event):
+            differences = reconcile(model, since=since, fix=not options['check'])
+            total += len(differences)
+            label = f'{model.__name__} rollup'
+            if not differences:
+                self.stdout.write(self.style.SUCCESS(f'{label}: up to date'))
+                continue
+            self.stdout.write(self.style.WARNING(f'{label}: {len(differences)} row(s) differ'))
+            if options['verbosity'] > 1:
+                for key, expected, actual in differences:
+                    self.stdout.write(f'  {key}: expected {expected}, found {actual}')
+
+        if total and options['check']:
+            raise CommandError(f'{total} rollup row(s) differ from the base tables')
+        if total:
+            self.stdout.write(self.style.SUCCESS(f'{total} rollup row(s) refreshed'))
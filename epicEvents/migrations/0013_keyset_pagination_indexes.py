@@ -0,0 +1,40 @@
+# Generated by Django 4.1.5 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("epicEvents", "0012_alter_client_sales_contact_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                fields=["sales_contact", "-date_created", "-id"],
+                name="client_sales_keyset_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(
+                fields=["sales_contact", "-date_created", "-id"],
+                name="contract_sales_keyset_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["support_contact", "-date_created", "-id"],
+                name="event_support_keyset_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["client", "-date_created", "-id"],
+                name="event_client_keyset_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.1.5 on 2026-10-18 10:05
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+import django.db.models.functions.text
+
+from utils.migrations import RunSQLOnPostgreSQL
+
+
+def trigram_index(table, column):
+    """
+    A GIN trigram index on UPPER(column), used by the icontains lookups of the filters
+    (Django compiles them to `UPPER(column::text) LIKE UPPER('%value%')`).
+    """
+    name = f"{table.lower()}_{column}_trgm_idx"
+    return RunSQLOnPostgreSQL(
+        sql=f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin (UPPER("{column}") gin_trgm_ops)',
+        reverse_sql=f'DROP INDEX IF EXISTS "{name}"',
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("epicEvents", "0013_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        trigram_index("epicEvents_client", "first_name"),
+        trigram_index("epicEvents_client", "last_name"),
+        trigram_index("epicEvents_client", "email"),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                django.db.models.functions.text.Upper("last_name"),
+                name="client_upper_last_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                django.db.models.functions.text.Upper("email"),
+                name="client_upper_email_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(
+                fields=["date_created"], name="contract_date_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(
+                fields=["payment_due_date"], name="contract_payment_due_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(fields=["amount_due"], name="contract_amount_due_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["event_date"], name="event_event_date_idx"),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.1.5 on 2026-10-18 11:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from utils.migrations import RunSQLOnPostgreSQL
+
+# The vectors use the 'simple' configuration (no stemming, no stop words): names, companies
+# and emails must be found as typed. Keep it in sync with epicEvents.search.SEARCH_CONFIG.
+CLIENT_TRIGGER = """
+CREATE OR REPLACE FUNCTION epicevents_client_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.first_name, '') || ' ' || coalesce(NEW.last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.company_name, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.email, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER epicevents_client_search_vector_trg
+    BEFORE INSERT OR UPDATE ON "epicEvents_client"
+    FOR EACH ROW EXECUTE PROCEDURE epicevents_client_search_vector();
+
+UPDATE "epicEvents_client" SET search_vector = NULL;
+"""
+
+EVENT_TRIGGER = """
+CREATE OR REPLACE FUNCTION epicevents_event_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := to_tsvector('simple', coalesce(NEW.notes, ''));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER epicevents_event_search_vector_trg
+    BEFORE INSERT OR UPDATE ON "epicEvents_event"
+    FOR EACH ROW EXECUTE PROCEDURE epicevents_event_search_vector();
+
+UPDATE "epicEvents_event" SET search_vector = NULL;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("epicEvents", "0014_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="client",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        RunSQLOnPostgreSQL(
+            sql=CLIENT_TRIGGER,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS epicevents_client_search_vector_trg ON "epicEvents_client";
+                DROP FUNCTION IF EXISTS epicevents_client_search_vector();
+            """,
+        ),
+        RunSQLOnPostgreSQL(
+            sql=EVENT_TRIGGER,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS epicevents_event_search_vector_trg ON "epicEvents_event";
+                DROP FUNCTION IF EXISTS epicevents_event_search_vector();
+            """,
+        ),
+        RunSQLOnPostgreSQL(
+            sql='CREATE INDEX IF NOT EXISTS "epicevents_client_search_idx" '
+                'ON "epicEvents_client" USING gin (search_vector)',
+            reverse_sql='DROP INDEX IF EXISTS "epicevents_client_search_idx"',
+        ),
+        RunSQLOnPostgreSQL(
+            sql='CREATE INDEX IF NOT EXISTS "epicevents_event_search_idx" '
+                'ON "epicEvents_event" USING gin (search_vector)',
+            reverse_sql='DROP INDEX IF EXISTS "epicevents_event_search_idx"',
+        ),
+    ]
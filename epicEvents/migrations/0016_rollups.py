@@ -0,0 +1,147 @@
+# Generated by Django 4.1.5 on 2026-10-18 11:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_rollups(apps, schema_editor):
+    """
+    Fill the rollups from the existing contracts and events (see epicEvents/rollups.py).
+    """
+    Contract = apps.get_model("epicEvents", "Contract")
+    Event = apps.get_model("epicEvents", "Event")
+    ContractRollup = apps.get_model("epicEvents", "ContractRollup")
+    EventRollup = apps.get_model("epicEvents", "EventRollup")
+    ContractRollup.objects.bulk_create(
+        [
+            ContractRollup(**row)
+            for row in Contract.objects.annotate(day=TruncDate("date_created"))
+            .values("day", "sales_contact_id", "contract_status")
+            .annotate(contracts=Count("id"), amount_due=Sum("amount_due"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+    EventRollup.objects.bulk_create(
+        [
+            EventRollup(**row)
+            for row in Event.objects.values(
+                "event_date", "support_contact_id", "event_status_id"
+            )
+            .annotate(events=Count("id"), attendees=Sum("attendee_number"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("epicEvents", "0015_search_vectors"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContractRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "contract_status",
+                    models.CharField(
+                        choices=[
+                            ("negotiation", "Contract in Negotiation"),
+                            ("signed", "Contract is signed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("contracts", models.IntegerField(default=0)),
+                ("amount_due", models.FloatField(default=0)),
+                (
+                    "sales_contact",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="EventRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_date", models.DateField()),
+                ("events", models.IntegerField(default=0)),
+                ("attendees", models.IntegerField(default=0)),
+                (
+                    "event_status",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="epicEvents.eventstatus",
+                    ),
+                ),
+                (
+                    "support_contact",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="contractrollup",
+            index=models.Index(
+                fields=["sales_contact", "day"], name="contract_rollup_sales_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="contractrollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "sales_contact", "contract_status"),
+                name="contract_rollup_key",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventrollup",
+            index=models.Index(
+                fields=["support_contact", "event_date"],
+                name="event_rollup_support_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="eventrollup",
+            constraint=models.UniqueConstraint(
+                fields=("event_date", "support_contact", "event_status"),
+                name="event_rollup_key",
+            ),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("epicEvents", "0016_rollups"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["support_contact", "client"], name="event_support_client_idx"
+            ),
+        ),
+    ]
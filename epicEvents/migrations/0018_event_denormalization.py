@@ -0,0 +1,59 @@
+# Generated by Django 4.1.5 on 2026-10-18 16:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # The columns are filled by `manage.py backfill_event_denormalization`, in batches.
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("epicEvents", "0017_event_support_client_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="client_sales_contact",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="client_name_key",
+            field=models.CharField(editable=False, max_length=128, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="client_email_key",
+            field=models.CharField(editable=False, max_length=128, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["client_sales_contact", "-date_created", "-id"],
+                name="event_sales_keyset_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["client_sales_contact", "event_date"],
+                name="event_sales_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["support_contact", "event_date"], name="event_support_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.5 on 2026-10-18 19:10
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """
+    Create the table of the replica routing cache (REPLICA_ROUTING['CACHE']), and of any other
+    database cache of the settings missing from the database.
+    """
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("epicEvents", "0018_event_denormalization"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
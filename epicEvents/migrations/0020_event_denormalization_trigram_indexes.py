@@ -0,0 +1,29 @@
+# Generated by Django 4.1.5 on 2026-10-18 19:40
+
+from django.db import migrations
+
+from utils.migrations import RunSQLOnPostgreSQL
+
+
+def trigram_index(table, column):
+    """
+    A GIN trigram index on the column, used by the `contains` and `endswith` lookups of the event
+    filters on the denormalized keys (`column::text LIKE '%value%'`), which no btree index serves.
+    The keys are stored in lower case, so the column itself is indexed.
+    """
+    name = f"{table.lower()}_{column}_trgm_idx"
+    return RunSQLOnPostgreSQL(
+        sql=f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ("{column}" gin_trgm_ops)',
+        reverse_sql=f'DROP INDEX IF EXISTS "{name}"',
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("epicEvents", "0019_replica_routing_cache"),
+    ]
+
+    operations = [
+        trigram_index("epicEvents_event", "client_name_key"),
+        trigram_index("epicEvents_event", "client_email_key"),
+    ]
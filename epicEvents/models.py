@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 
 # Create your models here.
 
@@ -25,6 +27,18 @@ class Client(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, limit_choices_to={'groups__name': 'commercial'})
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger on PostgreSQL, see migration 0015 and epicEvents/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sales_contact', '-date_created', '-id'],
+                         name='client_sales_keyset_idx'),
+            # iexact lookups compare UPPER(column), see epicEvents/filters.py.
+            # The icontains lookups use the trigram indexes of migration 0014 (PostgreSQL only).
+            models.Index(Upper('last_name'), name='client_upper_last_name_idx'),
+            models.Index(Upper('email'), name='client_upper_email_idx'),
+        ]
 
     def full_name(self):
         """
@@ -71,6 +85,15 @@ class Contract(models.Model):
     amount_due = models.FloatField()
     payment_due_date = models.DateField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['sales_contact', '-date_created', '-id'],
+                         name='contract_sales_keyset_idx'),
+            models.Index(fields=['date_created'], name='contract_date_created_idx'),
+            models.Index(fields=['payment_due_date'], name='contract_payment_due_idx'),
+            models.Index(fields=['amount_due'], name='contract_amount_due_idx'),
+        ]
+
     def __str__(self):
         """
         Returns a string representation of the contract, including its ID, associated client,
@@ -132,6 +155,10 @@ class Event(models.Model):
         attendee_number (IntegerField): The number of attendees expected at the event.
         event_date (DateField): The date of the event.
         notes (CharField): Additional notes about the event.
+        search_vector (SearchVectorField): The full-text search vector of the notes.
+        client_sales_contact (ForeignKey): Copy of the sales contact of the client.
+        client_name_key (CharField): The normalized first and last names of the client.
+        client_email_key (CharField): The normalized email of the client.
 
     Methods:
         __str__(): Returns a string representation of the event object.
@@ -147,6 +174,34 @@ class Event(models.Model):
     attendee_number = models.IntegerField()
     event_date = models.DateField()
     notes = models.CharField(max_length=500, blank=True, null=True)
+    # Maintained by a database trigger on PostgreSQL, see migration 0015 and epicEvents/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Copies of columns of the client, filtered without joining it when EVENT_DENORMALIZATION is
+    # enabled: maintained by the save signals, filled by `manage.py backfill_event_denormalization`
+    # (see epicEvents/denormalization.py). No database constraint: the client keeps it consistent,
+    # and no index of its own: the indexes of the Meta start with it.
+    client_sales_contact = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+',
+        null=True, editable=False, db_index=False)
+    client_name_key = models.CharField(max_length=128, null=True, editable=False)
+    client_email_key = models.CharField(max_length=128, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['support_contact', '-date_created', '-id'],
+                         name='event_support_keyset_idx'),
+            models.Index(fields=['client', '-date_created', '-id'],
+                         name='event_client_keyset_idx'),
+            models.Index(fields=['event_date'], name='event_event_date_idx'),
+            # The EXISTS subquery scoping the clients of a support user, see epicEvents/scoping.py.
+            models.Index(fields=['support_contact', 'client'], name='event_support_client_idx'),
+            # The event lists of the commercial and support users, read from the denormalized
+            # columns, and their event_date filter.
+            models.Index(fields=['client_sales_contact', '-date_created', '-id'],
+                         name='event_sales_keyset_idx'),
+            models.Index(fields=['client_sales_contact', 'event_date'], name='event_sales_date_idx'),
+            models.Index(fields=['support_contact', 'event_date'], name='event_support_date_idx'),
+        ]
 
     def __str__(self):
         """
@@ -157,3 +212,70 @@ class Event(models.Model):
             the event date, and the current event status.
         """
         return f"Event: {str(self.contract.client)}, Event date: {self.event_date}, {self.event_status}"
+
+
+# The rollups are summary tables maintained by epicEvents/rollups.py, DO NOT EDIT THEM BY HAND.
+# Their foreign keys have no database constraint: a rollup row may outlive the user or the
+# status it counts until the next refresh_rollups.
+
+class ContractRollup(models.Model):
+    """
+    The number and the amount of the contracts created on a day, per sales contact and contract status.
+
+    Attributes:
+        day (DateField): The day the contracts were created on (UTC).
+        sales_contact (ForeignKey): The sales contact of the contracts.
+        contract_status (CharField): The status of the contracts.
+        contracts (IntegerField): The number of contracts.
+        amount_due (FloatField): The sum of the amount due of the contracts.
+    """
+    day = models.DateField()
+    sales_contact = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    contract_status = models.CharField(max_length=20, choices=Contract.CONTRACT_STATUS_CHOICES)
+    contracts = models.IntegerField(default=0)
+    amount_due = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'sales_contact', 'contract_status'],
+                                    name='contract_rollup_key'),
+        ]
+        indexes = [
+            models.Index(fields=['sales_contact', 'day'], name='contract_rollup_sales_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.sales_contact_id} {self.contract_status}: {self.contracts} contracts"
+
+
+class EventRollup(models.Model):
+    """
+    The number of events and attendees on an event date, per support contact and event status.
+
+    Attributes:
+        event_date (DateField): The date of the events.
+        support_contact (ForeignKey): The support contact of the events.
+        event_status (ForeignKey): The status of the events.
+        events (IntegerField): The number of events.
+        attendees (IntegerField): The sum of the attendee number of the events.
+    """
+    event_date = models.DateField()
+    support_contact = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    event_status = models.ForeignKey(
+        EventStatus, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    events = models.IntegerField(default=0)
+    attendees = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event_date', 'support_contact', 'event_status'],
+                                    name='event_rollup_key'),
+        ]
+        indexes = [
+            models.Index(fields=['support_contact', 'event_date'], name='event_rollup_support_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_date} {self.support_contact_id} {self.event_status_id}: {self.events} events"
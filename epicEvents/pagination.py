@@ -0,0 +1,203 @@
+import base64
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination ordered on `(date_created, id)`, newest first.
+
+    The pagination only kicks in when the request carries a `cursor` or a `page_size`
+    query parameter, so clients that expect the full list keep receiving it unchanged.
+    Each page is fetched with a `WHERE (date_created, id) < (cursor)` condition instead
+    of an OFFSET, which keeps the cost of a page constant however deep the client pages.
+
+    The cursor is an opaque base64 string that encodes the `date_created` and `id` of the
+    boundary row and the paging direction.
+
+    Examples:
+    To get the first 20 contracts, use:
+        /contract/?page_size=20
+
+    Then follow the `next` and `previous` links returned with each page.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = api_settings.PAGE_SIZE or 100
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        """
+        Return True if the client asked for a paginated response.
+        """
+        return (self.cursor_query_param in request.query_params or
+                self.page_size_query_param in request.query_params)
+
+    def get_page_size(self, request):
+        """
+        Return the page size requested by the client, bounded by `max_page_size`.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return a single page of the queryset, or None if pagination was not requested.
+
+        Args:
+            queryset: The (already scoped and filtered) queryset to paginate.
+            request: The request object.
+            view: The view that is being accessed.
+
+        Returns:
+            A list with the rows of the requested page, or None.
+        """
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async version of `paginate_queryset`, for the async views.
+        """
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the (unevaluated) queryset of the requested page, plus one row telling whether
+        another page follows, or None if pagination was not requested.
+        """
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            date_created, pk, reverse = None, None, False
+        else:
+            date_created, pk, reverse = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by('date_created', 'id')
+        else:
+            queryset = queryset.order_by('-date_created', '-id')
+
+        if date_created is not None:
+            if reverse:
+                queryset = queryset.filter(
+                    Q(date_created__gt=date_created) |
+                    Q(date_created=date_created, id__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(date_created__lt=date_created) |
+                    Q(date_created=date_created, id__lt=pk)
+                )
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Keep the rows of the page loaded from `get_page_queryset` and return them.
+        """
+        date_created = self.cursor[0] if self.cursor is not None else None
+        reverse = self.cursor is not None and self.cursor[2]
+        has_following = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next = date_created is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = date_created is not None
+        return self.page
+
+    def get_next_link(self):
+        """
+        Return the url of the next page, or None on the last page.
+        """
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        return self.encode_cursor(last.date_created, last.pk, reverse=False)
+
+    def get_previous_link(self):
+        """
+        Return the url of the previous page, or None on the first page.
+        """
+        if not self.has_previous or not self.page:
+            return None
+        first = self.page[0]
+        return self.encode_cursor(first.date_created, first.pk, reverse=True)
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor query parameter into a `(date_created, id, reverse)` tuple.
+
+        Raises:
+            NotFound: If the cursor cannot be decoded.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            querystring = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            date_created = parse_datetime(tokens['d'][0])
+            pk = int(tokens['i'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if date_created is None:
+            raise NotFound(self.invalid_cursor_message)
+        return date_created, pk, reverse
+
+    def encode_cursor(self, date_created, pk, reverse):
+        """
+        Return the current url with the cursor query parameter set to the given position.
+        """
+        tokens = OrderedDict([('d', date_created.isoformat()), ('i', pk)])
+        if reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = base64.urlsafe_b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
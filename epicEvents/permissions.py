@@ -2,6 +2,31 @@ from rest_framework import permissions
 from django.core.exceptions import PermissionDenied
 from authentication.models import User
 from epicEvents.models import Client, Contract, Event
+from epicEvents.scoping import ain_view_scope, in_view_scope
+
+
+class AsyncPermissionMixin:
+    """
+    Makes a permission class usable by the async views (see `epicEvents.async_views`).
+
+    The role checks of the permission classes (`is_commercial()`, `is_support()`) read the
+    groups of the user, which must not be queried synchronously from an async view: the
+    groups are loaded once with the async ORM (`agroup_names()`), after which the synchronous
+    checks are answered from memory.
+    """
+
+    async def ahas_permission(self, request, view):
+        if request.user is not None:
+            await request.user.agroup_names()
+        return self.has_permission(request, view)
+
+    async def ahas_object_permission(self, request, view, obj):
+        if request.user is not None:
+            await request.user.agroup_names()
+        if request.method in permissions.SAFE_METHODS:
+            # Checking the scope of the user may take a query (see epicEvents/scoping.py).
+            return await ain_view_scope(view, obj, request.user)
+        return self.has_object_permission(request, view, obj)
 
 
 class EventPermission(permissions.BasePermission):
@@ -27,7 +52,7 @@ class EventPermission(permissions.BasePermission):
         if user.is_superuser:
             return True
         if user.is_commercial() or user.is_support():
-            if view.action in ['list', 'retrieve']:
+            if view.action in ['list', 'retrieve', 'export']:
                 return True
             if view.action == 'destroy':
                 if user.is_superuser:
@@ -44,6 +69,9 @@ class EventPermission(permissions.BasePermission):
                     return True
                 else:
                     return False
+            if view.action == 'bulk':
+                # Commercial users create events and support users update theirs, see EventViewset.
+                return True
         else:
             return False
 
@@ -62,10 +90,11 @@ class EventPermission(permissions.BasePermission):
         user = request.user
 
         if request.method in permissions.SAFE_METHODS:
-            return True
+            # The objects the user can read are those of their scope, see epicEvents/scoping.py.
+            return in_view_scope(view, obj, user)
 
         if isinstance(obj, Event):
-            if obj.support_contact == user and user.is_support():
+            if obj.support_contact_id == user.pk and user.is_support():
                 return True
             else:
                 return False
@@ -112,15 +141,46 @@ class ClientAndContractPermission(permissions.BasePermission):
         user = request.user
 
         if request.method in permissions.SAFE_METHODS:
-            return True
+            # The objects the user can read are those of their scope, see epicEvents/scoping.py.
+            return in_view_scope(view, obj, user)
 
         if isinstance(obj, Client):
-            if obj.sales_contact == user and user.is_commercial():
+            if obj.sales_contact_id == user.pk and user.is_commercial():
                 return True
             else:
                 return False
         elif isinstance(obj,Contract):
-            if obj.sales_contact == user:
+            if obj.sales_contact_id == user.pk:
                 return True
             else:
                 return False
+
+
+class ReportPermission(permissions.BasePermission):
+    """
+    Permission class for the reports: superusers, commercial and support users can read the
+    reports, computed over the objects they can access.
+    """
+
+    message = "You do not have the permission to perform this action"
+
+    def has_permission(self, request, view):
+        """
+        Check if user has permission to read the reports.
+        """
+        user = request.user
+        if request.method not in permissions.SAFE_METHODS:
+            return False
+        return user.is_superuser or user.is_commercial() or user.is_support()
+
+
+class AsyncEventPermission(AsyncPermissionMixin, EventPermission):
+    """
+    `EventPermission` for the async views.
+    """
+
+
+class AsyncClientAndContractPermission(AsyncPermissionMixin, ClientAndContractPermission):
+    """
+    `ClientAndContractPermission` for the async views.
+    """
@@ -0,0 +1,88 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.functional import cached_property
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """
+    Describes how the rows rendered by a serializer should be loaded from the database.
+
+    The plan is derived from the serializer fields the first time it is used:
+    - concrete model fields are loaded with `only()`, so unused columns (e.g. event notes) are skipped.
+    - related fields rendered as a primary key only need the `*_id` column and cost no query.
+    - any other relation (nested serializer, string related field...) is loaded with `select_related()`.
+
+    If a serializer field reads something that is not a model field (a method, a property...),
+    the plan gives up on `only()` so that rendering never triggers deferred field loading.
+
+    Usage:
+    ```
+    class EventViewset(viewsets.ModelViewSet):
+        query_plan = QueryPlan(EventSerializer, extra_fields=['date_created'])
+
+        def list(self, request):
+            queryset = self.query_plan.apply(Event.objects.filter(...))
+    ```
+    """
+
+    def __init__(self, serializer_class, extra_fields=(), select_related=()):
+        """
+        Args:
+            serializer_class: The serializer used to render the rows.
+            extra_fields: Model fields needed besides the serialized ones (ordering, pagination...).
+            select_related: Relations to join regardless of the serializer fields.
+        """
+        self.serializer_class = serializer_class
+        self.extra_fields = tuple(extra_fields)
+        self.extra_select_related = tuple(select_related)
+
+    @cached_property
+    def plan(self):
+        """
+        Return a `(only_fields, select_related)` tuple for the serializer.
+        `only_fields` is None when the columns to load cannot be determined.
+        """
+        serializer = self.serializer_class()
+        opts = serializer.Meta.model._meta
+        only_fields = {opts.pk.name}
+        only_fields.update(self.extra_fields)
+        select_related = set(self.extra_select_related)
+        complete = True
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if field.source == '*' or len(field.source_attrs) != 1:
+                complete = False
+                continue
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist:
+                complete = False
+                continue
+            if not model_field.concrete:
+                complete = False
+                continue
+            only_fields.add(model_field.name)
+            if model_field.is_relation:
+                pk_only = (isinstance(field, serializers.RelatedField) and
+                           field.use_pk_only_optimization())
+                if not pk_only:
+                    select_related.add(model_field.name)
+
+        if select_related:
+            # Rows of joined tables are loaded whole, only() must not defer them.
+            complete = False
+        return (tuple(sorted(only_fields)) if complete else None,
+                tuple(sorted(select_related)))
+
+    def apply(self, queryset):
+        """
+        Return the queryset restricted to the columns and joins needed by the serializer.
+        """
+        only_fields, select_related = self.plan
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if only_fields is not None:
+            queryset = queryset.only(*only_fields)
+        return queryset
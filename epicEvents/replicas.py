@@ -0,0 +1,33 @@
+from rest_framework import permissions
+
+from utils.routers import choose_replica, is_sticky, mark_write, restore_reads, route_reads
+
+
+class ReadReplicaMixin:
+    """
+    Serves the read-only requests of a view from a read replica (see `utils.routers`).
+
+    - Safe methods (GET, HEAD, OPTIONS) read from a replica picked at random, unless the user
+      wrote less than `REPLICA_ROUTING['STICKY_SECONDS']` ago: their reads then stay on the
+      primary until the replicas caught up with their writes.
+    - Other methods read and write on the primary, and make the reads of the user sticky.
+
+    The authentication and the permission checks read from the primary. Without replicas
+    configured, every query goes to the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in permissions.SAFE_METHODS:
+            mark_write(request.user)
+            return
+        alias = choose_replica()
+        if alias is not None and not is_sticky(request.user):
+            self._replica_token = route_reads(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            self._replica_token = None
+            restore_reads(token)
+        return super().finalize_response(request, response, *args, **kwargs)
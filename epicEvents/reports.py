@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.db.models import Count, F, FloatField, Func, IntegerField, Q, Sum, Window
+from django.db.models.functions import Coalesce, Rank
+from django.utils import timezone
+
+# Upper bounds (in days after today) of the buckets of the unpaid amounts, by payment due date.
+DUE_DATE_BUCKETS = [30, 60, 90]
+
+
+class WindowSum(Func):
+    """
+    SUM() over the grouped rows of a query, e.g. the total of an aggregate annotation.
+    Django refuses to nest `Sum` on an aggregate, which is what `SUM(SUM(...)) OVER (...)` does.
+    """
+    function = 'SUM'
+    window_compatible = True
+
+
+def rounded(value):
+    return round(value or 0, 2)
+
+
+def revenue_per_sales_contact(contracts):
+    """
+    Return the revenue of every sales contact of the contracts, with one GROUP BY query.
+
+    Each row holds the number of contracts, the amount of all of them and of the signed ones,
+    the rank of the sales contact by signed amount and their share of the signed amount of
+    every sales contact (both computed by window functions over the grouped rows).
+    """
+    signed = Sum('amount_due', filter=Q(contract_status='signed'))
+    rows = (contracts.order_by()
+            .values('sales_contact', 'sales_contact__email')
+            .annotate(contracts=Count('id'),
+                      total_amount=Coalesce(Sum('amount_due'), 0, output_field=FloatField()),
+                      signed_amount=Coalesce(signed, 0, output_field=FloatField()))
+            .annotate(rank=Window(Rank(), order_by=F('signed_amount').desc()),
+                      all_signed_amount=Window(WindowSum(F('signed_amount'), output_field=FloatField())))
+            .order_by('rank', 'sales_contact'))
+    return [{
+        'sales_contact': row['sales_contact'],
+        'sales_contact_email': row['sales_contact__email'],
+        'contracts': row['contracts'],
+        'total_amount': rounded(row['total_amount']),
+        'signed_amount': rounded(row['signed_amount']),
+        'rank': row['rank'],
+        'signed_share': rounded(row['signed_amount'] / row['all_signed_amount'] * 100)
+        if row['all_signed_amount'] else 0,
+    } for row in rows]
+
+
+def contracts_by_status(contracts):
+    """
+    Return the number and the amount of the contracts per status, with one GROUP BY query.
+    """
+    rows = (contracts.order_by()
+            .values('contract_status')
+            .annotate(contracts=Count('id'), amount=Sum('amount_due'))
+            .order_by('contract_status'))
+    return [{
+        'contract_status': row['contract_status'],
+        'contracts': row['contracts'],
+        'amount': rounded(row['amount']),
+    } for row in rows]
+
+
+def unpaid_by_due_date(contracts, today=None):
+    """
+    Return the amounts still due (`amount_due` > 0) per bucket of payment due date: overdue,
+    due within 30, 60 and 90 days, and due later. Every bucket is a filtered aggregate of a
+    single query.
+    """
+    today = today or timezone.now().date()
+    bounds = [(None, today, 'overdue')]
+    start = today
+    for days in DUE_DATE_BUCKETS:
+        end = today + timedelta(days=days + 1)
+        bounds.append((start, end, f'due_within_{days}_days'))
+        start = end
+    bounds.append((start, None, f'due_after_{DUE_DATE_BUCKETS[-1]}_days'))
+
+    aggregates = {}
+    for low, high, name in bounds:
+        condition = Q(amount_due__gt=0)
+        if low is not None:
+            condition &= Q(payment_due_date__gte=low)
+        if high is not None:
+            condition &= Q(payment_due_date__lt=high)
+        aggregates[f'{name}__contracts'] = Count('id', filter=condition)
+        aggregates[f'{name}__amount'] = Sum('amount_due', filter=condition)
+    totals = contracts.order_by().aggregate(**aggregates)
+    return [{
+        'bucket': name,
+        'from': low,
+        'to': high - timedelta(days=1) if high is not None else None,
+        'contracts': totals[f'{name}__contracts'],
+        'amount': rounded(totals[f'{name}__amount']),
+    } for low, high, name in bounds]
+
+
+def events_per_support_contact(events):
+    """
+    Return the number of events and attendees per support contact and event status, with
+    one GROUP BY query. The total number of events of the support contact is computed by a
+    window function partitioned by support contact.
+    """
+    rows = (events.order_by()
+            .values('support_contact', 'support_contact__email', 'event_status', 'event_status__status')
+            .annotate(events=Count('id'), attendees=Sum('attendee_number'))
+            .annotate(support_contact_events=Window(WindowSum(F('events'), output_field=IntegerField()),
+                                                  partition_by=[F('support_contact')]))
+            .order_by('support_contact', 'event_status'))
+    return [{
+        'support_contact': row['support_contact'],
+        'support_contact_email': row['support_contact__email'],
+        'event_status': row['event_status'],
+        'event_status_name': row['event_status__status'],
+        'events': row['events'],
+        'attendees': row['attendees'] or 0,
+        'support_contact_events': row['support_contact_events'],
+    } for row in rows]
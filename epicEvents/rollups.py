@@ -0,0 +1,210 @@
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from epicEvents.models import Contract, ContractRollup, Event, EventRollup
+
+# Amounts are floats: the sums maintained incrementally may differ from the sums of the base
+# table by rounding errors, which the reconciliation ignores below this tolerance.
+AMOUNT_TOLERANCE = 0.01
+
+
+class Rollup:
+    """
+    Describes a summary table: the base model it summarizes, the columns it is grouped by and
+    the values it sums (the first one being the number of rows).
+    """
+
+    def __init__(self, model, rollup_model, key_fields, value_fields, date_field):
+        self.model = model
+        self.rollup_model = rollup_model
+        self.key_fields = key_fields
+        self.value_fields = value_fields
+        self.date_field = date_field
+
+    def key(self, obj):
+        raise NotImplementedError
+
+    def values(self, obj):
+        raise NotImplementedError
+
+    def base_rows(self, since=None):
+        """
+        Return the expected rollup rows computed from the base table, as {key: values}.
+        """
+        raise NotImplementedError
+
+    def rollup_rows(self, since=None):
+        """
+        Return the rows of the summary table, as {key: values}.
+        """
+        queryset = self.rollup_model.objects.all()
+        if since is not None:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': since})
+        rows = queryset.values_list(*self.key_fields, *self.value_fields)
+        size = len(self.key_fields)
+        return {tuple(row[:size]): tuple(row[size:]) for row in rows}
+
+
+class ContractRollupSpec(Rollup):
+    """
+    The contracts per creation day, sales contact and status (ContractRollup).
+    """
+
+    def key(self, obj):
+        return (timezone.localdate(obj.date_created), obj.sales_contact_id, obj.contract_status)
+
+    def values(self, obj):
+        return (1, obj.amount_due)
+
+    def base_rows(self, since=None):
+        queryset = Contract.objects.all()
+        if since is not None:
+            start = timezone.make_aware(datetime.combine(since, time.min))
+            queryset = queryset.filter(date_created__gte=start)
+        rows = (queryset.annotate(day=TruncDate('date_created'))
+                .values_list('day', 'sales_contact_id', 'contract_status')
+                .annotate(contracts=Count('id'), amount=Sum('amount_due'))
+                .order_by())
+        return {row[:3]: row[3:] for row in rows}
+
+
+class EventRollupSpec(Rollup):
+    """
+    The events per event date, support contact and status (EventRollup).
+    """
+
+    def key(self, obj):
+        return (obj.event_date, obj.support_contact_id, obj.event_status_id)
+
+    def values(self, obj):
+        return (1, obj.attendee_number)
+
+    def base_rows(self, since=None):
+        queryset = Event.objects.all()
+        if since is not None:
+            queryset = queryset.filter(event_date__gte=since)
+        rows = (queryset.values_list('event_date', 'support_contact_id', 'event_status_id')
+                .annotate(events=Count('id'), attendees=Sum('attendee_number'))
+                .order_by())
+        return {row[:3]: row[3:] for row in rows}
+
+
+ROLLUPS = {
+    Contract: ContractRollupSpec(Contract, ContractRollup, ['day', 'sales_contact_id', 'contract_status'],
+                                 ['contracts', 'amount_due'], 'day'),
+    Event: EventRollupSpec(Event, EventRollup, ['event_date', 'support_contact_id', 'event_status_id'],
+                           ['events', 'attendees'], 'event_date'),
+}
+
+
+def is_enabled():
+    return getattr(settings, 'ROLLUPS', {}).get('ENABLED', False)
+
+
+def apply_delta(rollup, key, delta):
+    """
+    Add the delta to the values of the rollup row of the key, creating the row if needed and
+    deleting it when it no longer counts any row.
+    """
+    manager = rollup.rollup_model.objects
+    filters = dict(zip(rollup.key_fields, key))
+    updates = {field: F(field) + value for field, value in zip(rollup.value_fields, delta)}
+    if manager.filter(**filters).update(**updates):
+        if delta[0] < 0:
+            manager.filter(**filters, **{f'{rollup.value_fields[0]}__lte': 0}).delete()
+        return
+    if delta[0] <= 0:
+        # Nothing to subtract from: the row was never counted, refresh_rollups fixes it.
+        return
+    try:
+        with transaction.atomic():
+            manager.create(**filters, **dict(zip(rollup.value_fields, delta)))
+    except IntegrityError:
+        # Created by a concurrent transaction in the meantime.
+        manager.filter(**filters).update(**updates)
+
+
+def apply_changes(model, old_objects, new_objects):
+    """
+    Update the rollups of the model for objects changing from their old state (the rows they
+    were counted in) to their new state. Deleted objects have no new state, created objects
+    no old state. The deltas are grouped by rollup row, so a batch costs one update per row.
+    """
+    rollup = ROLLUPS.get(model)
+    if rollup is None or not is_enabled():
+        return
+    deltas = defaultdict(lambda: [0] * len(rollup.value_fields))
+    for sign, objects in ((-1, old_objects), (1, new_objects)):
+        for obj in objects:
+            delta = deltas[rollup.key(obj)]
+            for i, value in enumerate(rollup.values(obj)):
+                delta[i] += sign * (value or 0)
+    for key, delta in deltas.items():
+        if any(delta):
+            apply_delta(rollup, key, delta)
+
+
+def values_differ(expected, actual):
+    return any(abs((e or 0) - (a or 0)) > AMOUNT_TOLERANCE for e, a in zip(expected, actual))
+
+
+def reconcile(model, since=None, fix=False):
+    """
+    Compare the rollup of the model with its base table.
+
+    Args:
+        model: Contract or Event.
+        since (date, optional): Only compare the rows from this day on.
+        fix (bool): Rewrite the rows that differ, create the missing ones and delete the extra ones.
+
+    Returns:
+        list: The differences, as (key, expected values or None, actual values or None).
+    """
+    rollup = ROLLUPS[model]
+    zero = (0,) * len(rollup.value_fields)
+    with transaction.atomic():
+        expected = rollup.base_rows(since)
+        actual = rollup.rollup_rows(since)
+        differences = [
+            (key, expected.get(key), actual.get(key))
+            for key in sorted(set(expected) | set(actual), key=str)
+            if values_differ(expected.get(key, zero), actual.get(key, zero))
+        ]
+        if fix:
+            manager = rollup.rollup_model.objects
+            for key, expected_values, actual_values in differences:
+                filters = dict(zip(rollup.key_fields, key))
+                if expected_values is None:
+                    manager.filter(**filters).delete()
+                else:
+                    manager.update_or_create(**filters, defaults=dict(zip(rollup.value_fields, expected_values)))
+    return differences
+
+
+def dashboard(contract_rollups, event_rollups, since=None):
+    """
+    Return the dashboard figures read from the rollups: the contracts per status and per sales
+    contact, the events per status and per support contact.
+    """
+    if since is not None:
+        contract_rollups = contract_rollups.filter(day__gte=since)
+        event_rollups = event_rollups.filter(event_date__gte=since)
+
+    def grouped(queryset, fields, sums):
+        rows = queryset.order_by().values(*fields).annotate(
+            **{f'total_{name}': Sum(name) for name in sums}).order_by(*fields)
+        return [{**{field: row[field] for field in fields},
+                 **{name: round(row[f'total_{name}'] or 0, 2) for name in sums}} for row in rows]
+
+    return {
+        'contracts_by_status': grouped(contract_rollups, ['contract_status'], ['contracts', 'amount_due']),
+        'contracts_by_sales_contact': grouped(contract_rollups, ['sales_contact'], ['contracts', 'amount_due']),
+        'events_by_status': grouped(event_rollups, ['event_status'], ['events', 'attendees']),
+        'events_by_support_contact': grouped(event_rollups, ['support_contact'], ['events', 'attendees']),
+    }
@@ -0,0 +1,179 @@
+import operator
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from epicEvents.instrumentation import timed
+from epicEvents.serializers import GroupUserField
+
+# The related fields rendering a PKOnlyObject as its primary key.
+PK_REPRESENTATIONS = (serializers.PrimaryKeyRelatedField.to_representation, GroupUserField.to_representation)
+
+
+def get_config():
+    """
+    Return the FAST_LIST_SERIALIZATION setting, completed with its defaults.
+    """
+    config = {'ENABLED': True}
+    config.update(getattr(settings, 'FAST_LIST_SERIALIZATION', {}))
+    return config
+
+
+def is_drf_representation(field, field_class):
+    return isinstance(field, field_class) and type(field).to_representation is field_class.to_representation
+
+
+def compile_converter(field):
+    """
+    Return the function rendering a (non-None) column value like `field.to_representation` renders
+    the attribute of an instance, or None when the value is rendered unchanged. The converters are
+    compiled for every serialization, as the rendering of the datetimes depends on the current timezone.
+
+    The DRF fields whose `to_representation` is not overridden get a converter doing the same
+    thing without their machinery; any other field gets its own bound `to_representation`.
+    """
+    if isinstance(field, serializers.RelatedField):
+        if type(field).to_representation in PK_REPRESENTATIONS and field.pk_field is None:
+            return None
+        return lambda pk: field.to_representation(PKOnlyObject(pk))
+    if is_drf_representation(field, serializers.IntegerField):
+        return int
+    if is_drf_representation(field, serializers.FloatField):
+        return float
+    if is_drf_representation(field, serializers.CharField):
+        return str
+    if is_drf_representation(field, serializers.ChoiceField):
+        choices = field.choice_strings_to_values
+        return lambda value: value if value == '' else choices.get(str(value), value)
+    if is_drf_representation(field, serializers.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        # Resolved once: the current timezone is slow to look up.
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is not None and output_format.lower() == ISO_8601 and field_timezone is not None:
+            def convert_datetime(value):
+                if value.tzinfo is None:
+                    return field.to_representation(value)
+                value = value.astimezone(field_timezone).isoformat()
+                return value[:-6] + 'Z' if value.endswith('+00:00') else value
+            return convert_datetime
+    if is_drf_representation(field, serializers.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            return operator.methodcaller('isoformat')
+    return field.to_representation
+
+
+class RowSerializer:
+    """
+    Read-only serialization of the rows of a list endpoint, producing the same data as the
+    `many=True` serializer it is declared for without building model instances or going
+    through the DRF field machinery for every value.
+
+    The serializer is compiled once, the first time it is used: every serialized field must
+    read a single concrete model field (or the primary key of a relation), whose column is
+    loaded with `values_list()`, and is rendered by a converter (see `compile_converter`). A serializer
+    with another kind of field (a method, a nested serializer...) is not supported: the
+    views keep using the serializer.
+
+    The rows are named tuples holding the primary key and the `extra_fields` too, so
+    `KeysetPagination` reads the position of the rows of a page from them.
+
+    Usage:
+    ```
+    class EventViewset(RowSerializerMixin, viewsets.ModelViewSet):
+        row_serializer = RowSerializer(EventSerializer, extra_fields=['date_created'])
+
+        def list(self, request):
+            queryset = self.filter_queryset(Event.objects.filter(...))
+            if self.row_serializer.enabled():
+                return self.fast_list(queryset)
+    ```
+    """
+
+    def __init__(self, serializer_class, extra_fields=()):
+        """
+        Args:
+            serializer_class: The serializer whose output is reproduced.
+            extra_fields: Model fields loaded with the rows besides the serialized ones (pagination...).
+        """
+        self.serializer_class = serializer_class
+        self.extra_fields = tuple(extra_fields)
+
+    @cached_property
+    def compiled(self):
+        """
+        Return the `(keys, columns, fields)` of the serializer, or None if it is not supported.
+        The columns of the serialized fields come first, in the order of the keys.
+        """
+        serializer = self.serializer_class()
+        opts = serializer.Meta.model._meta
+        keys, columns, fields = [], [], []
+        for key, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or len(field.source_attrs) != 1:
+                return None
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete:
+                return None
+            if model_field.is_relation != isinstance(field, serializers.RelatedField):
+                return None
+            if model_field.is_relation and not field.use_pk_only_optimization():
+                return None
+            keys.append(key)
+            columns.append(model_field.name)
+            fields.append(field)
+        for name in ('pk',) + self.extra_fields:
+            if name not in columns:
+                columns.append(name)
+        return tuple(keys), tuple(columns), tuple(fields)
+
+    def enabled(self):
+        """
+        Return True if the fast serialization is enabled and supports the serializer.
+        """
+        return get_config()['ENABLED'] and self.compiled is not None
+
+    def rows(self, queryset):
+        """
+        Return the queryset of the rows to serialize, as named tuples of the loaded columns.
+        """
+        return queryset.values_list(*self.compiled[1], named=True)
+
+    def serialize(self, rows):
+        """
+        Return the serialized rows, as the `data` of the `many=True` serializer would be.
+        """
+        keys, _, fields = self.compiled
+        with timed('serialization_seconds', exclude_sql=True):
+            converters = [compile_converter(field) for field in fields]
+            return [{key: value if value is None or convert is None else convert(value)
+                     for key, convert, value in zip(keys, converters, row)}
+                    for row in rows]
+
+
+class RowSerializerMixin:
+    """
+    The list action of the viewsets declaring a `row_serializer` (see `RowSerializer`).
+    """
+
+    row_serializer = None
+
+    def fast_list(self, queryset):
+        """
+        Return the response of the list of the (scoped and filtered) queryset, paginated when
+        requested, serialized by the row serializer.
+        """
+        rows = self.row_serializer.rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.row_serializer.serialize(page))
+        return Response(self.row_serializer.serialize(rows))
@@ -0,0 +1,227 @@
+from django.db.models import Exists, OuterRef, Q
+
+from authentication.roles import COMMERCIAL, SUPPORT
+from epicEvents import denormalization
+from epicEvents.models import Client, Contract, ContractRollup, Event, EventRollup
+
+
+class FieldScope:
+    """
+    The rows whose `field` column holds the id of the user, e.g. the clients of a sales contact.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def filter(self, user):
+        return Q(**{self.field: user.pk})
+
+    def contains(self, obj, user):
+        return getattr(obj, self.field) == user.pk
+
+    async def acontains(self, obj, user):
+        return self.contains(obj, user)
+
+
+class ExistsScope:
+    """
+    The rows related to at least one row of `model` whose `field` column holds the id of the
+    user, with an `EXISTS` subquery correlated on `inner` (a column of `model`) = `outer` (a
+    column of the scoped rows), e.g. the clients of the events of a support contact.
+
+    Unlike an `id IN (SELECT DISTINCT ...)` filter, the subquery stops at the first related row
+    and is planned as a semi-join, backed by an index on (`field`, `inner`) of `model`.
+    """
+
+    def __init__(self, model, inner, outer, field):
+        self.model = model
+        self.inner = inner
+        self.outer = outer
+        self.field = field
+
+    def filter(self, user):
+        return Exists(self.model.objects.filter(**{self.inner: OuterRef(self.outer), self.field: user.pk}))
+
+    def get_related(self, obj, user):
+        return self.model.objects.filter(**{self.inner: getattr(obj, self.outer), self.field: user.pk})
+
+    def contains(self, obj, user):
+        return self.get_related(obj, user).exists()
+
+    async def acontains(self, obj, user):
+        return await self.get_related(obj, user).aexists()
+
+
+class DenormalizedScope:
+    """
+    The scope `joined`, read from a denormalized column holding the id of the user instead (a
+    `FieldScope` on `field`) when EVENT_DENORMALIZATION is enabled (see epicEvents/denormalization.py).
+    """
+
+    def __init__(self, field, joined):
+        self.column = FieldScope(field)
+        self.joined = joined
+
+    def get(self):
+        return self.column if denormalization.is_enabled() else self.joined
+
+    def filter(self, user):
+        return self.get().filter(user)
+
+    def contains(self, obj, user):
+        return self.get().contains(obj, user)
+
+    async def acontains(self, obj, user):
+        return await self.get().acontains(obj, user)
+
+
+# The rows each role can access, per model. A user having several roles gets the scope of the first
+# one listed; superusers access every row, and the users without a listed role none.
+SCOPES = {
+    Client: {
+        COMMERCIAL: FieldScope('sales_contact_id'),
+        SUPPORT: ExistsScope(Event, 'client_id', 'pk', 'support_contact_id'),
+    },
+    Contract: {
+        COMMERCIAL: FieldScope('sales_contact_id'),
+    },
+    Event: {
+        SUPPORT: FieldScope('support_contact_id'),
+        COMMERCIAL: DenormalizedScope('client_sales_contact_id',
+                                      ExistsScope(Client, 'pk', 'client_id', 'sales_contact_id')),
+    },
+    ContractRollup: {
+        COMMERCIAL: FieldScope('sales_contact_id'),
+    },
+    EventRollup: {
+        SUPPORT: FieldScope('support_contact_id'),
+    },
+}
+
+# Scope of the superusers having no listed role, and of the users having none.
+ALL = 'all'
+NONE = 'none'
+
+
+def get_scope(model, user):
+    """
+    Return the scope of the user on the model: a `FieldScope`, an `ExistsScope` or a
+    `DenormalizedScope`, `ALL` or `NONE`.
+    """
+    group_names = user.group_names()
+    for role, scope in SCOPES[model].items():
+        if role in group_names:
+            return scope
+    if user.is_superuser:
+        return ALL
+    return NONE
+
+
+def scoped(model, user, queryset=None):
+    """
+    Return the rows of the model (or of the queryset) the user can access, in a single query.
+    """
+    if queryset is None:
+        queryset = model._default_manager.all()
+    scope = get_scope(model, user)
+    if scope == ALL:
+        return queryset
+    if scope == NONE:
+        return queryset.none()
+    return queryset.filter(scope.filter(user))
+
+
+def in_scope(obj, user):
+    """
+    Return True if the user can access the object: answered from its columns for a `FieldScope`,
+    with a single `EXISTS` query for an `ExistsScope`.
+    """
+    scope = get_scope(type(obj), user)
+    if scope == ALL:
+        return True
+    if scope == NONE:
+        return False
+    return scope.contains(obj, user)
+
+
+async def ain_scope(obj, user):
+    """
+    Async version of `in_scope`, for the async views (the groups of the user must be loaded).
+    """
+    scope = get_scope(type(obj), user)
+    if scope == ALL:
+        return True
+    if scope == NONE:
+        return False
+    return await scope.acontains(obj, user)
+
+
+def in_view_scope(view, obj, user):
+    """
+    Return True if the user can access the object looked up by the view: without checking it
+    again when the view looked it up among the rows of the scope of the user (`scoped_lookup`).
+    """
+    return getattr(view, 'scoped_lookup', False) or in_scope(obj, user)
+
+
+async def ain_view_scope(view, obj, user):
+    """
+    Async version of `in_view_scope`, for the async views.
+    """
+    return getattr(view, 'scoped_lookup', False) or await ain_scope(obj, user)
+
+
+def scoped_clients(user):
+    """
+    Return the clients the user can access: the clients they are the sales contact of for
+    commercial users, the clients of the events they support for support users, every client
+    for superusers.
+    """
+    return scoped(Client, user)
+
+
+def scoped_contracts(user):
+    """
+    Return the contracts the user can access: their own contracts for commercial users,
+    every contract for superusers.
+    """
+    return scoped(Contract, user)
+
+
+def scoped_events(user):
+    """
+    Return the events the user can access: the events they support for support users,
+    the events of their clients for commercial users, every event for superusers.
+    """
+    return scoped(Event, user)
+
+
+def scoped_contract_rollups(user):
+    """
+    Return the contract rollups the user can read: their own for commercial users, every rollup
+    for superusers.
+    """
+    return scoped(ContractRollup, user)
+
+
+def scoped_event_rollups(user):
+    """
+    Return the event rollups the user can read: their own for support users, every rollup for
+    superusers. The event rollups have no sales contact, commercial users read none.
+    """
+    return scoped(EventRollup, user)
+
+
+class ScopedQuerysetMixin:
+    """
+    Makes `get_queryset()` return the rows the user can access (`get_scoped_queryset`), so that
+    `retrieve`, `update` and `destroy` (through `get_object()`) answer a 404 for the rows out of
+    the scope of the user, like `list` leaves them out.
+    """
+
+    # The objects are looked up among the rows of the scope of the user, the object permissions
+    # do not check it again (see `in_view_scope`).
+    scoped_lookup = True
+
+    def get_queryset(self):
+        return self.get_scoped_queryset(self.request.user)
@@ -0,0 +1,93 @@
+import re
+from functools import reduce
+from operator import add, or_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework.filters import BaseFilterBackend
+
+# The text search configuration of the search vectors maintained by migration 0015.
+SEARCH_CONFIG = 'simple'
+
+TERM_RE = re.compile(r'[\w@.+-]+', re.UNICODE)
+
+
+def search_terms(value):
+    """
+    Split the searched text into terms, dropping the characters that have a meaning in tsquery.
+    """
+    return [term.strip('.-+') for term in TERM_RE.findall(value) if term.strip('.-+')]
+
+
+def prefix_search_query(terms):
+    """
+    Return a SearchQuery matching the rows containing every term, each term possibly truncated
+    (searching "jo smi" finds "John Smith").
+    """
+    raw = ' & '.join(f"'{term}':*" for term in terms)
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Filter backend searching the `?q=` query parameter in the full-text search vectors of the view.
+
+    The view declares:
+    - `search_vectors`: the `tsvector` columns searched (e.g. `['search_vector', 'client__search_vector']`).
+    - `search_fallback_fields`: the text fields searched with `icontains` on databases
+      without full-text search (SQLite stand-ins).
+
+    On PostgreSQL the vectors are maintained by triggers and backed by GIN indexes, each vector
+    being searched with its own index (see `matches`), and the results are ordered by relevance
+    (`ts_rank`) then from the newest to the oldest. Note that keyset
+    pagination, when requested, orders the pages by date instead.
+
+    Examples:
+    To search the clients of a company, use:
+        /client/?q=acme
+    """
+
+    search_param = 'q'
+
+    def get_search_terms(self, request):
+        return search_terms(request.query_params.get(self.search_param, ''))
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if connection.vendor != 'postgresql':
+            return self.fallback_filter(queryset, terms, getattr(view, 'search_fallback_fields', []))
+
+        vectors = getattr(view, 'search_vectors', [])
+        if not vectors:
+            return queryset
+        query = prefix_search_query(terms)
+        rank = reduce(add, (SearchRank(F(vector), query) for vector in vectors))
+        return queryset.filter(self.matches(queryset.model, vectors, query)).annotate(
+            search_rank=rank).order_by('-search_rank', '-date_created', '-id')
+
+    def matches(self, model, vectors, query):
+        """
+        Return the condition on the rows matching the query in one of the vectors.
+
+        An OR of vectors of several tables (e.g. the event and its client) cannot be served by
+        their GIN indexes, every joined row being checked: each vector is searched on its own,
+        with its index, and the rows are the union of the ids found.
+        """
+        if len(vectors) == 1:
+            return Q(**{vectors[0]: query})
+        ids = [model._default_manager.filter(**{vector: query}).values('pk') for vector in vectors]
+        return Q(pk__in=ids[0].union(*ids[1:]))
+
+    def fallback_filter(self, queryset, terms, fields):
+        """
+        Return the rows containing every term in one of the fields, with icontains lookups.
+        """
+        if not fields:
+            return queryset
+        for term in terms:
+            queryset = queryset.filter(
+                reduce(or_, (Q(**{f'{field}__icontains': term}) for field in fields)))
+        return queryset
@@ -1,11 +1,106 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 from authentication.models import User
 from epicEvents.models import Client, Contract, Event, EventStatus
+from epicEvents.instrumentation import TimedListSerializer, TimedSerializerMixin
 
 User = get_user_model()
 
 
+def to_pk(model, value):
+    """
+    Returns the value converted to a primary key of the model, or None if it is not a valid one.
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        return model._meta.pk.to_python(value)
+    except (TypeError, ValueError, DjangoValidationError):
+        return None
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    A PrimaryKeyRelatedField resolving its value from objects prefetched once for a whole validation pass.
+
+    The objects are read from the serializer context, `prefetched` (`{field name: {pk: instance}}`):
+    - a bulk validation pass (`epicEvents.bulk`) fills it with one query per related field,
+    - a `many=True` validation pass fills it on the first item, with one query loading the objects
+      referenced by every item of the list.
+    Otherwise it behaves like a PrimaryKeyRelatedField.
+    """
+
+    def get_prefetched(self):
+        """
+        Returns the objects prefetched for this field (`{pk: instance}`), or None outside of a bulk
+        or `many=True` validation pass.
+        """
+        prefetched = self.context.get('prefetched')
+        if prefetched is not None and self.field_name in prefetched:
+            return prefetched[self.field_name]
+        items = getattr(self.root, 'initial_data', None)
+        if not isinstance(self.root, serializers.ListSerializer) or not isinstance(items, list):
+            return None
+        queryset = self.get_queryset()
+        pks = {to_pk(queryset.model, item.get(self.field_name)) for item in items if isinstance(item, dict)}
+        pks.discard(None)
+        prefetched = self.root._context.setdefault('prefetched', {})
+        prefetched[self.field_name] = queryset.in_bulk(pks)
+        return prefetched[self.field_name]
+
+    def to_internal_value(self, data):
+        """
+        Returns the related object for the given primary key.
+
+        Parameters:
+        -----------
+        data : Any
+            The primary key sent by the client.
+
+        Returns:
+        --------
+        object
+            The related object.
+        """
+        prefetched = self.get_prefetched()
+        if prefetched is None:
+            return super().to_internal_value(data)
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        pk = to_pk(self.get_queryset().model, data)
+        if pk is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return prefetched[pk]
+        except KeyError:
+            self.object_not_found(pk, data)
+
+    def object_not_found(self, pk, data):
+        """
+        Raises the validation error of a primary key matching no object of the queryset.
+        """
+        self.fail('does_not_exist', pk_value=data)
+
+
+class PrefetchedUniqueValidator(UniqueValidator):
+    """
+    A UniqueValidator that checks the values already taken from the serializer context of a bulk
+    validation pass (`taken_values`: `{field name: {value: pk}}`) instead of running a query per item.
+    """
+
+    def __call__(self, value, serializer_field):
+        taken_values = serializer_field.context.get('taken_values')
+        field_name = serializer_field.source_attrs[-1]
+        if taken_values is None or field_name not in taken_values:
+            return super().__call__(value, serializer_field)
+        instance = getattr(serializer_field.parent, 'instance', None)
+        owner = taken_values[field_name].get(value)
+        if owner is not None and (instance is None or owner != instance.pk):
+            raise serializers.ValidationError(self.message, code='unique')
+
+
 class CommercialUserValidator:
     """
     Validator to ensure that a user belongs to the commercial group.
@@ -13,6 +108,8 @@ class CommercialUserValidator:
     Raises a `serializers.ValidationError` if the given value does not belong to the
     commercial group.
 
+    CommercialUserField does not need it: its queryset only holds the commercial users.
+
     Usage:
     ```
     class MySerializer(serializers.ModelSerializer):
@@ -40,43 +137,70 @@ class CommercialUserValidator:
                 "The user must belong to the commercial group")
 
 
-class CommercialUserField(serializers.PrimaryKeyRelatedField):
+class GroupUserField(PrefetchedPrimaryKeyRelatedField):
     """
-    A custom PrimaryKeyRelatedField that only accepts users belonging to the commercial group.
+    A PrefetchedPrimaryKeyRelatedField that only accepts the users belonging to `group_name`.
+
+    The queryset of the field is restricted to the members of the group, so resolving the user
+    and checking their group is a single query (or no query at all in a bulk or `many=True` pass,
+    where the members referenced by the pass are loaded once and shared by every item). A second
+    query is only run when the user is not found, to tell a user outside of the group from a
+    user that does not exist.
     """
-    
+
+    group_name = None
+    group_error_message = None
+
     def __init__(self, **kwargs):
         """
-        Initializes a new instance of the CommercialUserField.
-        
-        Parameters:
-        -----------
-        kwargs : dict
-            Additional keyword arguments to be passed to the base class constructor.
+        Initializes the field, restricting the given queryset to the members of the group.
         """
+        if kwargs.get('queryset') is not None:
+            kwargs['queryset'] = kwargs['queryset'].filter(groups__name=self.group_name)
         super().__init__(**kwargs)
-        self.validators.append(CommercialUserValidator())
+
+    def to_internal_value(self, data):
+        if self.get_prefetched() is not None:
+            return super().to_internal_value(data)
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        pk = to_pk(self.get_queryset().model, data)
+        if pk is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.get_queryset().get(pk=pk)
+        except self.get_queryset().model.DoesNotExist:
+            self.object_not_found(pk, data)
+
+    def object_not_found(self, pk, data):
+        """
+        Raises the group error if the user exists but does not belong to the group.
+        """
+        if User.objects.filter(pk=pk).exists():
+            raise serializers.ValidationError(self.group_error_message)
+        super().object_not_found(pk, data)
 
     def to_representation(self, value):
         """
-        Converts the input value into a representation suitable for serialization.
-        
-        Parameters:
-        -----------
-        value : object
-            The object to be represented.
-            
-        Returns:
-        --------
-        object
-            The representation of the input object.
+        Returns the primary key of the user.
         """
         return value.pk
 
 
+class CommercialUserField(GroupUserField):
+    """
+    A custom PrimaryKeyRelatedField that only accepts users belonging to the commercial group.
+    """
+
+    group_name = 'commercial'
+    group_error_message = "The user must belong to the commercial group"
+
+
 class SupportUserValidator:
     """
     Validator to ensure that a user belongs to the 'support' group.
+
+    SupportUserField does not need it: its queryset only holds the support users.
     """
     def __call__(self, value):
         """
@@ -95,11 +219,11 @@ class SupportUserValidator:
         if not User.objects.filter(pk=value.pk, groups__name='support').exists():
             raise serializers.ValidationError("The user must belong to the support group.")
 
-class SupportUserField(serializers.PrimaryKeyRelatedField):
+class SupportUserField(GroupUserField):
     """
     A custom primary key related field that only allows users belonging to the "support" group.
 
-    Inherits from `serializers.PrimaryKeyRelatedField`.
+    Inherits from `GroupUserField`.
 
     Raises a `serializers.ValidationError` if the user does not belong to the "support" group.
 
@@ -113,25 +237,8 @@ class SupportUserField(serializers.PrimaryKeyRelatedField):
         Returns the primary key of the related object.
     """
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.validators.append(SupportUserValidator())
-
-    def to_representation(self, value):
-        """
-        Returns the primary key of the related object.
-
-        Parameters:
-        -----------
-        value: Any
-            The related object.
-
-        Returns:
-        --------
-        Any
-            The primary key of the related object.
-        """
-        return value.pk
+    group_name = 'support'
+    group_error_message = "The user must belong to the support group."
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -171,7 +278,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'first_name', 'last_name', 'email', 'password']
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer class for Client model.
 
@@ -191,15 +298,20 @@ class ClientSerializer(serializers.ModelSerializer):
     Methods:
     - create(self, validated_data): creates a new Client instance using validated data.
     """
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
     sales_contact = CommercialUserField(queryset=User.objects.all())
 
     class Meta:
         model = Client
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'first_name', 'sales_contact', 'last_name', 'company_name', 'email',
                   'mobile', 'phone', 'client_status']
+        extra_kwargs = {
+            'email': {'validators': [PrefetchedUniqueValidator(queryset=Client.objects.all())]},
+        }
 
 
-class ContractSerializer(serializers.ModelSerializer):
+class ContractSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Contract model. Includes the following fields:
     - id (int): The ID of the Contract object.
@@ -213,24 +325,28 @@ class ContractSerializer(serializers.ModelSerializer):
 
     This serializer has no custom methods.
     """
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
     sales_contact = CommercialUserField(queryset=User.objects.all())
 
     class Meta:
         model = Contract
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'client', 'sales_contact','date_created', 'contract_status',
                   'amount_due', 'payment_due_date']
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Event model. The support_contact field is a PrimaryKeyRelatedField that is 
     validated to only accept users that belong to the 'support' group using the SupportUserField 
     validator. 
     """
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
     support_contact = SupportUserField(queryset=User.objects.all())
 
     class Meta:
         model = Event
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'contract', 'client', 'event_status',
                   'attendee_number', 'support_contact', 'event_date']
 
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from epicEvents import cache, denormalization, rollups
+from epicEvents.models import Client, Contract, Event
+
+
+@receiver(pre_save, sender=Client)
+@receiver(pre_save, sender=Contract)
+@receiver(pre_save, sender=Event)
+def remember_previous_row(sender, instance, **kwargs):
+    """
+    Remember the row of the object before it is saved:
+    - an object moved to another sales or support contact must disappear from the cached lists
+      of its previous owner,
+    - the rollup row the object was counted in must be decremented,
+    - the denormalized columns of the events must follow a change of their client.
+    """
+    if instance.pk is None or not (cache.is_enabled() or (rollups.is_enabled() and sender in rollups.ROLLUPS)
+                                   or (denormalization.is_enabled() and sender in (Client, Event))):
+        return
+    instance._previous_row = sender.objects.filter(pk=instance.pk).first()
+
+
+@receiver(pre_save, sender=Event)
+def denormalize_event(sender, instance, **kwargs):
+    """
+    Fill the denormalized client columns of a created event or of an event moved to another client.
+    """
+    previous = getattr(instance, '_previous_row', None)
+    denormalization.prepare(sender, [instance], previous=[previous])
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=Contract)
+@receiver(post_save, sender=Event)
+def object_saved(sender, instance, **kwargs):
+    """
+    Invalidate the cached responses showing the saved object, update its rollup and the events
+    of a saved client.
+    """
+    previous = instance.__dict__.pop('_previous_row', None)
+    previous_rows = [previous] if previous is not None else []
+    cache.invalidate(sender, [instance], previous=previous_rows)
+    rollups.apply_changes(sender, previous_rows, [instance])
+    denormalization.apply_changes(sender, previous_rows, [instance])
+
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Contract)
+@receiver(post_delete, sender=Event)
+def object_deleted(sender, instance, **kwargs):
+    """
+    Invalidate the cached responses showing the deleted object and update its rollup.
+    """
+    cache.invalidate(sender, [instance])
+    rollups.apply_changes(sender, [instance], [])
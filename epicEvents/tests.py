@@ -0,0 +1,603 @@
+import datetime
+import decimal
+import itertools
+import json
+from datetime import date
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.db import transaction
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from authentication.roles import COMMERCIAL, SUPPORT
+from authentication.tokens import RoleTokenObtainPairSerializer
+from epicEvents.cache import get_config
+from epicEvents import denormalization, rollups
+from epicEvents.checks import check_replica_routing_cache
+from epicEvents.models import Client, Contract, ContractRollup, Event, EventRollup, EventStatus
+from utils import routers
+from utils.renderers import ORJSONRenderer, encode
+from utils.testing import assert_action_queries, assert_constant_queries
+
+
+class EpicEventsTestCase(TestCase):
+    """
+    Two commercial users, a support user and a superuser, with helpers adding clients, contracts
+    and events.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for pk, name in enumerate(['preparation', 'ongoing', 'finished'], 1):
+            EventStatus.objects.create(pk=pk, status=name)
+        commercial = Group.objects.create(name=COMMERCIAL)
+        support = Group.objects.create(name=SUPPORT)
+        cls.commercial_user = cls.create_user('commercial@test.com', commercial)
+        cls.other_commercial_user = cls.create_user('commercial2@test.com', commercial)
+        cls.support_user = cls.create_user('support@test.com', support)
+        cls.other_support_user = cls.create_user('support2@test.com', support)
+        cls.superuser = User.objects.create_superuser('manager@test.com', 'password', first_name='M', last_name='M')
+
+    @staticmethod
+    def create_user(email, group):
+        user = User.objects.create_user(email, 'password', first_name='First', last_name='Last')
+        user.groups.add(group)
+        return user
+
+    def setUp(self):
+        # The response cache and the roles live in the process-local cache, shared by the tests.
+        caches[get_config()['ALIAS']].clear()
+        self.indexes = itertools.count()
+
+    def create_event(self, sales_contact=None, support_contact=None, index=None):
+        """
+        Create a client, its contract and its event.
+        """
+        sales_contact = sales_contact or self.commercial_user
+        index = next(self.indexes) if index is None else index
+        client = Client.objects.create(
+            first_name=f'Client{index}', last_name='Name', company_name='Company', email=f'client{index}@test.com',
+            mobile='0600000000', phone='0100000000', sales_contact=sales_contact)
+        contract = Contract.objects.create(
+            client=client, sales_contact=sales_contact, amount_due=1000.5 + index,
+            payment_due_date=date(2026, 1, 1 + index % 28), contract_status='signed')
+        return Event.objects.create(
+            contract=contract, client=client, support_contact=support_contact or self.support_user,
+            event_status_id=1, attendee_number=index, event_date=date(2026, 2, 1 + index % 28), notes='Notes')
+
+    def create_events(self, n, sales_contact=None, support_contact=None):
+        return [self.create_event(sales_contact, support_contact) for _ in range(n)]
+
+    def api(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+
+class ResponseCacheTests(EpicEventsTestCase):
+
+    def test_superuser_list_is_invalidated_by_any_change(self):
+        event = self.create_event()
+        manager = self.api(self.superuser)
+        self.assertEqual(manager.get('/event/').json()[0]['attendee_number'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api(self.support_user).patch(f'/event/{event.pk}/', {'attendee_number': 50}, format='json')
+        self.assertEqual(manager.get('/event/').json()[0]['attendee_number'], 50)
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': True, 'TIMEOUT': 0})
+    def test_not_modified_only_while_the_response_is_cached(self):
+        event = self.create_event()
+        support = self.api(self.support_user)
+        etag = support.get(f'/event/{event.pk}/')['ETag']
+        # A change the version counters miss, e.g. made by another process: once the cached
+        # response expired, the current one is served.
+        Event.objects.filter(pk=event.pk).update(attendee_number=50)
+        response = support.get(f'/event/{event.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['attendee_number'], 50)
+
+    def test_retrieve_is_invalidated_when_the_object_leaves_the_scope(self):
+        event = self.create_event()
+        support = self.api(self.support_user)
+        self.assertEqual(support.get(f'/client/{event.client_id}/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            event.support_contact = self.other_support_user
+            event.save()
+        self.assertEqual(support.get(f'/client/{event.client_id}/').status_code, 404)
+        self.assertEqual(self.api(self.other_support_user).get(f'/client/{event.client_id}/').status_code, 200)
+
+
+# The validators of `conditional_response`, not the ETags of the response cache.
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class ConditionalRequestTests(EpicEventsTestCase):
+
+    def test_list_etag_follows_the_rows_served(self):
+        event = self.create_event()
+        support = self.api(self.support_user)
+        response = support.get('/client/')
+        self.assertFalse(response.has_header('Last-Modified'))
+        etag = response['ETag']
+        self.assertEqual(support.get('/client/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        event.support_contact = self.other_support_user
+        event.save()
+        response = support.get('/client/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_list_etag_adds_no_query(self):
+        self.create_event()
+        manager = self.api(self.superuser)
+        etag = manager.get('/client/')['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(manager.get('/client/').status_code, 200)
+        # The ETag is computed from the page served: a 304 runs the query of the list too.
+        with self.assertNumQueries(1):
+            self.assertEqual(manager.get('/client/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class RendererTests(EpicEventsTestCase):
+    """
+    `ORJSONRenderer` must write the bytes of DRF's `JSONRenderer`, which renders the responses
+    when orjson is not installed.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.events = [self.create_event(index=index) for index in range(3)]
+        Client.objects.filter(pk=self.events[0].client_id).update(
+            first_name='Zoé "Q" \\ \u2028', company_name='Société </script>')
+
+    def urls(self):
+        event = self.events[0]
+        return ['/client/', f'/client/{event.client_id}/', '/contract/', f'/contract/{event.contract_id}/',
+                '/event/', f'/event/{event.pk}/', '/client/?page_size=2', '/event/?page_size=2']
+
+    def drf_response(self, user, url):
+        with mock.patch('utils.renderers.orjson', None), override_settings(RESPONSE_CACHE={'ENABLED': False}):
+            return self.api(user).get(url)
+
+    def test_values(self):
+        values = {
+            'none': None,
+            'decimals': [decimal.Decimal('1000.50'), decimal.Decimal('-0.001'), decimal.Decimal('0')],
+            'datetimes': [
+                datetime.datetime(2026, 1, 1, 1, 2, 3),
+                datetime.datetime(2026, 1, 1, 1, 2, 3, 45),
+                datetime.datetime(2026, 1, 1, 1, 2, 3, 500, tzinfo=datetime.timezone.utc),
+                datetime.datetime(2026, 7, 1, 1, 2, 3, tzinfo=ZoneInfo('Europe/Paris')),
+            ],
+            'dates': [datetime.date(2026, 1, 2)],
+            'nested': {'amount': decimal.Decimal('10.5'), 'date': None, 'rows': [{'id': 1, 'notes': None}]},
+        }
+        for name, value in values.items():
+            with self.subTest(name):
+                self.assertEqual(ORJSONRenderer().render(value), JSONRenderer().render(value))
+                self.assertEqual(bytes(encode(value)), JSONRenderer().render(value))
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_list_and_detail_payloads(self):
+        for user in (self.commercial_user, self.support_user, self.superuser):
+            for url in self.urls():
+                with self.subTest(user=user.email, url=url):
+                    response = self.api(user).get(url)
+                    expected = self.drf_response(user, url)
+                    self.assertEqual(response.status_code, expected.status_code)
+                    self.assertEqual(response.content, expected.content)
+
+    def test_cached_pre_encoded_responses(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                self.api(self.commercial_user).get(url)
+                with self.assertNumQueries(0):
+                    cached = self.api(self.commercial_user).get(url)
+                self.assertEqual(cached.status_code, 200)
+                self.assertEqual(cached.content, self.drf_response(self.commercial_user, url).content)
+
+
+class ListQueriesTests(EpicEventsTestCase):
+    """
+    The lists run the same queries whatever the number of rows they return (no N+1 queries).
+    """
+
+    def test_lists(self):
+        for user in (self.commercial_user, self.support_user, self.superuser):
+            resources = ('client', 'event') if user is self.support_user else ('client', 'contract', 'event')
+            for resource in resources:
+                for url in (f'/{resource}/', f'/{resource}/?page_size=5'):
+                    with self.subTest(user=user.email, url=url):
+                        assert_constant_queries(self, url, user, self.create_events)
+
+    def test_keyset_next_page(self):
+        self.create_events(10)
+        cursor_url = self.api(self.commercial_user).get('/event/?page_size=3').json()['next']
+        assert_constant_queries(self, cursor_url, self.commercial_user, self.create_events)
+
+
+def fast_list_disabled(self, queryset):
+    raise AssertionError('The list must be served by its serializer')
+
+
+# The lists served by the serializers, with their query plans (see epicEvents/query_plans.py).
+@override_settings(FAST_LIST_SERIALIZATION={'ENABLED': False})
+@mock.patch('epicEvents.row_serializers.RowSerializerMixin.fast_list', fast_list_disabled)
+class QueryPlanListQueriesTests(ListQueriesTests):
+    pass
+
+
+class ActionQueriesTests(EpicEventsTestCase):
+    """
+    The object permissions are answered from the foreign key columns of the looked up row, so
+    each action runs a fixed number of queries whatever the role:
+    - list: the page,
+    - retrieve: the date_updated of the row (conditional_response) and the row,
+    - update: the row, its previous version (signals), the UPDATE, and the owners of the row
+      or its rollup.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.events = [self.create_event(index=index) for index in range(3)]
+        self.event = self.events[0]
+
+    def test_commercial_user(self):
+        event = self.event
+        for resource, pk, data in (('client', event.client_id, {'company_name': 'Updated'}),
+                                   ('contract', event.contract_id, {'amount_due': 12.5})):
+            with self.subTest(resource):
+                assert_action_queries(self, 'get', f'/{resource}/', self.commercial_user, 1)
+                assert_action_queries(self, 'get', f'/{resource}/{pk}/', self.commercial_user, 2)
+                assert_action_queries(self, 'patch', f'/{resource}/{pk}/', self.commercial_user, 4, data=data)
+        assert_action_queries(self, 'get', '/event/', self.commercial_user, 1)
+        assert_action_queries(self, 'get', f'/event/{event.pk}/', self.commercial_user, 2)
+
+    def test_support_user(self):
+        event = self.event
+        assert_action_queries(self, 'get', '/client/', self.support_user, 1)
+        assert_action_queries(self, 'get', f'/client/{event.client_id}/', self.support_user, 2)
+        assert_action_queries(self, 'get', '/event/', self.support_user, 1)
+        assert_action_queries(self, 'get', f'/event/{event.pk}/', self.support_user, 2)
+        # The sales contact of the client is read for the owners, and the event rollup updated.
+        assert_action_queries(self, 'patch', f'/event/{event.pk}/', self.support_user, 5,
+                              data={'attendee_number': 7})
+
+    def test_superuser(self):
+        event = self.event
+        for resource, pk in (('client', event.client_id), ('contract', event.contract_id), ('event', event.pk)):
+            with self.subTest(resource):
+                assert_action_queries(self, 'get', f'/{resource}/', self.superuser, 1)
+                assert_action_queries(self, 'get', f'/{resource}/{pk}/', self.superuser, 2)
+
+
+class ReplicaRoutingTests(EpicEventsTestCase):
+
+    @override_settings(REPLICA_ROUTING={'REPLICAS': ['replica_1'], 'STICKY_SECONDS': 5, 'CACHE': 'replica_routing'})
+    def test_sticky_users_are_shared_by_the_processes(self):
+        routers.mark_write(self.commercial_user)
+        # The process-local cache of another process does not hold it.
+        caches['default'].clear()
+        self.assertTrue(routers.is_sticky(self.commercial_user))
+        self.assertFalse(routers.is_sticky(self.support_user))
+        self.assertEqual(check_replica_routing_cache(None), [])
+
+    @override_settings(REPLICA_ROUTING={'REPLICAS': ['replica_1'], 'STICKY_SECONDS': 5, 'CACHE': 'default'})
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual([warning.id for warning in check_replica_routing_cache(None)], ['epicEvents.W003'])
+
+
+@override_settings(EVENT_DENORMALIZATION={'ENABLED': True})
+class DenormalizationTests(EpicEventsTestCase):
+    """
+    The copies of the client columns on the events (see epicEvents/denormalization.py) follow the
+    changes made through the models, the API and the bulk endpoints.
+    """
+
+    def assertDenormalized(self, *events):
+        for event in events:
+            event = Event.objects.select_related('client').get(pk=event.pk)
+            self.assertEqual(tuple(getattr(event, field) for field in denormalization.EVENT_FIELDS),
+                             denormalization.client_event_values(event.client))
+
+    def test_created_event(self):
+        event = self.create_event()
+        self.assertDenormalized(event)
+        self.assertEqual(Event.objects.get(pk=event.pk).client_sales_contact_id, self.commercial_user.pk)
+
+    def test_event_moved_to_another_client(self):
+        event, other = self.create_events(2)
+        Client.objects.filter(pk=other.client_id).update(sales_contact=self.other_commercial_user)
+        other_client = Client.objects.get(pk=other.client_id)
+        event.client = other_client
+        event.save()
+        self.assertDenormalized(event)
+        self.assertEqual(Event.objects.get(pk=event.pk).client_sales_contact_id, self.other_commercial_user.pk)
+
+    def test_client_changes(self):
+        event, other = self.create_events(2)
+        client = Client.objects.get(pk=event.client_id)
+        for field, value in (('sales_contact', self.other_commercial_user), ('first_name', 'Renamed'),
+                             ('last_name', 'ÉTÉ'), ('email', 'New.Email@Test.com')):
+            with self.subTest(field):
+                setattr(client, field, value)
+                client.save()
+                self.assertDenormalized(event, other)
+        self.assertEqual(Event.objects.get(pk=event.pk).client_email_key, 'new.email@test.com')
+
+    def test_client_changed_through_the_api(self):
+        event = self.create_event()
+        response = self.api(self.commercial_user).patch(
+            f'/client/{event.client_id}/', {'last_name': 'Patched'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertDenormalized(event)
+
+    def test_bulk_endpoints(self):
+        event, other = self.create_events(2)
+        response = self.api(self.commercial_user).post('/client/bulk/', [
+            {'id': event.client_id, 'first_name': 'Bulk', 'email': 'bulk@test.com'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertDenormalized(event)
+        response = self.api(self.commercial_user).post('/event/bulk/', [
+            {'contract': other.contract_id, 'client': other.client_id, 'support_contact': self.support_user.pk,
+             'event_status': 1, 'attendee_number': 3, 'event_date': '2026-03-01'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        created = Event.objects.get(pk=response.json()['results'][0]['data']['id'])
+        self.assertDenormalized(created)
+        self.assertEqual(created.client_sales_contact_id, self.commercial_user.pk)
+
+    def test_backfill(self):
+        events = self.create_events(3)
+        # Changes made without signals leave the columns stale.
+        Event.objects.filter(pk__in=[events[0].pk, events[2].pk]).update(client_name_key=None)
+        Client.objects.filter(pk=events[1].client_id).update(email='updated@test.com')
+        self.assertEqual([stale for _, stale in denormalization.backfill(batch_size=2, fix=False)], [2, 1])
+        self.assertEqual(Event.objects.filter(client_name_key=None).count(), 2)
+        self.assertEqual(sum(stale for _, stale in denormalization.backfill(batch_size=2)), 3)
+        self.assertDenormalized(*events)
+        self.assertEqual(sum(stale for _, stale in denormalization.backfill(fix=False)), 0)
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_filters_match_the_joined_lookups(self):
+        self.create_events(3)
+        self.create_events(2, self.other_commercial_user, self.other_support_user)
+        client = Event.objects.order_by('pk').first().client
+        client.first_name, client.last_name, client.email = 'Zoé', 'Dupont-Durand', 'Zoe.Dupont@Example.com'
+        client.save()
+        denormalization_off = override_settings(EVENT_DENORMALIZATION={'ENABLED': False})
+        queries = ['', '?client_email=EXAMPLE', '?client_email=client1', '?client_full_name=zo',
+                   '?client_full_name=NAME', '?client_full_name=t-d', '?last_name=dupont-durand',
+                   '?last_name=name', '?last_name=ame', '?event_date=2026-02-02']
+        for user in (self.commercial_user, self.other_commercial_user, self.support_user, self.superuser):
+            for query in queries:
+                with self.subTest(user=user.email, query=query):
+                    denormalized = self.api(user).get(f'/event/{query}')
+                    with denormalization_off:
+                        joined = self.api(user).get(f'/event/{query}')
+                    self.assertEqual(denormalized.status_code, 200)
+                    self.assertEqual(sorted(row['id'] for row in denormalized.json()),
+                                     sorted(row['id'] for row in joined.json()))
+        matches = {query: len(self.api(self.superuser).get(f'/event/{query}').json()) for query in queries}
+        self.assertEqual(matches, {'': 5, '?client_email=EXAMPLE': 1, '?client_email=client1': 1,
+                                   '?client_full_name=zo': 1, '?client_full_name=NAME': 4,
+                                   '?client_full_name=t-d': 1, '?last_name=dupont-durand': 1,
+                                   '?last_name=name': 4, '?last_name=ame': 0, '?event_date=2026-02-02': 1})
+
+
+class AsyncReadViewTests(EpicEventsTestCase):
+
+    async def test_async_lists_are_scoped_like_the_viewsets(self):
+        from asgiref.sync import sync_to_async
+
+        await sync_to_async(self.create_event)(index=1)
+        await sync_to_async(self.create_event)(self.other_commercial_user, self.other_support_user, index=2)
+        for user in (self.commercial_user, self.support_user, self.superuser):
+            token = await sync_to_async(RoleTokenObtainPairSerializer.get_token)(user)
+            for resource in ('client', 'contract', 'event'):
+                with self.subTest(user=user.email, resource=resource):
+                    response = await AsyncClient().get(f'/async/{resource}/', AUTHORIZATION=f'Bearer {token.access_token}')
+                    expected = await sync_to_async(self.api(user).get)(f'/{resource}/')
+                    self.assertEqual(response.status_code, expected.status_code)
+                    self.assertEqual(self.ids(json.loads(response.content)), self.ids(expected.json()))
+
+    @staticmethod
+    def ids(data):
+        # The ids of a list, other payloads (the message of a refused list) as they are.
+        return sorted(row['id'] for row in data) if isinstance(data, list) else data
+
+
+class RequestMetricsTests(EpicEventsTestCase):
+
+    async def test_async_requests_are_measured(self):
+        from asgiref.sync import sync_to_async
+
+        await sync_to_async(self.create_events)(3)
+        token = await sync_to_async(RoleTokenObtainPairSerializer.get_token)(self.commercial_user)
+        with self.assertLogs('epicEvents.requests') as logs:
+            response = await AsyncClient().get('/async/event/', AUTHORIZATION=f'Bearer {token.access_token}')
+        self.assertEqual(response.status_code, 200)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((record['view'], record['role'], record['status']), ('async-event-list', 'commercial', 200))
+        # The queries run in the thread of the `sync_to_async` calls of the view are counted.
+        self.assertGreater(record['sql_queries'], 0)
+
+    def test_metrics_require_the_token(self):
+        with override_settings(REQUEST_METRICS={'ENABLED': True, 'TOKEN': None}):
+            self.assertEqual(APIClient().get('/metrics/').status_code, 404)
+        with override_settings(REQUEST_METRICS={'ENABLED': True, 'TOKEN': 's3cret'}):
+            self.assertEqual(APIClient().get('/metrics/').status_code, 401)
+            response = APIClient().get('/metrics/', HTTP_AUTHORIZATION='Bearer s3cret')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'epic_requests_total', response.content)
+
+
+class ReportTests(EpicEventsTestCase):
+    """
+    The figures of the reports, over the rows of the scope of each role.
+    """
+
+    def setUp(self):
+        super().setUp()
+        today = timezone.now().date()
+        # The contracts of the commercial user: signed and overdue, in negotiation and due within
+        # 30 days, signed and paid; the contract of the other commercial user is due in 100 days.
+        for index, sales_contact, support_contact, status_id, contract_status, amount_due, due_in in [
+                (1, self.commercial_user, self.support_user, 1, 'signed', 1001.5, -5),
+                (2, self.commercial_user, self.other_support_user, 2, 'negotiation', 1002.5, 10),
+                (3, self.other_commercial_user, self.support_user, 1, 'signed', 1003.5, 100),
+                (4, self.commercial_user, self.support_user, 3, 'signed', 0, -5)]:
+            event = self.create_event(sales_contact, support_contact, index=index)
+            Event.objects.filter(pk=event.pk).update(event_status_id=status_id)
+            Contract.objects.filter(pk=event.contract_id).update(
+                contract_status=contract_status, amount_due=amount_due,
+                payment_due_date=today + datetime.timedelta(days=due_in))
+
+    def report(self, user, name, *keys):
+        response = self.api(user).get(f'/reports/{name}/')
+        self.assertEqual(response.status_code, 200)
+        return [tuple(row[key] for key in keys) for row in response.json()]
+
+    def test_revenue(self):
+        keys = ('sales_contact_email', 'contracts', 'total_amount', 'signed_amount', 'rank', 'signed_share')
+        self.assertEqual(self.report(self.superuser, 'revenue', *keys), [
+            ('commercial2@test.com', 1, 1003.5, 1003.5, 1, 50.05),
+            ('commercial@test.com', 3, 2004.0, 1001.5, 2, 49.95),
+        ])
+        self.assertEqual(self.report(self.commercial_user, 'revenue', *keys), [
+            ('commercial@test.com', 3, 2004.0, 1001.5, 1, 100.0),
+        ])
+        self.assertEqual(self.report(self.support_user, 'revenue', *keys), [])
+
+    def test_contracts_by_status(self):
+        keys = ('contract_status', 'contracts', 'amount')
+        self.assertEqual(self.report(self.superuser, 'contracts-by-status', *keys), [
+            ('negotiation', 1, 1002.5), ('signed', 3, 2005.0),
+        ])
+        self.assertEqual(self.report(self.commercial_user, 'contracts-by-status', *keys), [
+            ('negotiation', 1, 1002.5), ('signed', 2, 1001.5),
+        ])
+        self.assertEqual(self.report(self.support_user, 'contracts-by-status', *keys), [])
+
+    def test_unpaid(self):
+        keys = ('bucket', 'contracts', 'amount')
+        self.assertEqual(self.report(self.superuser, 'unpaid', *keys), [
+            ('overdue', 1, 1001.5), ('due_within_30_days', 1, 1002.5), ('due_within_60_days', 0, 0),
+            ('due_within_90_days', 0, 0), ('due_after_90_days', 1, 1003.5),
+        ])
+        self.assertEqual(self.report(self.commercial_user, 'unpaid', *keys), [
+            ('overdue', 1, 1001.5), ('due_within_30_days', 1, 1002.5), ('due_within_60_days', 0, 0),
+            ('due_within_90_days', 0, 0), ('due_after_90_days', 0, 0),
+        ])
+        self.assertEqual(self.report(self.support_user, 'unpaid', *keys), [
+            ('overdue', 0, 0), ('due_within_30_days', 0, 0), ('due_within_60_days', 0, 0),
+            ('due_within_90_days', 0, 0), ('due_after_90_days', 0, 0),
+        ])
+
+    def test_events(self):
+        keys = ('support_contact_email', 'event_status_name', 'events', 'attendees', 'support_contact_events')
+        self.assertEqual(self.report(self.superuser, 'events', *keys), [
+            ('support@test.com', 'preparation', 2, 4, 3), ('support@test.com', 'finished', 1, 4, 3),
+            ('support2@test.com', 'ongoing', 1, 2, 1),
+        ])
+        # The events of the clients of the commercial user.
+        self.assertEqual(self.report(self.commercial_user, 'events', *keys), [
+            ('support@test.com', 'preparation', 1, 1, 2), ('support@test.com', 'finished', 1, 4, 2),
+            ('support2@test.com', 'ongoing', 1, 2, 1),
+        ])
+        self.assertEqual(self.report(self.support_user, 'events', *keys), [
+            ('support@test.com', 'preparation', 2, 4, 3), ('support@test.com', 'finished', 1, 4, 3),
+        ])
+
+
+class RollupTests(EpicEventsTestCase):
+    """
+    The rollups maintained by the signals, compared with a full recompute after every change.
+    """
+
+    def dashboard(self):
+        return rollups.dashboard(ContractRollup.objects.all(), EventRollup.objects.all())
+
+    def assertRollupsRecomputed(self):
+        self.assertEqual(rollups.reconcile(Contract), [])
+        self.assertEqual(rollups.reconcile(Event), [])
+        dashboard = self.dashboard()
+        savepoint = transaction.savepoint()
+        ContractRollup.objects.all().delete()
+        EventRollup.objects.all().delete()
+        rollups.reconcile(Contract, fix=True)
+        rollups.reconcile(Event, fix=True)
+        recomputed = self.dashboard()
+        transaction.savepoint_rollback(savepoint)
+        self.assertEqual(dashboard, recomputed)
+        return dashboard
+
+    def test_created(self):
+        self.create_events(2)
+        self.create_event(self.other_commercial_user, self.other_support_user)
+        dashboard = self.assertRollupsRecomputed()
+        self.assertEqual(dashboard['contracts_by_sales_contact'], [
+            {'sales_contact': self.commercial_user.pk, 'contracts': 2, 'amount_due': 2002.0},
+            {'sales_contact': self.other_commercial_user.pk, 'contracts': 1, 'amount_due': 1002.5},
+        ])
+        self.assertEqual(dashboard['events_by_status'], [{'event_status': 1, 'events': 3, 'attendees': 3}])
+
+    def test_moved(self):
+        event, other = self.create_events(2)
+        event.support_contact = self.other_support_user
+        event.event_date = date(2026, 3, 1)
+        event.save()
+        contract = other.contract
+        contract.sales_contact = self.other_commercial_user
+        contract.save()
+        dashboard = self.assertRollupsRecomputed()
+        self.assertEqual([row['support_contact'] for row in dashboard['events_by_support_contact']],
+                         [self.support_user.pk, self.other_support_user.pk])
+
+    def test_status_and_values_changed(self):
+        event = self.create_event()
+        self.create_event()
+        event.event_status_id = 2
+        event.attendee_number = 40
+        event.save()
+        contract = event.contract
+        contract.contract_status = 'negotiation'
+        contract.amount_due = 10
+        contract.save()
+        dashboard = self.assertRollupsRecomputed()
+        self.assertEqual(dashboard['contracts_by_status'], [
+            {'contract_status': 'negotiation', 'contracts': 1, 'amount_due': 10},
+            {'contract_status': 'signed', 'contracts': 1, 'amount_due': 1001.5},
+        ])
+        self.assertEqual(dashboard['events_by_status'], [
+            {'event_status': 1, 'events': 1, 'attendees': 1},
+            {'event_status': 2, 'events': 1, 'attendees': 40},
+        ])
+
+    def test_deleted(self):
+        event, other, _ = self.create_events(3)
+        event.delete()
+        # Deleting the contract deletes its event too.
+        other.contract.delete()
+        dashboard = self.assertRollupsRecomputed()
+        self.assertEqual(dashboard['contracts_by_status'], [{'contract_status': 'signed', 'contracts': 2, 'amount_due': 2003.0}])
+        self.assertEqual(dashboard['events_by_status'], [{'event_status': 1, 'events': 1, 'attendees': 2}])
+
+    def test_reconcile_changes_made_without_signals(self):
+        old, event = self.create_events(2)
+        Event.objects.filter(pk=event.pk).update(event_date=date(2026, 4, 1), attendee_number=7)
+        Event.objects.filter(pk=old.pk).update(event_date=date(2025, 1, 1))
+        self.assertEqual(rollups.reconcile(Event, since=date(2026, 1, 1)), [
+            ((date(2026, 2, 1), self.support_user.pk, 1), None, (1, 0)),
+            ((date(2026, 2, 2), self.support_user.pk, 1), None, (1, 1)),
+            ((date(2026, 4, 1), self.support_user.pk, 1), (1, 7), None),
+        ])
+        self.assertEqual(len(rollups.reconcile(Event, since=date(2026, 1, 1), fix=True)), 3)
+        # The rows before `since` are left as they are.
+        self.assertEqual(rollups.reconcile(Event), [((date(2025, 1, 1), self.support_user.pk, 1), (1, 0), None)])
+        rollups.reconcile(Event, fix=True)
+        self.assertRollupsRecomputed()
@@ -1,18 +1,41 @@
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework import viewsets
+from rest_framework.views import APIView
+from rest_framework.decorators import action
 from rest_framework import status
+import hmac
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from epicEvents.models import Client, Contract, Event
-from epicEvents.permissions import EventPermission, ClientAndContractPermission
+from epicEvents.permissions import EventPermission, ClientAndContractPermission, ReportPermission
 from epicEvents.serializers import ClientSerializer, ContractSerializer, EventSerializer, UserSerializer
+from .bulk import BulkSaveMixin
+from .cache import cache_response, invalidate
+from .conditional import conditional_response
+from .exports import EXPORT_FORMATS, streaming_export
 from .filters import ClientFilterSet, ContractFilterSet, EventFilterSet
+from .instrumentation import InstrumentedViewMixin, get_config as get_metrics_config
+from . import reports, rollups
+from .query_plans import QueryPlan
+from .replicas import ReadReplicaMixin
+from .row_serializers import RowSerializer, RowSerializerMixin
+from .scoping import (
+    ScopedQuerysetMixin, scoped_clients, scoped_contract_rollups, scoped_contracts, scoped_event_rollups,
+    scoped_events)
+from .search import FullTextSearchFilter
+from utils.database import check_database, connection_stats
+from utils.metrics import REGISTRY
 
 # Create your views here.
 
 
-class ClientViewset(viewsets.ModelViewSet):
+class ClientViewset(InstrumentedViewMixin, ReadReplicaMixin, ScopedQuerysetMixin, RowSerializerMixin,
+                    BulkSaveMixin, viewsets.ModelViewSet):
     """
     A viewset that provides CRUD operations for Client objects.
 
@@ -23,44 +46,68 @@ class ClientViewset(viewsets.ModelViewSet):
     are the support contact for. This is enforced through the `ClientAndContractPermission`
     permission class.
 
-    This viewset supports filtering and searching by client name and email.
+    This viewset supports filtering and searching by client name and email, and a
+    full-text search over the name, company and email of the clients with `?q=`.
+
+    Clients can be created and updated in batches with `POST /client/bulk/` (see `BulkSaveMixin`).
 
     """
     serializer_class = ClientSerializer
     queryset = Client.objects.all()
     permission_classes = [IsAuthenticated, ClientAndContractPermission]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, FullTextSearchFilter]
     filterset_class = ClientFilterSet
-    search_fields = ['full_name', 'last_name', 'email']
+    search_fields = ['first_name', 'last_name', 'email']
+    search_vectors = ['search_vector']
+    search_fallback_fields = ['first_name', 'last_name', 'company_name', 'email']
+    query_plan = QueryPlan(ClientSerializer, extra_fields=['date_created'])
+    row_serializer = RowSerializer(ClientSerializer, extra_fields=['date_created'])
+
 
+    def get_scoped_queryset(self, user):
+        """
+        Returns the clients the user can access (see `epicEvents.scoping`).
+        """
+        return scoped_clients(user)
 
+    @cache_response
+    @conditional_response
     def list(self, request):
         """
         Return a list of all clients that the requesting user is authorized to access.
 
         For commercial users, only clients they are the sales contact for will be returned.
         For support users, only clients with events they are the support contact for will
-        be returned. All other users will receive a list of all clients.
+        be returned. Superusers will receive a list of all clients.
 
         Clients can be filtered by name and email using the `search` parameter in thess
         query string. Additionally, clients can be filtered using any of the fields in
-        the `ClientFilterSet`.
+        the `ClientFilterSet`. Passing `page_size` or `cursor` switches the response to
+        keyset pagination (see `KeysetPagination`).
 
         Returns:
             A list of serialized clients that match the specified filters.
         """
-        user = request.user
-        if user.is_commercial():
-            queryset = Client.objects.filter(sales_contact=user)
-            queryset = self.filter_queryset(queryset)
-        elif user.is_support():
-            user_clients_id = Event.objects.filter(
-                support_contact=user).values_list('client_id', flat=True).distinct()
-            queryset = Client.objects.filter(id__in=user_clients_id)
-            queryset = self.filter_queryset(queryset)
+        queryset = self.filter_queryset(self.get_scoped_queryset(request.user))
+        if self.row_serializer.enabled():
+            return self.fast_list(queryset)
+        queryset = self.query_plan.apply(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = ClientSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = ClientSerializer(queryset, many=True)
         return Response(serializer.data)
 
+    @cache_response
+    @conditional_response
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns the client, answering conditional requests (see `conditional_response`) and
+        served from the response cache when it did not change (see `cache_response`).
+        """
+        return super().retrieve(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         """
         Create a new client object.
@@ -80,8 +127,24 @@ class ClientViewset(viewsets.ModelViewSet):
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def get_bulk_update_queryset(self, user):
+        """
+        Returns the clients the user can update in a batch: commercial users update their own clients.
+        """
+        if user.is_commercial():
+            return Client.objects.filter(sales_contact_id=user.pk)
+        return Client.objects.none()
+
+    def before_bulk_create(self, objects, request):
+        """
+        Sets the requesting user as the sales contact of the clients created in a batch, like `create`.
+        """
+        for client in objects:
+            client.sales_contact = request.user
+
 
-class ContractViewset(viewsets.ModelViewSet):
+class ContractViewset(InstrumentedViewMixin, ReadReplicaMixin, ScopedQuerysetMixin, RowSerializerMixin,
+                      BulkSaveMixin, viewsets.ModelViewSet):
     """
     A viewset for handling CRUD operations on contracts.
 
@@ -92,14 +155,21 @@ class ContractViewset(viewsets.ModelViewSet):
         filter_backends: The filter backends used for filtering contracts.
         filterset_class: The filterset class used for filtering contracts.
         search_fields: The search fields used for searching contracts.
+        search_vectors: The full-text search vectors searched with `?q=` (those of the clients).
+        query_plan: The columns and joins loaded for the serialized list of contracts.
+        row_serializer: The fast serialization of the list of contracts (see `RowSerializer`).
     """
     serializer_class = ContractSerializer
     queryset = Contract.objects.all()
     permission_classes = [IsAuthenticated, ClientAndContractPermission]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, FullTextSearchFilter]
     filterset_class = ContractFilterSet
-    search_fields = ['client_email', 'client_full_name',
-                     'last_name', 'date_created', 'amount']
+    search_fields = ['client__email', 'client__first_name', 'client__last_name']
+    search_vectors = ['client__search_vector']
+    search_fallback_fields = ['client__first_name', 'client__last_name',
+                              'client__company_name', 'client__email']
+    query_plan = QueryPlan(ContractSerializer, extra_fields=['date_created'])
+    row_serializer = RowSerializer(ContractSerializer, extra_fields=['date_created'])
 
     def get_client(self, request):
         """
@@ -119,6 +189,8 @@ class ContractViewset(viewsets.ModelViewSet):
                 return None
         return None
 
+    @cache_response
+    @conditional_response
     def list(self, request):
         """
         Retrieves a list of contracts.
@@ -126,6 +198,9 @@ class ContractViewset(viewsets.ModelViewSet):
         The contracts are filtered according to the user's role:
             - commercial users can only access contracts they created.
             - support users are not allowed to access contracts.
+            - superusers access every contract.
+
+        Passing `page_size` or `cursor` switches the response to keyset pagination.
 
         Args:
             request: The request object.
@@ -134,14 +209,56 @@ class ContractViewset(viewsets.ModelViewSet):
             A Response object containing the serialized contracts.
         """
         user = request.user
-        if user.is_commercial():
-            queryset = Contract.objects.filter(sales_contact=request.user)
-            queryset = self.filter_queryset(queryset)
-            serializer = ContractSerializer(queryset, many=True)
-            return Response(serializer.data)
-        elif user.is_support():
+        if user.is_support():
             message = "Support users can't access Contratcs"
             return Response({'message': message})
+        queryset = self.filter_queryset(self.get_scoped_queryset(user))
+        if self.row_serializer.enabled():
+            return self.fast_list(queryset)
+        queryset = self.query_plan.apply(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = ContractSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = ContractSerializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @cache_response
+    @conditional_response
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns the contract, answering conditional requests (see `conditional_response`) and
+        served from the response cache when it did not change (see `cache_response`).
+        """
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_scoped_queryset(self, user):
+        """
+        Returns the contracts the user can access (see `epicEvents.scoping`).
+        """
+        return scoped_contracts(user)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Streams the contracts the user can access, as NDJSON (default) or CSV with `?export_format=csv`.
+
+        The export accepts the filters of the `ContractFilterSet` and the search parameters of
+        the list. Rows are streamed from a server-side cursor, so the memory used does not depend
+        on the number of exported contracts.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            A StreamingHttpResponse with the exported contracts, or a 400 response for an unknown format.
+        """
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response({'export_format': f"Unknown format, use one of {', '.join(EXPORT_FORMATS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_scoped_queryset(request.user))
+        return streaming_export(queryset, ContractSerializer, export_format, 'contracts')
 
     def create(self, request, *args, **kwargs):
         """
@@ -178,8 +295,33 @@ class ContractViewset(viewsets.ModelViewSet):
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def get_bulk_update_queryset(self, user):
+        """
+        Returns the contracts the user can update in a batch: the contracts they are the sales contact of.
+        """
+        return Contract.objects.filter(sales_contact_id=user.pk)
 
-class EventViewset(viewsets.ModelViewSet):
+    def before_bulk_create(self, objects, request):
+        """
+        Sets the requesting user as the sales contact of the contracts created in a batch, like `create`.
+        """
+        for contract in objects:
+            contract.sales_contact = request.user
+
+    def after_bulk_save(self, created, updated, request):
+        """
+        Turns the potential clients of the signed contracts created in a batch into customers, like `create`.
+        """
+        client_ids = {contract.client_id for contract in created if contract.contract_status == 'signed'}
+        if client_ids:
+            clients = Client.objects.filter(pk__in=client_ids, client_status='potential')
+            # update() sends no post_save signal.
+            invalidate(Client, clients.only('pk', 'sales_contact_id'))
+            clients.update(client_status='customer', date_updated=timezone.now())
+
+
+class EventViewset(InstrumentedViewMixin, ReadReplicaMixin, ScopedQuerysetMixin, RowSerializerMixin,
+                   BulkSaveMixin, viewsets.ModelViewSet):
     """
     A viewset for handling CRUD operations for Event model instances.
 
@@ -191,6 +333,12 @@ class EventViewset(viewsets.ModelViewSet):
     create:
     Creates an event instance if the corresponding contract exists and is signed.
 
+    export:
+    Streams the events the user can access as NDJSON or CSV.
+
+    bulk:
+    Creates and updates a batch of events (see `BulkSaveMixin`).
+
     get_client:
     Gets the client instance from the request data.
 
@@ -217,15 +365,28 @@ class EventViewset(viewsets.ModelViewSet):
 
     search_fields:
     Specifies the search fields for the viewset.
+
+    search_vectors:
+    Specifies the full-text search vectors searched with `?q=` (the event notes and the client).
+
+    query_plan:
+    Specifies the columns and joins loaded for the serialized list.
+
+    row_serializer:
+    Specifies the fast serialization of the list (see `RowSerializer`).
     """
 
     serializer_class = EventSerializer
     queryset = Event.objects.all()
     permission_classes = [IsAuthenticated, EventPermission]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, FullTextSearchFilter]
     filterset_class = EventFilterSet
-    search_fields = ['client_email', 'client_full_name',
-                     'last_name', 'event_date']
+    search_fields = ['client__email', 'client__first_name', 'client__last_name', 'notes']
+    search_vectors = ['search_vector', 'client__search_vector']
+    search_fallback_fields = ['notes', 'client__first_name', 'client__last_name',
+                              'client__company_name', 'client__email']
+    query_plan = QueryPlan(EventSerializer, extra_fields=['date_created'])
+    row_serializer = RowSerializer(EventSerializer, extra_fields=['date_created'])
 
     def get_client(self, request):
         """
@@ -279,11 +440,16 @@ class EventViewset(viewsets.ModelViewSet):
         else:
             return True
 
+    @cache_response
+    @conditional_response
     def list(self, request):
         """
         Returns a list of events depending on the user's role:
             - For support users, it returns a list of all the events they are assigned to.
             - For commercial users, it returns a list of all events for their clients.
+            - For superusers, it returns every event.
+
+        Passing `page_size` or `cursor` switches the response to keyset pagination.
 
         Args:
             request: The HTTP request.
@@ -291,17 +457,53 @@ class EventViewset(viewsets.ModelViewSet):
         Returns:
             A response with the serialized list of events.
         """
-        user = request.user
-        if user.is_support():
-            queryset = Event.objects.filter(support_contact=request.user)
-            queryset = self.filter_queryset(queryset)
-            serializer = EventSerializer(queryset, many=True)
-            return Response(serializer.data)
-        elif user.is_commercial():
-            queryset = Event.objects.filter(client__sales_contact=request.user)
-            queryset = self.filter_queryset(queryset)
-            serializer = EventSerializer(queryset, many=True)
-            return Response(serializer.data)
+        queryset = self.filter_queryset(self.get_scoped_queryset(request.user))
+        if self.row_serializer.enabled():
+            return self.fast_list(queryset)
+        queryset = self.query_plan.apply(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = EventSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = EventSerializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @cache_response
+    @conditional_response
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns the event, answering conditional requests (see `conditional_response`) and
+        served from the response cache when it did not change (see `cache_response`).
+        """
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_scoped_queryset(self, user):
+        """
+        Returns the events the user can access (see `epicEvents.scoping`).
+        """
+        return scoped_events(user)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Streams the events the user can access, as NDJSON (default) or CSV with `?export_format=csv`.
+
+        The export accepts the filters of the `EventFilterSet` and the search parameters of
+        the list. Rows are streamed from a server-side cursor, so the memory used does not depend
+        on the number of exported events.
+
+        Args:
+            request: The HTTP request.
+
+        Returns:
+            A StreamingHttpResponse with the exported events, or a 400 response for an unknown format.
+        """
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response({'export_format': f"Unknown format, use one of {', '.join(EXPORT_FORMATS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_scoped_queryset(request.user))
+        return streaming_export(queryset, EventSerializer, export_format, 'events')
 
     def create(self, request, *args, **kwargs):
         """
@@ -326,6 +528,154 @@ class EventViewset(viewsets.ModelViewSet):
             return Response({'client': 'Cannot create a contract for contract that is not already signed'})
         return super().create(request, *args, **kwargs)
 
+    def get_bulk_update_queryset(self, user):
+        """
+        Returns the events the user can update in a batch: support users update the events they support.
+        """
+        if user.is_support():
+            return Event.objects.filter(support_contact_id=user.pk)
+        return Event.objects.none()
+
+    def bulk_can_create(self, user):
+        """
+        Returns True if the user can create events in a batch: commercial users and superusers.
+        """
+        return user.is_superuser or user.is_commercial()
+
+    def validate_bulk_item(self, serializer):
+        """
+        Checks that the client and the contract of an event created in a batch match and that the
+        contract is signed, like `create`.
+        """
+        if serializer.instance is not None:
+            return None
+        client = serializer.validated_data['client']
+        contract = serializer.validated_data['contract']
+        # Compares the client_id column so that no query is run per item.
+        if contract.client_id != client.pk:
+            return {'event': ["The contract you are indicating does not match the correct client"]}
+        if contract.contract_status != "signed":
+            return {'client': ['Cannot create a contract for contract that is not already signed']}
+        return None
+
+
+class ReportViewset(InstrumentedViewMixin, ReadReplicaMixin, viewsets.ViewSet):
+    """
+    A viewset for the aggregated reports, computed in the database with one query each.
+
+    Every report is computed over the contracts or the events the user can access (see
+    `epicEvents.scoping`): managers see every sales and support contact, commercial users
+    their own figures and support users the figures of their events.
+
+    list:
+    Returns the urls of the reports.
+
+    revenue:
+    Returns the number and the amount of the contracts per sales contact, ranked by signed amount.
+
+    contracts_by_status:
+    Returns the number and the amount of the contracts per status.
+
+    unpaid:
+    Returns the amounts due per bucket of payment due date (overdue, within 30/60/90 days, later).
+
+    events:
+    Returns the number of events and attendees per support contact and event status.
+
+    dashboard:
+    Returns the contracts and events per status and per contact, read from the rollups.
+    """
+    permission_classes = [IsAuthenticated, ReportPermission]
+
+    def list(self, request):
+        """
+        Returns the urls of the reports.
+        """
+        names = ['revenue', 'contracts-by-status', 'unpaid', 'events', 'dashboard']
+        return Response({name: request.build_absolute_uri(f'{name}/') for name in names})
+
+    @action(detail=False, methods=['get'])
+    def revenue(self, request):
+        """
+        Returns the revenue per sales contact (see `reports.revenue_per_sales_contact`).
+        """
+        return Response(reports.revenue_per_sales_contact(scoped_contracts(request.user)))
+
+    @action(detail=False, methods=['get'], url_path='contracts-by-status')
+    def contracts_by_status(self, request):
+        """
+        Returns the contracts per status (see `reports.contracts_by_status`).
+        """
+        return Response(reports.contracts_by_status(scoped_contracts(request.user)))
+
+    @action(detail=False, methods=['get'])
+    def unpaid(self, request):
+        """
+        Returns the unpaid amounts per bucket of payment due date (see `reports.unpaid_by_due_date`).
+        """
+        return Response(reports.unpaid_by_due_date(scoped_contracts(request.user)))
+
+    @action(detail=False, methods=['get'])
+    def events(self, request):
+        """
+        Returns the events per support contact and status (see `reports.events_per_support_contact`).
+        """
+        return Response(reports.events_per_support_contact(scoped_events(request.user)))
+
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """
+        Returns the dashboard figures read from the summary tables (see `rollups.dashboard`), which
+        costs the same whatever the number of contracts and events. `?since=YYYY-MM-DD` restricts
+        them to the contracts created and the events happening from that day on.
+
+        The event rollups are grouped by support contact: commercial users find the events of
+        their clients in `reports/events/`.
+        """
+        since = request.query_params.get('since')
+        if since is not None:
+            since = parse_date(since)
+            if since is None:
+                return Response({'since': 'Invalid date, use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(rollups.dashboard(scoped_contract_rollups(request.user),
+                                          scoped_event_rollups(request.user), since=since))
+
+
+class HealthView(APIView):
+    """
+    Health probe of the API, for the load balancer or the orchestrator: answers 200 when the
+    database answers a trivial query, 503 otherwise.
+
+    The response also holds the connection acquisition statistics of the process (see
+    `utils.database.connection_stats`): the number of connections opened and reused, and
+    the time spent waiting for them.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        result = check_database()
+        data = {
+            'database': {'ok': result['ok'], 'latency_ms': round(result['seconds'] * 1000, 1)},
+            'connections': connection_stats(),
+        }
+        return Response(data, status=status.HTTP_200_OK if result['ok'] else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+def metrics(request):
+    """
+    Exposes the metrics of the process in the Prometheus text format (see `RequestMetricsMiddleware`
+    and `utils.metrics`). The scraper must send `REQUEST_METRICS['TOKEN']` as a bearer token;
+    without a token configured, the metrics are only exposed in DEBUG (local development).
+    """
+    token = get_metrics_config()['TOKEN']
+    if not token:
+        if not settings.DEBUG:
+            raise Http404
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 
 class UserViewset(viewsets.ModelViewSet):
     """
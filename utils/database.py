@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from utils.metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (in seconds) of the buckets of the connection acquisition histogram.
+ACQUIRE_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+
+_lock = threading.Lock()
+_stats = {}
+
+acquire_seconds = histogram('epic_db_connection_acquire_seconds',
+                            'Time spent waiting for a usable database connection.',
+                            ['alias', 'kind'], ACQUIRE_BUCKETS)
+
+
+def _new_stats():
+    return {
+        'opened': 0,
+        'reused': 0,
+        'failed': 0,
+        'wait_seconds_total': 0.0,
+        'wait_seconds_max': 0.0,
+        'wait_buckets': [0] * (len(ACQUIRE_BUCKETS) + 1),
+    }
+
+
+def record_acquisition(alias, seconds, opened, failed=False):
+    """
+    Record the time a request waited for a usable connection: the connection setup (TCP,
+    TLS, authentication) when a new connection was `opened`, the health check query of a
+    persistent connection otherwise.
+    """
+    with _lock:
+        stats = _stats.setdefault(alias, _new_stats())
+        if failed:
+            stats['failed'] += 1
+        else:
+            stats['opened' if opened else 'reused'] += 1
+        stats['wait_seconds_total'] += seconds
+        stats['wait_seconds_max'] = max(stats['wait_seconds_max'], seconds)
+        index = next((i for i, bound in enumerate(ACQUIRE_BUCKETS) if seconds <= bound), len(ACQUIRE_BUCKETS))
+        stats['wait_buckets'][index] += 1
+    acquire_seconds.observe(seconds, alias=alias, kind='failed' if failed else 'opened' if opened else 'reused')
+    slow = getattr(settings, 'DB_SLOW_ACQUIRE_MS', None)
+    if slow is not None and seconds * 1000 >= slow:
+        logger.warning('Waited %.1f ms for a connection to the %r database (%s)', seconds * 1000, alias,
+                       'failed' if failed else 'new connection' if opened else 'health check')
+
+
+def connection_stats():
+    """
+    Return the connection acquisition statistics of the process, per database alias.
+    """
+    with _lock:
+        return {alias: {**stats, 'wait_buckets': list(stats['wait_buckets'])} for alias, stats in _stats.items()}
+
+
+def reset_connection_stats():
+    with _lock:
+        _stats.clear()
+
+
+def check_database(alias='default'):
+    """
+    Run a trivial query on the database and return whether it answered and how long it took,
+    connection setup included.
+
+    Returns:
+        dict: {'alias', 'ok', 'seconds', 'error'}.
+    """
+    start = time.perf_counter()
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except DatabaseError as exc:
+        return {'alias': alias, 'ok': False, 'seconds': time.perf_counter() - start, 'error': str(exc)}
+    return {'alias': alias, 'ok': True, 'seconds': time.perf_counter() - start, 'error': None}
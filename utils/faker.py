@@ -1,68 +1,183 @@
 from epicEvents.models import Client,Contract,Event,EventStatus
 from authentication.models import User
-from django.contrib.auth.models import Group
+from django.db import connection, transaction
+from django.db.models import Max
 from django.utils import timezone
-from django.shortcuts import get_object_or_404
+import io
 import random
-from random import randint
-from datetime import date, timedelta
+import time
+from datetime import timedelta
 from faker import Faker
 
+# Size of the pools of fake values rows are drawn from: generating every value with Faker
+# is by far the slowest part of seeding millions of rows.
+POOL_SIZE = 1000
 
 
-def generate_fake_data():
+class FakeDataPools:
     """
-    It creates a client, creates a contract for that client, and creates an event for that contract.
+    Pools of fake values, drawn at random to build rows without calling Faker for every field.
     """
-    fake = Faker()
-    sales_contact = User.objects.filter(groups__name='commercial').first()
-    support_contact = User.objects.filter(groups__name='support').first()
 
+    def __init__(self, fake):
+        self.first_names = [fake.first_name()[:25] for _ in range(POOL_SIZE)]
+        self.last_names = [fake.last_name()[:25] for _ in range(POOL_SIZE)]
+        self.companies = [fake.company()[:255] for _ in range(POOL_SIZE)]
+        self.user_names = [fake.user_name()[:30] for _ in range(POOL_SIZE)]
+        self.domains = [fake.free_email_domain() for _ in range(50)]
+        self.phones = [fake.phone_number()[:20] for _ in range(POOL_SIZE)]
+        self.notes = [fake.text(max_nb_chars=500) for _ in range(POOL_SIZE // 10)]
+
+
+def get_event_statuses():
+    """
+    Return the hardcoded EventStatus rows (id 1 to 3), creating the missing ones in an empty database.
+    """
+    statuses = {status.pk: status for status in EventStatus.objects.all()}
+    for pk, (status, _) in enumerate(EventStatus.EVENT_STATUS_CHOICES, start=1):
+        if pk not in statuses:
+            statuses[pk] = EventStatus.objects.create(pk=pk, status=status)
+    return [statuses[pk] for pk in sorted(statuses)]
+
+
+def reserve_ids(model, count):
+    """
+    Reserve `count` primary keys from the PostgreSQL sequence of the model, for rows inserted with COPY.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [f'"{table}"', count])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_objects(model, objects):
+    """
+    Insert the objects with PostgreSQL COPY, which is several times faster than INSERT.
+    The objects are given a primary key reserved from the table sequence first.
+    """
+    now = timezone.now()
+    for obj, pk in zip(objects, reserve_ids(model, len(objects))):
+        obj.pk = pk
+        obj.date_created = obj.date_updated = now
+    fields = [field for field in model._meta.concrete_fields]
+    buffer = io.StringIO()
+    for obj in objects:
+        values = []
+        for field in fields:
+            value = field.get_db_prep_save(getattr(obj, field.attname), connection)
+            if value is None:
+                values.append('\\N')
+            else:
+                values.append(str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r'))
+        buffer.write('\t'.join(values) + '\n')
+    buffer.seek(0)
+    columns = ', '.join(f'"{field.column}"' for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY "{model._meta.db_table}" ({columns}) FROM STDIN', buffer)
+    return objects
+
+
+def generate_fake_data(clients=25, contracts_per_client=50, events_per_contract=2,
+                       batch_size=1000, seed=None, use_copy=False, stdout=None):
+    """
+    It creates clients, creates contracts for those clients, and creates events for those contracts.
+
+    Rows are built in memory and written with `bulk_create` (or PostgreSQL COPY), one transaction
+    per batch of clients, so that seeding millions of rows stays practical. The clients and
+    contracts are spread over the commercial users and the events over the support users.
+
+    Args:
+        clients (int): The number of clients to create.
+        contracts_per_client (int): The number of contracts created for each client.
+        events_per_contract (int): The number of events created for each contract.
+        batch_size (int): The number of contracts written per transaction and per INSERT.
+        seed (int, optional): Seed of the random generators, to generate the same data again.
+        use_copy (bool): Write the rows with PostgreSQL COPY instead of INSERT.
+        stdout (OutputWrapper, optional): Where the progress is reported.
+
+    Returns:
+        dict: The number of rows created per model, the total, the elapsed seconds and the rows per second.
+
+    Raises:
+        ValueError: If there is no commercial or no support user, or COPY is used on another database.
+    """
+    if use_copy and connection.vendor != 'postgresql':
+        raise ValueError('COPY is only available on PostgreSQL')
+    fake = Faker()
+    if seed is not None:
+        Faker.seed(seed)
+        random.seed(seed)
+    sales_contacts = list(User.objects.filter(groups__name='commercial').order_by('pk').values_list('pk', flat=True))
+    support_contacts = list(User.objects.filter(groups__name='support').order_by('pk').values_list('pk', flat=True))
+    if not sales_contacts or not support_contacts:
+        raise ValueError('Fake data needs at least one commercial and one support user')
+    event_statuses = get_event_statuses()
+    pools = FakeDataPools(fake)
+    client_statuses = [c[0] for c in Client.CLIENT_STATUS_CHOICES]
+    contract_statuses = [c[0] for c in Contract.CONTRACT_STATUS_CHOICES]
     start_date = timezone.now().date()
-    end_date = start_date + timedelta(days=364)
-    future_date = fake.date_between(start_date=start_date, end_date=end_date)
-    for i in range(25):
-        client = Client.objects.create(
-            first_name=fake.first_name()[:random.randint(5, 25)],
-            last_name=fake.last_name()[:random.randint(5, 25)],
-            company_name = fake.company()[:random.randint(5, 255)],
-            email=fake.email()[:random.randint(5, 60)],
-            mobile=fake.phone_number()[:random.randint(5, 20)],
-            phone=fake.phone_number()[:random.randint(5, 20)],
-            client_status=random.choice([c[0] for c in Client.CLIENT_STATUS_CHOICES]),
-            sales_contact=sales_contact,
-            date_created=timezone.now(),
-            date_updated=timezone.now(),
-        )
-        client.save()
-        for j in range(50):
-            start_date = timezone.now().date()
-            end_date = start_date + timedelta(days=364)
-            future_date = fake.date_between(start_date=start_date, end_date=end_date)
-            random_float = fake.pyfloat(left_digits=5, right_digits=2)
-            contract = Contract(
-                client = client,
-                sales_contact = sales_contact,
-                contract_status = random.choice([c[0] for c in Contract.CONTRACT_STATUS_CHOICES]),
-                date_created = timezone.now(),
-                date_updated = timezone.now(),
-                amount_due = random_float,
-                payment_due_date = future_date,
-            )
-            contract.save()
-            for k in range(2):
-                start_date = timezone.now().date()
-                event_date = fake.date_time_between(start_date='now', end_date='+30d', tzinfo=timezone.utc)
-                event = Event.objects.create(
-                    contract = contract,
-                    event_date = event_date,
-                    client = client,
-                    support_contact = support_contact,
-                    event_status = get_object_or_404(EventStatus, pk= randint(1,3)),
-                    attendee_number = fake.pyint(min_value=0, max_value=100),
-                    date_created = timezone.now(),
-                    date_updated = timezone.now(),
-                    notes = fake.text(max_nb_chars=500),
+    # Keeps the emails unique across several runs on the same database.
+    email_offset = Client.objects.aggregate(last=Max('pk'))['last'] or 0
+
+    def write(model, objects):
+        if use_copy:
+            return copy_objects(model, objects)
+        return model.objects.bulk_create(objects, batch_size=batch_size)
+
+    counts = {'clients': 0, 'contracts': 0, 'events': 0}
+    clients_per_batch = max(1, batch_size // max(1, contracts_per_client))
+    started_at = time.perf_counter()
+    for batch_start in range(0, clients, clients_per_batch):
+        batch_end = min(clients, batch_start + clients_per_batch)
+        with transaction.atomic():
+            client_batch = write(Client, [
+                Client(
+                    first_name=random.choice(pools.first_names),
+                    last_name=random.choice(pools.last_names),
+                    company_name=random.choice(pools.companies),
+                    email=f"{random.choice(pools.user_names)}.{email_offset + i}@{random.choice(pools.domains)}"[-60:],
+                    mobile=random.choice(pools.phones),
+                    phone=random.choice(pools.phones),
+                    client_status=random.choice(client_statuses),
+                    sales_contact_id=random.choice(sales_contacts),
+                )
+                for i in range(batch_start, batch_end)
+            ])
+            contract_batch = write(Contract, [
+                Contract(
+                    client=client,
+                    sales_contact_id=client.sales_contact_id,
+                    contract_status=random.choice(contract_statuses),
+                    amount_due=round(random.uniform(0, 99999), 2),
+                    payment_due_date=start_date + timedelta(days=random.randint(0, 364)),
+                )
+                for client in client_batch
+                for j in range(contracts_per_client)
+            ])
+            event_batch = write(Event, [
+                Event(
+                    contract=contract,
+                    client=contract.client,
+                    support_contact_id=random.choice(support_contacts),
+                    event_status=random.choice(event_statuses),
+                    attendee_number=random.randint(0, 100),
+                    event_date=start_date + timedelta(days=random.randint(0, 30)),
+                    notes=random.choice(pools.notes),
                 )
-                event.save()
+                for contract in contract_batch
+                for k in range(events_per_contract)
+            ])
+        counts['clients'] += len(client_batch)
+        counts['contracts'] += len(contract_batch)
+        counts['events'] += len(event_batch)
+        if stdout is not None:
+            stdout.write(f"{counts['clients']}/{clients} clients, {counts['contracts']} contracts, "
+                         f"{counts['events']} events")
 
+    elapsed = time.perf_counter() - started_at
+    counts['rows'] = counts['clients'] + counts['contracts'] + counts['events']
+    counts['seconds'] = elapsed
+    counts['rows_per_second'] = counts['rows'] / elapsed if elapsed else 0
+    return counts
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class RunSQLOnPostgreSQL(migrations.RunSQL):
+    """
+    A RunSQL operation that only runs on PostgreSQL.
+
+    Used for the PostgreSQL specific objects (trigram indexes, triggers...) that have no
+    equivalent in the model state, so that the migrations still apply on the SQLite
+    databases used as stand-ins in development and tests.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
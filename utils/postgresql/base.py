@@ -0,0 +1,33 @@
+import time
+
+from django.db.backends.postgresql import base
+
+from utils.database import record_acquisition
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The PostgreSQL backend of Django, measuring how long the requests wait for a connection
+    (see `utils.database.connection_stats`).
+
+    With persistent connections (`CONN_MAX_AGE`) and `CONN_HEALTH_CHECKS`, a request either
+    reuses the connection of its thread after a health check query, or opens a new one
+    because there was none, it was too old or it failed the health check.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        except Exception:
+            record_acquisition(self.alias, time.perf_counter() - start, opened=True, failed=True)
+            raise
+        record_acquisition(self.alias, time.perf_counter() - start, opened=True)
+
+    def close_if_health_check_failed(self):
+        if self.connection is None or not self.health_check_enabled or self.health_check_done:
+            return
+        start = time.perf_counter()
+        super().close_if_health_check_failed()
+        if self.connection is not None:
+            record_acquisition(self.alias, time.perf_counter() - start, opened=False)
@@ -0,0 +1,64 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The line and paragraph separators, escaped by DRF for the responses embedded in JavaScript.
+SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class PreEncodedJSON(bytes):
+    """
+    A response body already encoded as compact JSON (e.g. read from the response cache), written
+    as is by `ORJSONRenderer`: `Response(PreEncodedJSON(body))`.
+    """
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    The JSON renderer of the API, encoding with orjson when it is installed.
+
+    orjson encodes the dicts, lists, strings, numbers, dates, datetimes, times and UUIDs natively;
+    any other value (Decimal, lazy translations, querysets...) goes through DRF's encoder, so the
+    bytes are those of DRF's `JSONRenderer` with two exceptions: the floats written with an
+    exponent (`1e16` instead of `1e+16`, the same number), and NaN and the infinities, rendered
+    as null where DRF fails. `manage.py check_renderer` compares both renderers.
+
+    The stdlib encoder is used when orjson is missing, for indented responses (`Accept:
+    application/json; indent=4`), non-compact or ASCII-only settings, and for the values orjson
+    cannot encode (integers over 64 bits...). A `PreEncodedJSON` body is written unchanged.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson is not None else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if isinstance(data, PreEncodedJSON):
+            if indent is None:
+                return bytes(data)
+            data = json.loads(data)
+        if data is None or orjson is None or indent is not None or not self.is_compact():
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for separator, escaped in SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+    def is_compact(self):
+        return self.compact and not self.ensure_ascii
+
+
+def encode(data):
+    """
+    Return the data encoded as compact JSON by `ORJSONRenderer`, as a `PreEncodedJSON` body.
+    """
+    return PreEncodedJSON(ORJSONRenderer().render(data))
+
@@ -0,0 +1,98 @@
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+
+# The database the reads of the current request are routed to, None for the primary.
+_read_database = contextvars.ContextVar('read_database', default=None)
+
+
+def get_config():
+    """
+    Return the REPLICA_ROUTING setting, completed with its defaults.
+    """
+    config = {'REPLICAS': [], 'STICKY_SECONDS': 5, 'CACHE': 'default'}
+    config.update(getattr(settings, 'REPLICA_ROUTING', {}))
+    return config
+
+
+def choose_replica():
+    """
+    Return the alias of a replica picked at random, or None if there is none.
+    """
+    replicas = get_config()['REPLICAS']
+    return random.choice(replicas) if replicas else None
+
+
+def sticky_key(user_id):
+    return f'db:sticky:{user_id}'
+
+
+def mark_write(user):
+    """
+    Pin the reads of the user to the primary for STICKY_SECONDS, the time the replicas need
+    to replay their writes, so that they read what they wrote.
+    """
+    config = get_config()
+    if config['REPLICAS'] and config['STICKY_SECONDS'] and user is not None and user.pk is not None:
+        caches[config['CACHE']].set(sticky_key(user.pk), True, config['STICKY_SECONDS'])
+
+
+def is_sticky(user):
+    """
+    Return True if the user wrote less than STICKY_SECONDS ago.
+    """
+    if user is None or user.pk is None:
+        return False
+    return bool(caches[get_config()['CACHE']].get(sticky_key(user.pk)))
+
+
+def get_read_database():
+    """
+    Return the replica the reads of the current context are routed to, None for the primary.
+    """
+    return _read_database.get()
+
+
+def route_reads(alias):
+    """
+    Route the reads of the current context to the database `alias` (None for the primary),
+    until `restore_reads` is called with the returned token.
+    """
+    return _read_database.set(alias)
+
+
+def restore_reads(token):
+    _read_database.reset(token)
+
+
+@contextlib.contextmanager
+def read_from(alias):
+    """
+    Route the reads made in the block to the database `alias` (None for the primary).
+    """
+    token = route_reads(alias)
+    try:
+        yield
+    finally:
+        restore_reads(token)
+
+
+class ReplicaRouter:
+    """
+    Routes the reads of the requests served from a replica (see `read_from`), every other
+    query to the primary (`default`). The router has no opinion on the migrations, so that
+    SQLite stand-ins of the replicas can be migrated with `migrate --database <alias>`.
+    """
+
+    def db_for_read(self, model, **hints):
+        return get_read_database()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary.
+        return True
@@ -0,0 +1,121 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from epicEvents.cache import get_config
+
+
+def count_queries(method, url, user, data=None, client=None):
+    """
+    Send a request as the given user and return the number of SQL queries it ran.
+
+    Args:
+        method (str): The HTTP method, e.g. 'get' or 'patch'.
+        url (str): The url of the endpoint, e.g. '/event/1/'.
+        user (User): The user the request is authenticated as.
+        data (dict, optional): The body of the request, sent as JSON.
+        client (APIClient, optional): The test client to use.
+
+    Returns:
+        tuple: The number of queries and the response.
+    """
+    client = client or APIClient()
+    # A fresh instance, as loaded by the authentication on every request.
+    client.force_authenticate(user=type(user).objects.get(pk=user.pk))
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method.lower())(url, data, format='json')
+    return len(context.captured_queries), response
+
+
+def count_list_queries(url, user, client=None):
+    """
+    Request the given list endpoint as the given user and return the number of SQL queries it ran.
+
+    Args:
+        url (str): The url of the list endpoint, e.g. '/event/'.
+        user (User): The user the request is authenticated as.
+        client (APIClient, optional): The test client to use.
+
+    Returns:
+        tuple: The number of queries and the response.
+    """
+    return count_queries('get', url, user, client=client)
+
+
+def assert_action_queries(testcase, method, url, user, expected, data=None):
+    """
+    Assert that a request of a viewset action runs exactly the expected number of SQL queries.
+
+    Meant for one test per action of each viewset, so that an object permission loading a
+    related row, or a lookup running twice, fails the tests. The warm-up request bypasses the
+    response cache: the count is the one of a cache miss.
+
+    Usage:
+    ```
+    def test_event_partial_update_queries(self):
+        # The lookup, the previous row read by the signals, the update, the sales contact of the
+        # client (cache invalidation) and the rollup update.
+        assert_action_queries(self, 'patch', f'/event/{self.event.pk}/', self.support_user, 5,
+                              data={'attendee_number': 7})
+    ```
+
+    Args:
+        testcase (TestCase): The running test case, used for the assertion.
+        method (str): The HTTP method of the action, e.g. 'get' for `retrieve`.
+        url (str): The url of the endpoint.
+        user (User): The user the request is authenticated as.
+        expected (int): The number of queries the request must run.
+        data (dict, optional): The body of the request, sent as JSON.
+
+    Returns:
+        The response.
+    """
+    # Warm up the process-local caches (roles...) so that only the steady state is counted.
+    with override_settings(RESPONSE_CACHE={**get_config(), 'ENABLED': False}):
+        count_queries('get', url, user)
+    count, response = count_queries(method, url, user, data)
+    testcase.assertLess(response.status_code, 400, response.content)
+    testcase.assertEqual(count, expected, f"{method.upper()} {url} ran {count} queries instead of {expected}")
+    return response
+
+
+def assert_constant_queries(testcase, url, user, add_rows, sizes=(1, 10)):
+    """
+    Assert that a list endpoint runs the same number of queries whatever the number of rows it returns.
+
+    The rows are added with `add_rows(n)` before each request, so the endpoint is requested
+    once per size with a growing number of rows. A query count growing with the rows means
+    the serializer loads a relation per row (N+1 queries). The requests bypass the response
+    cache: the counts are the ones of cache misses.
+
+    Usage (see `EpicEventsTestCase` in epicEvents/tests.py):
+    ```
+    def test_event_list_queries(self):
+        assert_constant_queries(self, '/event/', self.support_user, self.create_events)
+    ```
+
+    Args:
+        testcase (TestCase): The running test case, used for the assertion.
+        url (str): The url of the list endpoint.
+        user (User): The user the requests are authenticated as.
+        add_rows (callable): Adds `n` rows visible to the user.
+        sizes (tuple): The numbers of rows to add before each request.
+
+    Returns:
+        int: The number of queries run by each request.
+    """
+    counts = []
+    with override_settings(RESPONSE_CACHE={**get_config(), 'ENABLED': False}):
+        # Warm up the process-local caches (roles...) so that only the steady state is compared.
+        count_list_queries(url, user)
+        for size in sizes:
+            add_rows(size)
+            count, response = count_list_queries(url, user)
+            testcase.assertEqual(response.status_code, 200, response.content)
+            counts.append(count)
+    testcase.assertEqual(
+        len(set(counts)), 1,
+        f"{url} ran {counts} queries for {list(sizes)} added rows, "
+        f"the query count must not depend on the number of rows")
+    return counts[0]